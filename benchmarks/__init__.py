@@ -0,0 +1,23 @@
+"""
+Benchmarks for Alien Invaders
+
+This package times the game rules headlessly, with the WaveSim of
+invaders/simulation.py, so it needs neither Kivy nor a window.  Run it from the
+top of the repository with
+
+    python -m benchmarks --out results.json
+
+The results are written as JSON, so that runs from different commits can be
+compared by a script.  See wave_scaling.py for the benchmarks themselves.
+
+The module memory.py measures the footprint of the drawables instead; it needs
+Kivy and is run on its own (python -m benchmarks.memory).
+"""
+import os.path
+import sys
+
+# The game modules import each other as top-level modules (from consts import *)
+INVADERS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'invaders')
+if not INVADERS in sys.path:
+    sys.path.insert(0,INVADERS)
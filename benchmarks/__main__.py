@@ -0,0 +1,66 @@
+"""
+Runs the benchmarks and writes the results as JSON.
+
+Usage: python -m benchmarks [--out FILE] [--samples N] [--quick] [NAME ...]
+"""
+from . import wave_scaling
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+import numpy as np
+
+
+def commit():
+    """
+    Returns the hash of the current git commit (None outside of a repository).
+    """
+    try:
+        text = subprocess.check_output(['git','rev-parse','HEAD'],
+                                       stderr=subprocess.DEVNULL)
+        return text.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    """
+    Runs the benchmarks from the command line.
+
+    Parameter argv: the command line arguments (None for sys.argv)
+    Precondition: argv is None or a list of strings
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Time the wave rules headlessly.')
+    parser.add_argument('names',nargs='*',help='the benchmarks to run (default all)')
+    parser.add_argument('--out',default=None,help='the JSON file (default stdout)')
+    parser.add_argument('--samples',type=int,default=200)
+    parser.add_argument('--quick',action='store_true',
+                        help='skip the two largest sizes of each sweep')
+    args = parser.parse_args(argv)
+
+    log = lambda line: print(line,file=sys.stderr)
+    results = wave_scaling.run(args.samples,args.quick,args.names or None,log)
+    report = {'commit': commit(), 'date': datetime.datetime.now().isoformat(),
+              'python': platform.python_version(), 'numpy': np.__version__,
+              'machine': platform.machine(), 'samples': args.samples,
+              'benchmarks': results}
+    for entry in results:
+        exponent = entry['exponent']
+        log('%-14s %-7s exponent %s' % (entry['name'],entry['axis'],
+            'n/a' if exponent is None else '%.2f' % exponent))
+
+    text = json.dumps(report,indent=2)
+    if args.out:
+        with open(args.out,'w') as file:
+            file.write(text+'\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
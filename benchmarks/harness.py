@@ -0,0 +1,93 @@
+"""
+Timing helpers for the benchmarks
+
+This module times single calls with time.perf_counter_ns, summarizes the
+latencies as percentiles, and fits a scaling exponent to latencies measured at
+several problem sizes.
+"""
+import time
+import gc
+
+import numpy as np
+
+# The percentiles reported for every benchmark
+PERCENTILES = (50, 90, 99)
+
+
+def measure(setup,call,samples,fresh=True):
+    """
+    Returns the latency in nanoseconds of each of samples calls.
+
+    The function setup() builds the state and call(state) is the operation that
+    is timed; only call is timed.  If fresh is True, every sample gets its own
+    state from setup.  Otherwise the state is built once and the calls follow
+    each other, as they would in a running game.  The garbage collector is off
+    while timing.
+
+    Parameter setup: the function building the state
+    Precondition: setup is a callable with no arguments
+
+    Parameter call: the function to time
+    Precondition: call is a callable taking the state
+
+    Parameter samples: the number of calls to time
+    Precondition: samples is an int > 0
+
+    Parameter fresh: whether to rebuild the state for every sample
+    Precondition: fresh is a bool
+    """
+    clock = time.perf_counter_ns
+    result = np.empty(samples,dtype=np.int64)
+    state = None if fresh else setup()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(samples):
+            if fresh:
+                state = setup()
+            start = clock()
+            call(state)
+            result[i] = clock() - start
+    finally:
+        if enabled:
+            gc.enable()
+    return result
+
+
+def summarize(latencies):
+    """
+    Returns a dictionary of statistics (in nanoseconds) for an array of latencies.
+
+    The keys are 'samples', 'mean', 'min', 'max' and 'pNN' for every NN in
+    PERCENTILES.
+
+    Parameter latencies: the measured latencies
+    Precondition: latencies is a non-empty array of numbers
+    """
+    result = {'samples': int(len(latencies)), 'mean': float(np.mean(latencies)),
+              'min': float(np.min(latencies)), 'max': float(np.max(latencies))}
+    for (p, value) in zip(PERCENTILES,np.percentile(latencies,PERCENTILES)):
+        result['p%d' % p] = float(value)
+    return result
+
+
+def fit_exponent(sizes,latencies):
+    """
+    Returns the exponent k of the best fit latency = c * size**k.
+
+    The fit is a least-squares line through the points in log-log space.  An
+    exponent near 0 means constant time, near 1 linear and near 2 quadratic.
+    The result is None if there are fewer than two distinct sizes.
+
+    Parameter sizes: the problem sizes
+    Precondition: sizes is a sequence of numbers > 0
+
+    Parameter latencies: the latency measured at each size
+    Precondition: latencies is a sequence of numbers > 0, as long as sizes
+    """
+    sizes = np.asarray(sizes,dtype=float)
+    if len(np.unique(sizes)) < 2:
+        return None
+    latencies = np.maximum(np.asarray(latencies,dtype=float),1.0)
+    slope, intercept = np.polyfit(np.log(sizes),np.log(latencies),1)
+    return float(slope)
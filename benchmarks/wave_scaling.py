@@ -0,0 +1,170 @@
+"""
+Scaling benchmarks for the wave rules
+
+Each benchmark times one WaveSim operation (update, alienMarch, delEntity,
+makeBolt or makeAlienBolt) at a series of problem sizes: formations from the
+default 5x12 to far beyond the 10x15 limit of consts.py, or from 1 to 10,000
+bolts on screen.  A scaling exponent is fitted to the median latencies, so an
+operation that should be constant or linear but has gone quadratic stands out.
+
+The formations are given a window tall enough to hold them above the defense
+line, so the wave does not end on its first update.
+"""
+from consts import *
+from simulation import WaveSim
+
+from .harness import measure, summarize, fit_exponent
+
+import random
+
+# The formation sizes (rows, cols) to sweep
+FORMATIONS = ((5,12),(10,15),(20,30),(40,60),(80,120),(160,240))
+
+# The bolt counts to sweep
+BOLT_COUNTS = (1,10,100,1000,10000)
+
+# The seed of every wave and bolt layout
+SEED = 1110
+
+
+class NoInput(object):
+    """
+    An input with no keys pressed.
+    """
+
+    def is_key_down(self,key):
+        """
+        Returns False.
+
+        Parameter key: the key to test
+        Precondition: key is a string
+        """
+        return False
+
+
+def make_wave(rows=ALIEN_ROWS,cols=ALIENS_IN_ROW,bolts=0):
+    """
+    Returns a new seeded WaveSim with rows x cols aliens and bolts bolts.
+
+    Half of the bolts (rounded up) belong to the player and are spread over the
+    formation, the others belong to the aliens and are spread over the space
+    between the formation and the ship.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens in each row
+    Precondition: cols is an int > 0
+
+    Parameter bolts: the number of bolts on screen
+    Precondition: bolts is an int >= 0
+    """
+    height = ALIEN_CEILING + rows*(ALIEN_V_SEP + ALIEN_HEIGHT) + 2*DEFENSE_LINE
+    height = max(height,GAME_HEIGHT)
+    sim = WaveSim(height,GAME_WIDTH,rows,cols,capacity=max(bolts,1),seed=SEED)
+    formation = sim.getFormation()
+    left = formation.getLeft()
+    right = min(formation.getRight(),GAME_WIDTH)
+    bottom = formation.getBottom()
+    rng = random.Random(SEED)
+    buffer = sim.getBolts()
+    for i in range(bolts):
+        if i % 2 == 0:
+            y = rng.uniform(bottom,GAME_HEIGHT)
+            buffer.spawn(rng.uniform(left,right),y,BOLT_SPEED,True)
+        else:
+            y = rng.uniform(DEFENSE_LINE,bottom)
+            buffer.spawn(rng.uniform(0,GAME_WIDTH),y,-BOLT_SPEED,False)
+    return sim
+
+
+def make_marching(*args,**kw):
+    """
+    Returns a new wave (see make_wave) whose next update marches the aliens.
+    """
+    sim = make_wave(*args,**kw)
+    sim.update(NO_INPUT,2*ALIEN_SPEED)
+    return sim
+
+
+def step_update(sim):
+    """
+    Runs one update of sim.
+    """
+    sim.update(NO_INPUT,2*ALIEN_SPEED)
+
+
+def step_make_bolt(sim):
+    """
+    Fires a player bolt from sim (the buffer must have no player bolt).
+    """
+    sim.makeBolt()
+
+
+# The shared input
+NO_INPUT = NoInput()
+
+
+# The benchmarks: (name, axis, setup(size), operation, fresh state per sample).
+# The axis is 'aliens' or 'bolts'; it says what the sizes count.  Every timed
+# update marches the aliens, which is the most expensive kind of update.
+BENCHMARKS = (
+    ('update', 'aliens', lambda size: make_marching(*size), step_update, True),
+    ('alienMarch', 'aliens', lambda size: make_wave(*size),
+     lambda sim: sim.alienMarch(), False),
+    ('makeAlienBolt', 'aliens', lambda size: make_wave(*size),
+     lambda sim: sim.makeAlienBolt(), True),
+    ('makeBolt', 'aliens', lambda size: make_wave(*size), step_make_bolt, True),
+    ('delEntity', 'aliens', lambda size: make_wave(size[0],size[1],10),
+     lambda sim: sim.delEntity(), True),
+    ('delEntity', 'bolts', lambda count: make_wave(bolts=count),
+     lambda sim: sim.delEntity(), True),
+    ('update', 'bolts', lambda count: make_marching(bolts=count), step_update,
+     True),
+)
+
+
+def run(samples=200,quick=False,names=None,log=None):
+    """
+    Runs the benchmarks and returns their results.
+
+    The result is a list with one dictionary per benchmark, with the keys
+    'name', 'axis', 'exponent' (fitted to the median latencies, or None) and
+    'points'.  The points are one dictionary per size, with the keys 'size'
+    (the rows and cols of the formation, or the number of bolts), 'n' (the
+    number of aliens or bolts) and the statistics of harness.summarize.
+
+    Parameter samples: the number of calls to time at each size
+    Precondition: samples is an int > 0
+
+    Parameter quick: whether to skip the two largest sizes of each sweep
+    Precondition: quick is a bool
+
+    Parameter names: the benchmarks to run (None for all of them)
+    Precondition: names is None or a collection of benchmark names
+
+    Parameter log: a function to call with a line of progress text
+    Precondition: log is None or a callable
+    """
+    results = []
+    for (name, axis, setup, call, fresh) in BENCHMARKS:
+        if names != None and not name in names:
+            continue
+        sizes = FORMATIONS if axis == 'aliens' else BOLT_COUNTS
+        if quick:
+            sizes = sizes[:-2]
+        points = []
+        for size in sizes:
+            n = size[0]*size[1] if axis == 'aliens' else size
+            latencies = measure(lambda: setup(size),call,samples,fresh)
+            point = summarize(latencies)
+            point['size'] = list(size) if axis == 'aliens' else size
+            point['n'] = n
+            points.append(point)
+            if log != None:
+                log('%-14s %-7s n=%-6d p50=%10.0f ns  p99=%10.0f ns' %
+                    (name,axis,n,point['p50'],point['p99']))
+        exponent = fit_exponent([p['n'] for p in points],[p['p50'] for p in points])
+        results.append({'name': name, 'axis': axis, 'exponent': exponent,
+                        'points': points})
+    return results
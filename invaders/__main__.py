@@ -25,4 +25,6 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,timestep=TIMESTEP,
+             profile=PROFILE,budget=FRAME_BUDGET,profile_file=PROFILE_FILE,
+             retained=RETAINED).run()
@@ -69,6 +69,14 @@ class Invaders(GameApp):
     # You may have new attributes if you wish (you might want an attribute to
     # store any score across multiple waves). But you must document them.
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+    #
+    # Attribute _labels: the spare message labels, for reuse
+    # Invariant: _labels is a GObjectPool of GLabel, not containing _text
+
+    # Class attribute WAVE_OPTIONS: more keyword arguments for every new Wave.
+    # A subclass can change the formation this way (see stress.py), since it
+    # cannot have an initializer.
+    WAVE_OPTIONS = {}
 
     # DO NOT MAKE A NEW INITIALIZER!
 
@@ -92,6 +100,7 @@ class Invaders(GameApp):
         self._welcome = GLabel(text = "Press 'S' to Play",font_name = "ComicSan"
             + "s.ttf",font_size = 64,x = self.width / 2, y = self.height / 2)
         self._text = self._welcome
+        self._labels = GObjectPool(GLabel)
 
     def update(self,dt):
         """
@@ -133,8 +142,10 @@ class Invaders(GameApp):
 
         STATE_CONTINUE: This state restores the ship after it was destroyed.
         The application switches to this state if the state was STATE_PAUSED
-        in the previous frame, and the player pressed a key. This state only
-        lasts one animation frame before switching to STATE_ACTIVE.
+        in the previous update, and the player pressed a key. The ship is
+        restored by the next update, which switches to STATE_ACTIVE.  With a
+        fixed timestep that update may be in the same animation frame, so
+        draw never changes the wave.
 
         STATE_COMPLETE: The wave is over, and is either won or lost.
 
@@ -148,11 +159,12 @@ class Invaders(GameApp):
             if(self.input.is_key_pressed('s')):
                 self._state = STATE_NEWWAVE
         if(self._state == STATE_NEWWAVE):
-            self._wave = Wave()
+            self._wave = Wave(seed=WAVE_SEED,**self.WAVE_OPTIONS)
             self._state = STATE_ACTIVE
         if(self._state == STATE_ACTIVE):
             lives = self._wave.getLives()
-            self._wave.update(self.input,dt)
+            with self.span('wave.update'):
+                self._wave.update(self.input,dt)
             if(self.input.is_key_pressed('spacebar')):
                 self._wave.makeBolt()
             if(self._wave.getLives() != lives and self._wave.getLives() > 0):
@@ -161,6 +173,7 @@ class Invaders(GameApp):
             self._wave.getDestroyed() == True):
                 self._state = STATE_COMPLETE
         if(self._state == STATE_CONTINUE):
+            self._wave.restoreShip()
             self._state = STATE_ACTIVE
         if(self._state == STATE_PAUSED):
             if(self.input.is_key_pressed('s')):
@@ -182,25 +195,53 @@ class Invaders(GameApp):
         """
         if(self._state == STATE_INACTIVE):
             self._text.draw(self.view)
-        elif(self._state == STATE_ACTIVE):
-            self._wave.draw(self.view)
+        elif(self._state == STATE_ACTIVE or self._state == STATE_CONTINUE):
+            with self.span('wave.draw'):
+                self._wave.draw(self.view)
         elif(self._state == STATE_PAUSED):
-            self._text = GLabel(text = "Press 'S' to Continue",font_name = "ComicSan"
-                + "s.ttf",font_size = 64,x = self.width / 2, y = self.height / 2)
+            self.setMessage("Press 'S' to Continue")
             self._text.draw(self.view)
-        elif(self._state == STATE_CONTINUE):
-            self._wave.setShip(Ship(self._wave.getSavedX()))
         elif(self._state == STATE_COMPLETE):
             if(self._wave.getLives() == 0 or self._wave.getPassed() == True):
-                self._text = GLabel(text = "GAME OVER!", font_name = "ComicSan"
-                    + "s.ttf",font_size = 64,x = self.width / 2, \
-                    y = self.height / 2)
+                self.setMessage("GAME OVER!")
             if(self._wave.getDestroyed() == True):
-                self._text = GLabel(text = "Congratulations!", font_name = "ComicSan"
-                    + "s.ttf",font_size = 64,x = self.width / 2, \
-                    y = self.height / 2)
+                self.setMessage("Congratulations!")
             self._text.draw(self.view)
         else:
             self._welcome = None
             self._text = GLabel()
             self._text.draw(self.view)
+
+    # FRAME PROFILER HOOKS
+    def profile_state(self):
+        """
+        Returns the name of the current state, for the frame profiler.
+        """
+        return STATE_NAMES[self._state]
+
+    def profile_info(self):
+        """
+        Returns the number of bolts and aliens on screen, for slow frame reports.
+        """
+        if self._wave == None:
+            return {}
+        return {'bolts': self._wave.getBoltCount(),
+                'aliens': self._wave.getAlienCount()}
+
+    # HELPER METHODS
+    def setMessage(self,text):
+        """
+        Makes _text a message label showing text in the center of the window.
+
+        The label is only replaced if the text changes, and old labels are reused
+        from the pool _labels instead of creating a new GLabel every frame.
+
+        Parameter text: the message to display
+        Precondition: text is a string
+        """
+        if self._text != None and self._text.text == text:
+            return
+        if self._text != None and self._text is not self._welcome:
+            self._labels.release(self._text)
+        self._text = self._labels.acquire(text = text,font_name = "ComicSan"
+            + "s.ttf",font_size = 64,x = self.width / 2, y = self.height / 2)
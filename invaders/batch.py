@@ -0,0 +1,287 @@
+"""
+Batch simulator for Alien Invaders
+
+This module runs many waves of Alien Invaders without a window, one wave per
+seed, spread over every core with a process pool.  It is used for balance and
+regression checks.  For example
+
+    python batch.py --seeds 0:1000 --policy bot --rows 5 --cols 12
+
+plays a thousand waves with the bot player.  The results of each game are
+streamed back as they finish, and a summary with the throughput in simulated
+frames per second is printed at the end.
+
+The waves are instances of WaveSim (see simulation.py), so this module never
+imports game2d or Kivy.  A policy stands in for the keyboard: it is an object
+with a method is_key_down(key), like GInput, that looks at the simulation once
+per frame to decide which keys are pressed.
+"""
+from consts import *
+from simulation import *
+import multiprocessing
+import argparse
+import time
+
+# The simulated frame length, in seconds
+FRAME_TIME = 1/60
+
+# The number of frames after which an unfinished game is abandoned
+MAX_FRAMES = 216000
+
+
+class Policy(object):
+    """
+    The base class of a scripted player.
+
+    A policy is asked to observe the simulation at the start of every frame,
+    and then answers is_key_down for the keys 'a', 'd' and 'spacebar' (the
+    only keys the game reads).  This class presses no keys at all.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _keys: the keys pressed this frame
+    # Invariant: _keys is a set of strings
+
+    def __init__(self):
+        """
+        Initializes a policy with no keys pressed.
+        """
+        self._keys = set()
+
+    def is_key_down(self,key):
+        """
+        Returns True if key is pressed this frame.
+
+        Parameter key: the key to test
+        Precondition: key is a string
+        """
+        return key in self._keys
+
+    def observe(self,sim):
+        """
+        Decides the keys to press this frame.
+
+        Parameter sim: the wave being played
+        Precondition: sim is a WaveSim
+        """
+        pass
+
+
+class SweepPolicy(Policy):
+    """
+    A policy that sweeps the ship from wall to wall, firing all the time.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _right: whether the ship is moving right
+    # Invariant: _right is a bool
+
+    def __init__(self):
+        """
+        Initializes a policy moving right.
+        """
+        super().__init__()
+        self._right = True
+
+    def observe(self,sim):
+        """
+        Decides the keys to press this frame.
+
+        Parameter sim: the wave being played
+        Precondition: sim is a WaveSim
+        """
+        x = sim.getShipX()
+        if x != None:
+            if self._right and x > sim.getWidth() - SHIP_WIDTH:
+                self._right = False
+            elif not self._right and x < SHIP_WIDTH:
+                self._right = True
+        self._keys = {'d' if self._right else 'a', 'spacebar'}
+
+
+class BotPolicy(Policy):
+    """
+    A policy that lines up under the lowest alien of the nearest column.
+
+    The bot fires whenever it is under a living column.  It does not dodge,
+    and it waits at the wall when the nearest column is out of its reach.
+    """
+
+    def observe(self,sim):
+        """
+        Decides the keys to press this frame.
+
+        Parameter sim: the wave being played
+        Precondition: sim is a WaveSim
+        """
+        self._keys = set()
+        x = sim.getShipX()
+        formation = sim.getFormation()
+        if x == None or formation.isEmpty():
+            return
+        left = formation.getColumnX(formation.getFirstCol())
+        right = formation.getColumnX(formation.getLastCol())
+        target = min(max(x,left),right)
+        target = min(max(target,SHIP_WIDTH/2),sim.getWidth() - SHIP_WIDTH/2)
+        if target < x - SHIP_MOVEMENT:
+            self._keys.add('a')
+        elif target > x + SHIP_MOVEMENT:
+            self._keys.add('d')
+        if abs(target - x) < sim.getGeometry().getWidth() / 2:
+            self._keys.add('spacebar')
+
+
+# The policies by name
+POLICIES = {'idle': Policy, 'sweep': SweepPolicy, 'bot': BotPolicy}
+
+
+def play(job):
+    """
+    Plays a single wave to completion and returns its results.
+
+    The wave is over when it is won or lost, or after maxframes frames.  A lost
+    ship is restored on the next frame, since there is no one to press a key.
+
+    The result is a dictionary with the keys 'seed', 'frames', 'duration' (in
+    simulated seconds), 'lives_lost', 'aliens_killed', 'won' and 'finished'.
+
+    Parameter job: the seed, the WaveSim configuration, the policy name and the
+    frame limit
+    Precondition: job is a tuple (int, dict, str, int); the policy is a key of
+    POLICIES
+    """
+    seed, config, policy, maxframes = job
+    sim = WaveSim(seed=seed,**config)
+    player = POLICIES[policy]()
+    total = sim.getFormation().getCount()
+    lives = sim.getLives()
+    frames = 0
+    while not sim.isComplete() and frames < maxframes:
+        if sim.getShipX() == None:
+            sim.restoreShip()
+        player.observe(sim)
+        sim.update(player,FRAME_TIME)
+        if player.is_key_down('spacebar'):
+            sim.makeBolt()
+        frames = frames + 1
+    return {'seed': seed, 'frames': frames, 'duration': frames*FRAME_TIME,
+            'lives_lost': lives - sim.getLives(),
+            'aliens_killed': total - sim.getFormation().getCount(),
+            'won': sim.getDestroyed(), 'finished': sim.isComplete()}
+
+
+def run(seeds,config,policy='bot',maxframes=MAX_FRAMES,processes=None,
+        callback=None):
+    """
+    Plays one wave per seed on a process pool and returns the summary.
+
+    The games are handed out in chunks and their results are passed to
+    callback (if any) in the order they finish.  The summary is a dictionary
+    with the number of games, wins and unfinished games, the mean duration,
+    lives lost and aliens killed, the total number of frames, the wall time
+    and the throughput in simulated frames per second.
+
+    Parameter seeds: the seeds to play
+    Precondition: seeds is a sequence of ints
+
+    Parameter config: the keyword arguments of WaveSim
+    Precondition: config is a dict
+
+    Parameter policy: the name of the input policy
+    Precondition: policy is a key of POLICIES
+
+    Parameter maxframes: the frame limit per game
+    Precondition: maxframes is an int > 0
+
+    Parameter processes: the number of worker processes (None for every core)
+    Precondition: processes is None or an int > 0
+
+    Parameter callback: a function to call with the result of each game
+    Precondition: callback is None or a callable
+    """
+    assert policy in POLICIES, '%s is not a policy' % repr(policy)
+    jobs = [(seed,config,policy,maxframes) for seed in seeds]
+    if processes == None:
+        processes = multiprocessing.cpu_count()
+    chunk = max(1,len(jobs) // (processes*8))
+
+    games = wins = unfinished = frames = 0
+    duration = lives = killed = 0.0
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(play,jobs,chunk):
+            games = games + 1
+            wins = wins + result['won']
+            unfinished = unfinished + (not result['finished'])
+            frames = frames + result['frames']
+            duration = duration + result['duration']
+            lives = lives + result['lives_lost']
+            killed = killed + result['aliens_killed']
+            if callback != None:
+                callback(result)
+    elapsed = time.perf_counter() - start
+
+    count = max(games,1)
+    return {'games': games, 'wins': wins, 'unfinished': unfinished,
+            'mean_duration': duration/count, 'mean_lives_lost': lives/count,
+            'mean_aliens_killed': killed/count, 'frames': frames,
+            'seconds': elapsed, 'frames_per_second': frames/max(elapsed,1e-9)}
+
+
+def parse_seeds(text):
+    """
+    Returns the range of seeds described by text.
+
+    The text is either a single count n (the seeds 0 to n-1) or a range
+    start:stop (stop is not included).
+
+    Parameter text: the seed range
+    Precondition: text is a string
+    """
+    if ':' in text:
+        start, stop = text.split(':')
+        return range(int(start),int(stop))
+    return range(int(text))
+
+
+def main(argv=None):
+    """
+    Runs the batch simulator from the command line.
+
+    Parameter argv: the command line arguments (None for sys.argv)
+    Precondition: argv is None or a list of strings
+    """
+    parser = argparse.ArgumentParser(description='Play many headless waves.')
+    parser.add_argument('--seeds',default='100',help='n, or start:stop')
+    parser.add_argument('--policy',default='bot',choices=sorted(POLICIES))
+    parser.add_argument('--rows',type=int,default=ALIEN_ROWS)
+    parser.add_argument('--cols',type=int,default=ALIENS_IN_ROW)
+    parser.add_argument('--speed',type=float,default=ALIEN_SPEED)
+    parser.add_argument('--rate',type=int,default=BOLT_RATE)
+    parser.add_argument('--volley',type=int,default=ALIEN_VOLLEY)
+    parser.add_argument('--lives',type=int,default=SHIP_LIVES)
+    parser.add_argument('--max-frames',type=int,default=MAX_FRAMES)
+    parser.add_argument('--processes',type=int,default=None)
+    parser.add_argument('--verbose',action='store_true',
+                        help='print the result of every game')
+    args = parser.parse_args(argv)
+
+    config = {'rows': args.rows, 'cols': args.cols, 'speed': args.speed,
+              'rate': args.rate, 'volley': args.volley, 'lives': args.lives}
+    report = None
+    if args.verbose:
+        report = lambda result: print(result)
+    summary = run(parse_seeds(args.seeds),config,args.policy,args.max_frames,
+                  args.processes,report)
+
+    print('games:              %d' % summary['games'])
+    print('wins:               %d' % summary['wins'])
+    print('unfinished:         %d' % summary['unfinished'])
+    print('mean duration:      %.1f s' % summary['mean_duration'])
+    print('mean lives lost:    %.2f' % summary['mean_lives_lost'])
+    print('mean aliens killed: %.1f' % summary['mean_aliens_killed'])
+    print('frames simulated:   %d' % summary['frames'])
+    print('wall time:          %.2f s' % summary['seconds'])
+    print('frames/sec:         %.0f' % summary['frames_per_second'])
+
+
+if __name__ == '__main__':
+    main()
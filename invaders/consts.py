@@ -75,10 +75,31 @@ BOLT_HEIGHT = 16
 BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
+# the number of aliens (each from a different column) that fire at once
+ALIEN_VOLLEY = 1
+# whether player and alien bolts that meet destroy each other
+BOLT_INTERCEPT = True
+# the maximum number of bolts (player and alien) on screen at once
+BOLT_CAPACITY = 1024
 
 
 ### GAME CONSTANTS ###
 
+# the fixed simulation timestep in seconds (None to step once per frame)
+TIMESTEP = 1/60
+# the seed for the random numbers of each wave (None for a random seed)
+WAVE_SEED = None
+# whether to record the time of each phase of every frame
+PROFILE = False
+# the frame time (in milliseconds) above which a frame is reported as slow
+FRAME_BUDGET = 1000/60
+# the file to save the frame time histograms to when the game closes
+PROFILE_FILE = 'frame_profile.json'
+# whether the view keeps its canvas between frames (False redraws it every frame)
+RETAINED = True
+# whether the aliens and bolts are drawn as batches (one mesh per texture or color)
+BATCH_DRAW = True
+
 # state before the game has started
 STATE_INACTIVE = 0
 # state when we are initializing a new wave
@@ -91,6 +112,8 @@ STATE_PAUSED   = 3
 STATE_CONTINUE = 4
 #: state when the game is complete (won or lost)
 STATE_COMPLETE = 5
+# the name of each state, for the frame profiler
+STATE_NAMES = ('INACTIVE','NEWWAVE','ACTIVE','PAUSED','CONTINUE','COMPLETE')
 
 
 ### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW"""
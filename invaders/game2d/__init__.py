@@ -4,14 +4,45 @@ A module to support simple 2D game development.
 This module is a simple wrapper around Kivy interfaces to make 2D game development
 simpler for students in CS 1110.
 
+The classes are imported on first use, so that modules which do not need Kivy (such
+as :mod:`game2d.gcollide`) can be used without loading it.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
-from .gtile import GTile
-from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+import importlib
+
+# The submodule defining each exported name
+_EXPORTS = {
+    'GObject': 'gobject', 'GScene': 'gobject', 'stack_matrices': 'gobject',
+    'GRectangle': 'grectangle', 'GEllipse': 'grectangle',
+    'GImage': 'grectangle', 'GLabel': 'grectangle',
+    'GSprite': 'gsprite', 'GSpriteBatch': 'gbatch',
+    'GTile': 'gtile',
+    'GPath': 'gpath', 'GTriangle': 'gpath', 'GPolygon': 'gpath',
+    'GInput': 'gview', 'GView': 'gview',
+    'GSpatialHash': 'gspatial',
+    'GObjectPool': 'gpool',
+    'GProfiler': 'gprofile',
+    'sweep': 'gcollide', 'sweep_boxes': 'gcollide',
+    'overlap_pairs': 'gcollide', 'intercept': 'gcollide',
+    'Sound': 'sound', 'SoundLibrary': 'sound',
+    'GameApp': 'app',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Returns the exported class ``name``, importing its submodule if necessary.
+    """
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module('.'+_EXPORTS[name],__name__),name)
+        globals()[name] = value
+        return value
+    raise AttributeError('module %s has no attribute %s' % (repr(__name__),repr(name)))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -20,6 +20,7 @@ from kivy.core.window import Window
 from kivy.logger import Logger
 
 import traceback
+import time
 import os.path
 import json
 import sys
@@ -73,7 +74,44 @@ class GameApp(kivy.app.App):
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
     
+    @property
+    def maxsteps(self):
+        """
+        The maximum number of fixed timesteps to run in a single animation frame
+        
+        This value only matters if the game has a ``timestep``.  When the game falls
+        behind (for example, because a frame took too long to draw), it catches up by
+        running several timesteps in the next frame, but never more than this many.
+        Any time that is still owed after that is dropped, so that a slow machine
+        runs the game in slow motion instead of freezing.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @maxsteps.setter
+    def maxsteps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
+    
     # IMMUTABLE PROPERTIES
+    @property
+    def timestep(self):
+        """
+        The fixed simulation timestep in seconds, or None for a variable timestep
+        
+        If this value is None, :meth:`update` is called exactly once per animation frame
+        with the time since the last frame.  Otherwise, the time of each frame is added
+        to an accumulator, and :meth:`update` is called zero or more times per frame,
+        always with ``dt`` equal to this value.  The game then advances the same way no
+        matter how fast the frames are drawn, which makes it deterministic.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._timestep
+    
     @property
     def width(self):
         """
@@ -92,6 +130,38 @@ class GameApp(kivy.app.App):
         """
         return self._gheight
     
+    @property
+    def profiler(self):
+        """
+        The frame profiler of this game.
+        
+        It records the time of each phase of every animation frame (see
+        :class:`GProfiler`), but only while it is enabled.  It is disabled unless the
+        game was created with ``profile=True``.
+        
+        **Invariant**: Must be a :class:`GProfiler`.
+        """
+        return self._profiler
+    
+    @property
+    def budget(self):
+        """
+        The frame time budget in milliseconds.
+        
+        While the profiler is enabled, every frame that takes longer than this is 
+        logged as a warning, together with the result of :meth:`profile_state` and 
+        :meth:`profile_info`.
+        
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._budget
+    
+    @budget.setter
+    def budget(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._budget = value
+    
     @property
     def view(self):
         """
@@ -289,12 +359,26 @@ class GameApp(kivy.app.App):
         **You will never call the constructor or run yourself**.  That is handled for 
         you in the provided code.
         
+        To run the game with a fixed simulation step (see :attr:`timestep`), also give
+        the ``timestep`` and (optionally) the ``maxsteps``::
+            
+            GameApp(width=400,height=400,timestep=1/60)
+        
+        To keep the canvas between frames, and only change the parts of it that were 
+        drawn differently, give ``retained=True`` (see :attr:`GView.retained`).
+        
         :param keywords: dictionary of keyword arguments 
         :type keywords:  keys are attribute names
         """
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('timestep', None)
+        m = keywords.pop('maxsteps', 5)
+        p = keywords.pop('profile', False)
+        b = keywords.pop('budget', 1000/60)
+        o = keywords.pop('profile_file', 'frame_profile.json')
+        r = keywords.pop('retained', False)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
@@ -308,6 +392,24 @@ class GameApp(kivy.app.App):
         
         self._fps = f
         
+        assert t is None or type(t) in [int,float], 'timestep %s is not a number' % repr(t)
+        assert t is None or t > 0, 'timestep %s is not positive' % repr(t)
+        assert type(m) == int, 'maxsteps %s is not an int' % repr(m)
+        assert m > 0, 'maxsteps %s is not positive' % repr(m)
+        self._timestep = t
+        self._maxsteps = m
+        self._backlog  = 0.0
+        
+        from .gprofile import GProfiler
+        assert type(p) == bool, 'profile %s is not a bool' % repr(p)
+        self._profiler = GProfiler(enabled=p)
+        self.budget = b
+        assert o is None or type(o) == str, 'profile_file %s is not a string' % repr(o)
+        self._profile_file = o
+        
+        assert type(r) == bool, 'retained %s is not a bool' % repr(r)
+        self._retained = r
+        
         x = keywords.pop('left', None)
         y = keywords.pop('top', None)
         assert x is None or type(x) in [int,float], 'left edge %s is not a number' % repr(x)
@@ -343,7 +445,7 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         from .gview import GInput, GView
-        self._view = GView()
+        self._view = GView(self._retained)
         self._view.size_hint = (1,1)
         self._input = GInput()
         self._input._register(self._view)
@@ -360,6 +462,7 @@ class GameApp(kivy.app.App):
             Clock.schedule_once(self._bootstrap,-1)
             kivy.app.App.run(self)
         except BaseException as e:
+            self._dump_profile()
             self.cleanup()
             raise e
     
@@ -412,6 +515,66 @@ class GameApp(kivy.app.App):
         """
         pass
     
+    def span(self,name):
+        """
+        Returns a context manager that times the code inside it as ``name``.
+        
+        Use this method to add your own spans to the frame profiler::
+            
+            with self.span('wave.update'):
+                self._wave.update(self.input,dt)
+        
+        It does nothing (and costs almost nothing) if the profiler is disabled.
+        
+        :param name: The name of the span
+        :type name:  ``str``
+        
+        :return: A context manager for the span
+        :rtype:  context manager
+        """
+        return self._profiler.span(name)
+    
+    def frame_stats(self,percents=(50,90,99)):
+        """
+        Returns the rolling percentiles of every profiled span, in milliseconds.
+        
+        The result is a dictionary from each span name to a dictionary from each 
+        percent to its value.  It is empty if the profiler was never enabled.
+        
+        :param percents: The percentiles to compute
+        :type percents:  sequence of numbers in 0..100
+        
+        :return: The percentiles of each span
+        :rtype:  ``dict``
+        """
+        return self._profiler.summary(percents)
+    
+    def profile_state(self):
+        """
+        Returns the name of the current game state, for the frame profiler.
+        
+        The profiler keeps separate histograms for each state, so that (for example)
+        the frame times of a paused game do not hide those of active play.  Override
+        this method to return your own state names.  By default there is only one
+        state, ``'default'``.
+        
+        :return: The name of the current state
+        :rtype:  ``str``
+        """
+        return 'default'
+    
+    def profile_info(self):
+        """
+        Returns a dictionary of facts to log with a slow frame.
+        
+        Override this method to report whatever helps explain a slow frame, such as 
+        the number of objects on screen.  By default it is empty.
+        
+        :return: The facts to log
+        :rtype:  ``dict``
+        """
+        return {}
+    
     def cleanup(self):
         """
         Performs any necessary clean-up before the application stops.
@@ -442,14 +605,106 @@ class GameApp(kivy.app.App):
         This method a callback-proxy for the methods `update` and `draw`.  It handles
         important issues behind the scenes, particularly with clearing the window.
         
+        If the game has a fixed :attr:`timestep`, :meth:`update` runs zero or more 
+        times (see :meth:`_ticks`).  If the profiler is enabled, every phase of the frame is timed.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        if self._profiler.enabled:
+            self._profiled_refresh(dt)
+            return
+        self.view.clear()
+        for step in self._ticks(dt):
+            self.input._prestep()
+            self.update(step)
+            self.input._poststep()
+        self.draw()
+        self.view.flush()
+    
+    def _profiled_refresh(self,dt):
+        """
+        Processes a single animation frame, recording the time of each phase.
+        
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
+        clock  = time.perf_counter_ns
+        record = self._profiler.record
+        
+        state = self.profile_state()
+        start = clock()
         self.view.clear()
-        self.input._prestep()
-        self.update(dt)
-        self.input._poststep()
+        now = clock()
+        record('clear',now-start)
+        updating = 0
+        for step in self._ticks(dt):
+            begin = clock()
+            self.input._prestep()
+            mark = clock()
+            record('prestep',mark-begin)
+            self.update(step)
+            begin = clock()
+            record('update',begin-mark)
+            updating += begin-mark
+            self.input._poststep()
+            record('poststep',clock()-begin)
+        begin = clock()
         self.draw()
+        self.view.flush()
+        now = clock()
+        drawing = now-begin
+        frame   = now-start
+        record('draw',drawing)
+        record('frame',frame)
+        
+        self._profiler.record_state(state,'frame',frame)
+        self._profiler.record_state(state,'update',updating)
+        self._profiler.record_state(state,'draw',drawing)
+        if frame > self._budget*1e6:
+            info = ''.join(' %s=%s' % item for item in self.profile_info().items())
+            Logger.warning('GameApp: Slow frame %.2f ms (update %.2f ms, draw %.2f ms) '
+                           'in state %s.%s' % (frame/1e6,updating/1e6,drawing/1e6,
+                           state,info))
+    
+    def _dump_profile(self):
+        """
+        Saves the frame time histograms to the profile file.
+        
+        Nothing is saved if the profiler never recorded a frame or there is no file.
+        """
+        if self._profile_file is None or self._profiler.count('frame') == 0:
+            return
+        try:
+            self._profiler.dump(self._profile_file,{'budget_ms': self._budget})
+            Logger.info('GameApp: Frame profile saved to %s.' % repr(self._profile_file))
+        except OSError as e:
+            Logger.warning('GameApp: Could not save the frame profile: %s' % e)
+    
+    def _ticks(self,dt):
+        """
+        Returns the time steps to update with in a frame that took ``dt`` seconds.
+        
+        With a variable timestep, this is just ``dt``.  With a fixed :attr:`timestep`,
+        the frame time is added to an accumulator and one step is returned for every 
+        whole timestep in it (up to :attr:`maxsteps`).  The input is stepped with 
+        every update, so a key press is seen by the first update after it happens, 
+        even if that is a later frame.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        
+        :return: The time steps to update with, in order
+        :rtype:  ``tuple`` of numbers
+        """
+        if self._timestep is None:
+            return (dt,)
+        self._backlog += dt
+        steps = min(int(self._backlog // self._timestep),self._maxsteps)
+        self._backlog -= steps*self._timestep
+        if self._backlog >= self._timestep:
+            self._backlog = self._backlog % self._timestep
+        return (self._timestep,)*steps
     
     def _setpaths(self):
         """
@@ -476,7 +731,10 @@ class GameApp(kivy.app.App):
     def _exit(self, *args):
         """
         Prepare this application for shutdown
+        
+        This saves the frame profile (if any) before calling :meth:`cleanup`.
         """
+        self._dump_profile()
         self.cleanup()
         return False
         
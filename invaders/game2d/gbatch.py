@@ -0,0 +1,320 @@
+"""
+A module to draw many sprites with a single mesh.
+
+Every :class:`GImage` has its own chain of Kivy instructions (the transform, a color
+and a rectangle), so a thousand images cost thousands of canvas instructions.  A
+:class:`GSpriteBatch` holds many quads that share one texture, and draws them all with
+one ``Mesh``.  The quads are not objects: their centers, sizes, visibility and texture
+regions are kept in NumPy arrays, and the vertices of the mesh are computed from these
+arrays in a few vectorized operations whenever they change.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from introcs.geom import Point2
+from .gobject import GObject, VALIDATE, _apply, is_num_tuple
+from .app import GameApp
+
+import numpy as np
+
+# A Kivy mesh has 16-bit indices, so it holds at most this many quads
+MESH_QUADS = 16384
+
+# The two triangles of a quad, as indices of its four corners
+_QUAD = np.array([0,1,2,2,3,0])
+
+# The indices of a full mesh; a mesh of n quads uses the first 6n of them
+_INDICES = (np.arange(MESH_QUADS)[:,np.newaxis]*4+_QUAD).astype(np.uint16).ravel()
+
+
+# #mark -
+class GSpriteBatch(GObject):
+    """
+    A class representing many quads that share one texture, drawn with one mesh.
+
+    The batch has a fixed :attr:`capacity`.  Each quad is identified by its index, and
+    has a center, a size, a visibility flag and the region of the texture it shows.  All
+    quads start hidden, with a size of 0 and the whole texture as their region.  Change
+    them with :meth:`place`, :meth:`show`, :meth:`hide` and :meth:`crop`; each of them
+    takes an index, a slice, an array of indices or a mask, so that a whole group of
+    quads is changed at once.
+
+    The quad coordinates are relative to the batch, which is itself a :class:`GObject`.
+    Moving, rotating or scaling the batch moves all of its quads (without recomputing
+    their vertices).  If ``source`` is None, the quads are solid rectangles of the
+    ``fillcolor``.  Otherwise the ``fillcolor`` tints the texture, as in :class:`GImage`.
+    A batch without a ``fillcolor`` is drawn in white.
+
+    Only the visible quads are sent to the mesh.  A batch with more than
+    :data:`MESH_QUADS` visible quads is split into several meshes of one instruction
+    group.
+    """
+    __slots__ = ('_source','_texture','_xs','_ys','_widths','_heights','_visible',
+                 '_regions','_meshes')
+
+    # MUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file of the texture shared by the quads.
+
+        **invariant**. Value is None or a string refering to a valid file.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        if VALIDATE:
+            assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        self._source = value
+        self._texture = None
+        if self._defined:
+            self._invalidate()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The number of quads in this batch.
+
+        *This attribute may not be changed.*
+        """
+        return len(self._visible)
+
+    @property
+    def count(self):
+        """
+        The number of visible quads.
+
+        *This attribute may not be changed.*
+        """
+        return int(np.count_nonzero(self._visible))
+
+    # BUILT-IN METHODS
+    def __init__(self,capacity,**keywords):
+        """
+        Creates a new batch of ``capacity`` hidden quads.
+
+        To use the constructor for this class, you should provide it with the capacity
+        and a list of keyword arguments that initialize various attributes.  For
+        example, to make a batch of 150 aliens, use the constructor call::
+
+            GSpriteBatch(150,source='alien1.png')
+
+        This class supports the same keywords as :class:`GObject`, as well as the
+        ``source`` of the texture.
+
+        :param capacity: The number of quads
+        :type capacity:  ``int`` >= 0
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        assert type(capacity) == int and capacity >= 0, '%s is not a valid capacity' % repr(capacity)
+        self._defined = False
+        self._texture = None
+        self._meshes = []
+        self._xs = np.zeros(capacity)
+        self._ys = np.zeros(capacity)
+        self._widths  = np.zeros(capacity)
+        self._heights = np.zeros(capacity)
+        self._visible = np.zeros(capacity,dtype=bool)
+        self._regions = np.tile([0.0,0.0,1.0,1.0],(capacity,1))
+        self.source = keywords['source'] if 'source' in keywords else None
+        GObject.__init__(self,**keywords)
+        self._defined = True
+
+    # PUBLIC METHODS
+    def place(self,x,y,width=None,height=None,start=0):
+        """
+        Moves (and optionally resizes) consecutive quads, starting at ``start``.
+
+        The arguments are broadcast against each other, so a single width and height
+        may be given for all of the quads.  The number of quads changed is the length
+        of the broadcast arrays.  A width or height of None leaves the size unchanged.
+        This does not change the visibility of the quads.
+
+        :param x: The x-coordinates of the centers
+        :type x:  ``float`` or array of ``float``
+
+        :param y: The y-coordinates of the centers
+        :type y:  ``float`` or array of ``float``
+
+        :param width: The widths of the quads
+        :type width:  ``None``, ``float`` >= 0 or array of ``float`` >= 0
+
+        :param height: The heights of the quads
+        :type height:  ``None``, ``float`` >= 0 or array of ``float`` >= 0
+
+        :param start: The index of the first quad to change
+        :type start:  ``int`` >= 0
+        """
+        args  = [x,y] + [value for value in (width,height) if not value is None]
+        count = np.broadcast(*args).size
+        if VALIDATE:
+            assert 0 <= start and start+count <= self.capacity, \
+                'quads %d..%d are not in the batch' % (start,start+count-1)
+        span = slice(start,start+count)
+        self._xs[span] = x
+        self._ys[span] = y
+        if not width is None:
+            self._widths[span] = width
+        if not height is None:
+            self._heights[span] = height
+        if self._defined:
+            self._invalidate()
+
+    def show(self,index,visible=True):
+        """
+        Shows (or hides) the given quads.
+
+        :param index: The quads to change
+        :type index:  ``int``, ``slice``, array of ``int`` or mask of ``bool``
+
+        :param visible: Whether the quads are visible
+        :type visible:  ``bool`` or array of ``bool``
+        """
+        self._visible[index] = visible
+        if self._defined:
+            self._invalidate()
+
+    def hide(self,index):
+        """
+        Hides the given quads.
+
+        :param index: The quads to hide
+        :type index:  ``int``, ``slice``, array of ``int`` or mask of ``bool``
+        """
+        self.show(index,False)
+
+    def crop(self,index,left,bottom,right,top):
+        """
+        Sets the region of the texture shown by the given quads.
+
+        The region is given as fractions of the size of the texture, with the origin
+        at the bottom left corner.  The whole texture is (0,0,1,1).  For a filmstrip
+        (see :class:`GSprite`) this selects the frame of each quad.
+
+        :param index: The quads to change
+        :type index:  ``int``, ``slice``, array of ``int`` or mask of ``bool``
+
+        :param left: The left edge of the region
+        :type left:  ``float`` or array of ``float``
+
+        :param bottom: The bottom edge of the region
+        :type bottom:  ``float`` or array of ``float``
+
+        :param right: The right edge of the region
+        :type right:  ``float`` or array of ``float``
+
+        :param top: The top edge of the region
+        :type top:  ``float`` or array of ``float``
+        """
+        self._regions[index,0] = left
+        self._regions[index,1] = bottom
+        self._regions[index,2] = right
+        self._regions[index,3] = top
+        if self._defined:
+            self._invalidate()
+
+    def contains(self,point):
+        """
+        Checks whether a visible quad of this batch contains the point
+
+        :param point: the point to check
+        :type point: :class:`Point2` or a pair of numbers
+
+        :return: True if a visible quad contains this point
+        :rtype:  ``bool``
+        """
+        if isinstance(point,Point2):
+            point = (point.x,point.y)
+        assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+
+        (x, y) = _apply(self.inverse,point[0],point[1])
+        inside = (np.abs(x-self._xs) < self._widths/2.0) & (np.abs(y-self._ys) < self._heights/2.0)
+        return bool(np.any(inside & self._visible))
+
+    # HIDDEN METHODS
+    def _vertices(self):
+        """
+        Returns the vertices of the visible quads as a (count,4,4) float array.
+
+        Each quad has its corners in the order bottom left, bottom right, top right
+        and top left, and each corner is (x, y, u, v).
+        """
+        shown = np.flatnonzero(self._visible)
+        verts = np.zeros((len(shown),4,4),dtype=np.float32)
+        x  = self._xs[shown]
+        y  = self._ys[shown]
+        hw = self._widths[shown]/2.0
+        hh = self._heights[shown]/2.0
+        verts[:,(0,3),0] = (x-hw)[:,np.newaxis]
+        verts[:,(1,2),0] = (x+hw)[:,np.newaxis]
+        verts[:,(0,1),1] = (y-hh)[:,np.newaxis]
+        verts[:,(2,3),1] = (y+hh)[:,np.newaxis]
+
+        if not self._texture is None:
+            # Map the regions through the texture coordinates (which may be flipped)
+            coords = self._texture.tex_coords
+            (u0, v0) = coords[0:2]
+            du = coords[2]-u0
+            dv = coords[7]-v0
+            region = self._regions[shown]
+            verts[:,(0,3),2] = (u0+region[:,0]*du)[:,np.newaxis]
+            verts[:,(1,2),2] = (u0+region[:,2]*du)[:,np.newaxis]
+            verts[:,(0,1),3] = (v0+region[:,1]*dv)[:,np.newaxis]
+            verts[:,(2,3),3] = (v0+region[:,3]*dv)[:,np.newaxis]
+        return verts
+
+    def _chunks(self):
+        """
+        Returns the vertex and index arrays of the meshes, one pair per mesh.
+
+        The arrays are given to the meshes as they are: Kivy reads the float32 and
+        uint16 buffers directly, so no Python lists are made.  The vertices are new
+        arrays on every call, and the indices are views of :data:`_INDICES`, which
+        never changes.
+        """
+        verts  = self._vertices()
+        result = []
+        for start in range(0,len(verts),MESH_QUADS):
+            chunk = verts[start:start+MESH_QUADS]
+            result.append((chunk.reshape(-1),_INDICES[:len(chunk)*6]))
+        return result
+
+    def _update(self):
+        """
+        Updates the drawing cache in place, or returns False if it must be rebuilt.
+        """
+        if (self._source is None) != (self._texture is None):
+            return False
+        chunks = self._chunks()
+        if len(chunks) != len(self._meshes):
+            return False
+        self._fillpaint.rgba = (1,1,1,1) if self._fillcolor is None else self._fillcolor
+        for (mesh, (verts, indices)) in zip(self._meshes,chunks):
+            mesh.vertices = verts
+            mesh.indices  = indices
+        return True
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._texture = None if self._source is None else GameApp.load_texture(self._source)
+        self._meshes = []
+        if not self._fillcolor is None:
+            self._fillpaint = Color(*self._fillcolor)
+        else:
+            self._fillpaint = Color(1,1,1)
+        self._cache.add(self._fillpaint)
+        for (verts, indices) in self._chunks():
+            if self._texture is None:
+                mesh = Mesh(vertices=verts,indices=indices,mode='triangles')
+            else:
+                mesh = Mesh(vertices=verts,indices=indices,mode='triangles',
+                            texture=self._texture)
+            self._meshes.append(mesh)
+            self._cache.add(mesh)
+        self._cache.add(PopMatrix())
@@ -0,0 +1,273 @@
+"""
+Vectorized collision tests for 2D games.
+
+This module tests many moving objects against many boxes at once with NumPy.  It does
+not import Kivy, so it can be used by simulations that never open a window.
+
+Objects that move a long way in one animation frame can pass through a target without
+ever overlapping it at the end of a frame.  The tests here are *swept*: they treat the
+motion of the object over the frame as a segment from its old center to its new one,
+and find the first moment along that segment at which the object touches a box.  The
+size of the moving object is handled by growing every box by the object's half width
+and half height, so the segment test is exact for axis-aligned rectangles.
+
+When both sides move (such as two groups of bullets), :func:`intercept` first finds
+the candidate pairs with a sort-and-sweep on x (:func:`overlap_pairs`) and then sweeps
+their relative motion.
+"""
+import numpy as np
+
+
+def sweep(x0,y0,dx,dy,left,bottom,right,top):
+    """
+    Returns the times at which moving points first enter boxes.
+
+    Each point moves from ``(x0,y0)`` to ``(x0+dx,y0+dy)`` over one step.  The result is
+    the fraction of the step (between 0 and 1) at which the point enters the box, or
+    ``inf`` if it does not enter the box during the step.  A point that starts inside
+    a box enters it at time 0.  The edges are not part of a box: a point that only
+    touches an edge (or slides along it) does not enter it, as in :func:`intercept`.
+
+    All of the arguments are broadcast against each other in the usual NumPy way.  In
+    particular, to test N points against M boxes, give the point arguments the shape
+    (N,1) and the box arguments the shape (M,).  The result then has shape (N,M).
+
+    :param x0: The starting x-coordinates
+    :type x0:  ``float`` or array of ``float``
+
+    :param y0: The starting y-coordinates
+    :type y0:  ``float`` or array of ``float``
+
+    :param dx: The horizontal displacements
+    :type dx:  ``float`` or array of ``float``
+
+    :param dy: The vertical displacements
+    :type dy:  ``float`` or array of ``float``
+
+    :param left: The left edges of the boxes
+    :type left:  ``float`` or array of ``float``
+
+    :param bottom: The bottom edges of the boxes
+    :type bottom:  ``float`` or array of ``float``
+
+    :param right: The right edges of the boxes
+    :type right:  ``float`` or array of ``float`` >= left
+
+    :param top: The top edges of the boxes
+    :type top:  ``float`` or array of ``float`` >= bottom
+
+    :return: The entry time of each point into each box
+    :rtype:  ``numpy.ndarray`` of ``float``
+    """
+    enter = np.zeros(np.broadcast(x0,y0,dx,dy,left,bottom,right,top).shape)
+    leave = np.ones(enter.shape)
+    for (p, d, low, high) in ((x0,dx,left,right),(y0,dy,bottom,top)):
+        p = np.asarray(p,dtype=float)
+        d = np.asarray(d,dtype=float)
+        moving = d != 0
+        # Points that do not move on this axis must already be inside the slab
+        outside = ~moving & ((p <= low) | (p >= high))
+        with np.errstate(divide='ignore',invalid='ignore'):
+            t0 = (low - p)/d
+            t1 = (high - p)/d
+        near = np.where(moving,np.minimum(t0,t1),-np.inf)
+        far  = np.where(moving,np.maximum(t0,t1),np.inf)
+        enter = np.maximum(enter,near)
+        leave = np.minimum(leave,far)
+        leave = np.where(outside,-np.inf,leave)
+    return np.where(enter < leave,enter,np.inf)
+
+
+def sweep_boxes(x0,y0,dx,dy,width,height,left,bottom,right,top):
+    """
+    Returns the earliest box hit by each of N moving rectangles.
+
+    Each rectangle has the given ``width`` and ``height`` and its center moves from
+    ``(x0,y0)`` to ``(x0+dx,y0+dy)`` over one step.  It is tested against all M boxes,
+    and the first box it overlaps (the one with the smallest entry time) is reported.
+    Touching the edge of a box is not a hit.
+
+    The result is a pair of arrays of length N.  The first holds the index of the box
+    that each rectangle hits first, or -1 if it hits nothing.  The second holds the
+    entry time (a fraction of the step) of that hit, or ``inf`` if there is none.
+
+    :param x0: The starting x-coordinates of the centers
+    :type x0:  array of N ``float``
+
+    :param y0: The starting y-coordinates of the centers
+    :type y0:  array of N ``float``
+
+    :param dx: The horizontal displacements
+    :type dx:  ``float`` or array of N ``float``
+
+    :param dy: The vertical displacements
+    :type dy:  ``float`` or array of N ``float``
+
+    :param width: The width of the moving rectangles
+    :type width:  ``float`` >= 0
+
+    :param height: The height of the moving rectangles
+    :type height:  ``float`` >= 0
+
+    :param left: The left edges of the boxes
+    :type left:  array of M ``float``
+
+    :param bottom: The bottom edges of the boxes
+    :type bottom:  array of M ``float``
+
+    :param right: The right edges of the boxes
+    :type right:  array of M ``float``
+
+    :param top: The top edges of the boxes
+    :type top:  array of M ``float``
+
+    :return: The index and entry time of the first hit of each rectangle
+    :rtype:  ``tuple`` of two ``numpy.ndarray``
+    """
+    x0 = np.asarray(x0,dtype=float)
+    count = x0.shape[0]
+    left = np.asarray(left,dtype=float)
+    if left.shape[0] == 0 or count == 0:
+        return (np.full(count,-1,dtype=np.intp),np.full(count,np.inf))
+
+    hw = width/2
+    hh = height/2
+    times = sweep(x0[:,np.newaxis],np.asarray(y0,dtype=float)[:,np.newaxis],
+                  np.reshape(dx,(-1,1)),np.reshape(dy,(-1,1)),
+                  left-hw,np.asarray(bottom,dtype=float)-hh,
+                  np.asarray(right,dtype=float)+hw,np.asarray(top,dtype=float)+hh)
+    index = np.argmin(times,axis=1)
+    first = times[np.arange(count),index]
+    index = np.where(np.isfinite(first),index,-1)
+    return (index,first)
+
+
+def overlap_pairs(xa,xb,reach):
+    """
+    Returns every pair (i,j) with ``abs(xa[i]-xb[j]) < reach``.
+
+    This is a sort-and-sweep on one axis, done with array operations.  The values of
+    ``xb`` are sorted once, and the window of values near each ``xa[i]`` is found by
+    binary search, so the work is proportional to (N+M) log M plus the number of
+    pairs, instead of N*M.
+
+    The result is a pair of int arrays of the same length: the indices into ``xa``
+    and the matching indices into ``xb``.  The pairs are ordered by ``i`` and then by
+    the value of ``xb[j]``.
+
+    :param xa: The first set of coordinates
+    :type xa:  array of N ``float``
+
+    :param xb: The second set of coordinates
+    :type xb:  array of M ``float``
+
+    :param reach: The distance below which two coordinates overlap
+    :type reach:  ``float`` > 0
+
+    :return: The indices of the overlapping pairs
+    :rtype:  ``tuple`` of two ``numpy.ndarray``
+    """
+    xa = np.asarray(xa,dtype=float)
+    xb = np.asarray(xb,dtype=float)
+    if len(xa) == 0 or len(xb) == 0:
+        empty = np.zeros(0,dtype=np.intp)
+        return (empty,empty.copy())
+
+    order  = np.argsort(xb,kind='stable')
+    ordered = xb[order]
+    low    = np.searchsorted(ordered,xa-reach,side='right')
+    high   = np.searchsorted(ordered,xa+reach,side='left')
+    counts = np.maximum(high-low,0)
+    total  = int(counts.sum())
+
+    first = np.repeat(np.arange(len(xa)),counts)
+    # Position of each pair within the window of its first index
+    start  = np.repeat(np.cumsum(counts)-counts,counts)
+    offset = np.arange(total)-start
+    second = order[np.repeat(low,counts)+offset]
+    return (first,second)
+
+
+def intercept(xa,ya,dya,xb,yb,dyb,width,height):
+    """
+    Returns the pairs of vertically moving rectangles that met during one step.
+
+    There are two groups of rectangles, all of the given ``width`` and ``height``.
+    Each rectangle is at its position *after* the step and moved vertically by its
+    displacement during the step.  A rectangle of the first group and one of the
+    second meet if they overlapped at any moment of the step; since they only move
+    vertically, rectangles moving towards each other cannot pass through each other
+    unseen.
+
+    The candidate pairs come from :func:`overlap_pairs` on the x-coordinates, and
+    the vertical test is a sweep of their relative motion.  Every rectangle is in
+    at most one of the returned pairs: the pairs are matched in the order they met,
+    and a rectangle that already met another is skipped.  As in :func:`overlap_pairs`,
+    rectangles that only touch at an edge do not meet.
+
+    The result is three arrays of the same length: the indices into the first group,
+    the indices into the second group, and the time of each meeting as a fraction
+    of the step (in increasing order).
+
+    :param xa: The x-coordinates of the first group
+    :type xa:  array of N ``float``
+
+    :param ya: The y-coordinates of the first group
+    :type ya:  array of N ``float``
+
+    :param dya: The vertical displacements of the first group
+    :type dya:  array of N ``float``
+
+    :param xb: The x-coordinates of the second group
+    :type xb:  array of M ``float``
+
+    :param yb: The y-coordinates of the second group
+    :type yb:  array of M ``float``
+
+    :param dyb: The vertical displacements of the second group
+    :type dyb:  array of M ``float``
+
+    :param width: The width of every rectangle
+    :type width:  ``float`` > 0
+
+    :param height: The height of every rectangle
+    :type height:  ``float`` > 0
+
+    :return: The matched pairs and the times they met
+    :rtype:  ``tuple`` of three ``numpy.ndarray``
+    """
+    first, second = overlap_pairs(xa,xb,width)
+    if len(first) == 0:
+        return (first,second,np.zeros(0))
+
+    ya  = np.asarray(ya,dtype=float)
+    yb  = np.asarray(yb,dtype=float)
+    dya = np.asarray(dya,dtype=float)
+    dyb = np.asarray(dyb,dtype=float)
+    # The offset of a from b at the start of the step, and how it changes
+    start = (ya[first]-dya[first])-(yb[second]-dyb[second])
+    move  = dya[first]-dyb[second]
+    times = sweep(0.0,start,0.0,move,-1.0,-height,1.0,height)
+
+    hit = np.flatnonzero(np.isfinite(times))
+    if len(hit) == 0:
+        return (first[:0],second[:0],times[:0])
+    hit = hit[np.argsort(times[hit],kind='stable')]
+    first  = first[hit]
+    second = second[hit]
+    times  = times[hit]
+    if len(np.unique(first)) == len(first) and len(np.unique(second)) == len(second):
+        return (first,second,times)
+
+    # Rare: a rectangle met several others; keep the earliest of each
+    keep  = []
+    useda = set()
+    usedb = set()
+    for k in range(len(first)):
+        i = int(first[k])
+        j = int(second[k])
+        if not i in useda and not j in usedb:
+            useda.add(i)
+            usedb.add(j)
+            keep.append(k)
+    return (first[keep],second[keep],times[keep])
@@ -4,14 +4,27 @@ The base classes for 2D game support.
 This module provides the base drawable class, as well as simple scene graph support.
 These classes will not work unless you adhere to proper subclassing practices.
 
+The property setters of all drawables check their values with assertions.  These
+checks are skipped in production mode, so that setting an attribute such as ``x``
+costs little more than the store itself.  Production mode is selected when the
+package is first imported, either by running Python with ``-O`` or by setting the
+environment variable ``GAME2D_PRODUCTION`` to anything but ``0`` or the empty string.
+
 
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from introcs.geom import Point2, Matrix
+from introcs.geom import Point2
 import introcs
+import contextlib
+import math
+import os
+import numpy as np
+
+# Whether the property setters check their values (False in production mode)
+VALIDATE = __debug__ and os.environ.get('GAME2D_PRODUCTION','0') in ('','0')
 
 def is_color(c):
     """
@@ -60,6 +73,100 @@ def is_num_tuple(t,size):
         return False
 
 
+def stack_matrices(objects,inverse=False):
+    """
+    Returns the transformation matrices of many objects as one array.
+
+    The result has shape (N,3,3), with the matrix of ``objects[i]`` (or its inverse)
+    in row i.  These are the same matrices as the :attr:`GObject.matrix` and
+    :attr:`GObject.inverse` attributes, but they are computed together from the
+    positions, angles and scales of the objects, instead of one object at a time.
+    This allows code such as a hit test to transform a point into the coordinate
+    systems of many objects with a single array operation::
+
+        local = stack_matrices(shapes,True) @ np.array([x,y,1.0])
+
+    :param objects: The objects to stack
+    :type objects:  sequence of :class:`GObject`
+
+    :param inverse: Whether to stack the inverse matrices
+    :type inverse:  ``bool``
+
+    :return: The stacked transformation matrices
+    :rtype:  ``numpy.ndarray`` of shape (N,3,3)
+    """
+    values = np.array([(g._x,g._y,g._angle,g._sx,g._sy)
+                       for g in objects],dtype=float).reshape(-1,5)
+    return _affine(values[:,0],values[:,1],values[:,2],values[:,3],values[:,4],inverse)
+
+
+def _affine(x,y,angle,sx,sy,inverse=False):
+    """
+    Returns the affine matrices translating by (x,y) after a rotation and a scale.
+
+    The arguments may be numbers or arrays of the same length N.  For arrays, the
+    result has shape (N,3,3).  The matrix of a :class:`GObject` scales first, then
+    rotates by ``angle`` degrees about the origin, and then translates, which is the
+    order of its Kivy transforms.
+
+    :param inverse: Whether to return the inverse matrices instead
+    :type inverse:  ``bool``
+    """
+    radians = np.radians(angle)
+    c = np.cos(radians)
+    s = np.sin(radians)
+    result = np.zeros(np.shape(radians)+(3,3))
+    result[...,2,2] = 1.0
+    if inverse:
+        # Undo the translation, then the rotation, then the scale
+        result[...,0,0] =  c/sx
+        result[...,0,1] =  s/sx
+        result[...,1,0] = -s/sy
+        result[...,1,1] =  c/sy
+        result[...,0,2] = -(c*x+s*y)/sx
+        result[...,1,2] =  (s*x-c*y)/sy
+    else:
+        result[...,0,0] =  c*sx
+        result[...,0,1] = -s*sy
+        result[...,1,0] =  s*sx
+        result[...,1,1] =  c*sy
+        result[...,0,2] = x
+        result[...,1,2] = y
+    return result
+
+
+def _apply(matrix,x,y):
+    """
+    Returns the point (x,y) transformed by a 3x3 affine matrix, as a pair.
+    """
+    return (matrix[0,0]*x+matrix[0,1]*y+matrix[0,2],
+            matrix[1,0]*x+matrix[1,1]*y+matrix[1,2])
+
+
+def _shared(value):
+    """
+    Returns a value equal to ``value`` that is shared by every drawable using it.
+
+    Most drawables take their sizes and colors from a few constants, so the setters
+    keep one float or color tuple per distinct value instead of one per object.  Only
+    the first :data:`_SHARED_LIMIT` values are shared; later ones are returned as is.
+
+    :param value: The value to share
+    :type value:  ``float`` or ``tuple``
+    """
+    found = _SHARED.get(value)
+    if found is None:
+        if len(_SHARED) >= _SHARED_LIMIT:
+            return value
+        _SHARED[value] = value
+        found = value
+    return found
+
+# The values shared by the drawables (see _shared), and the most it holds
+_SHARED = {}
+_SHARED_LIMIT = 4096
+
+
 def is_gobject_list(g):
     """
     Checks whether a value is a a sequence of :class:`GObject`
@@ -90,6 +197,14 @@ class GObject(object):
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`,
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
     """
+    # The attributes of every drawable; there is no per-object dictionary
+    __slots__ = ('_x','_y','_angle','_sx','_sy','_trans','_rotate','_scale',
+                 '_matrix','_invrse','_mtrue','_width','_height','_set_width',
+                 '_set_height','_linecolor','_fillcolor','_name','_defined',
+                 '_cache','_stale','_updating','_fillpaint','_fillshape',
+                 '_linepaint','_lineshape','__weakref__')
+    # The attributes that can change without rebuilding the drawing cache
+    _TRANSFORM_KEYS = ('x','y','left','right','top','bottom','angle','scale','name')
 
     # MUTABLE PROPERTIES
     @property
@@ -99,12 +214,15 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._trans.x
+        return self._x
 
     @x.setter
     def x(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        self._trans.x = float(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._x = float(value)
+        if not self._trans is None:
+            self._trans.x = self._x
         self._mtrue = False
 
     @property
@@ -114,12 +232,15 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._trans.y
+        return self._y
 
     @y.setter
     def y(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        self._trans.y = float(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._y = float(value)
+        if not self._trans is None:
+            self._trans.y = self._y
         self._mtrue = False
 
     @property
@@ -135,12 +256,13 @@ class GObject(object):
 
     @width.setter
     def width(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        assert value > 0, '%s is not positive' % repr(value)
-        self._width = float(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+            assert value > 0, '%s is not positive' % repr(value)
+        self._width = _shared(float(value))
         self._set_width = True
         if self._defined:
-            self._reset()
+            self._invalidate()
 
     @property
     def height(self):
@@ -155,12 +277,13 @@ class GObject(object):
 
     @height.setter
     def height(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        assert value > 0, '%s is not positive' % repr(value)
-        self._height = float(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+            assert value > 0, '%s is not positive' % repr(value)
+        self._height = _shared(float(value))
         self._set_height = True
         if self._defined:
-            self._reset()
+            self._invalidate()
 
     @property
     def scale(self):
@@ -177,19 +300,23 @@ class GObject(object):
 
         **invariant**: Value must be either a number (``int`` or ``float``) or a pair of numbers.
         """
-        return (self._scale.x,self._scale.y)
+        return (self._sx,self._sy)
 
     @scale.setter
     def scale(self,value):
         # Do some checking here
-        assert type(value) in [int,float] or is_num_tuple(value,2), \
-                '%s is not a valid scaling factor' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float] or is_num_tuple(value,2), \
+                    '%s is not a valid scaling factor' % repr(value)
         if type(value) in [int,float]:
-            self._scale.x = float(value)
-            self._scale.y = float(value)
+            self._sx = float(value)
+            self._sy = float(value)
         else:
-            self._scale.x = float(value[0])
-            self._scale.y = float(value[1])
+            self._sx = float(value[0])
+            self._sy = float(value[1])
+        if not self._scale is None:
+            self._scale.x = self._sx
+            self._scale.y = self._sy
         self._mtrue = False
 
     @property
@@ -201,15 +328,17 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._rotate.angle
+        return self._angle
 
     @angle.setter
     def angle(self,value):
-        import numpy as np
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = np.allclose([self._rotate.angle],[value])
-        self._rotate.angle = float(value)
-        if not diff:
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+        same = math.isclose(value,self._angle,rel_tol=1e-5,abs_tol=1e-8)
+        self._angle = float(value)
+        if not self._rotate is None:
+            self._rotate.angle = self._angle
+        if not same:
             self._mtrue = False
 
     @property
@@ -229,12 +358,13 @@ class GObject(object):
 
         **invariant**: Value must be ``None`` or a 4-element list of floats between 0 and 1.
         """
-        return None if self._linecolor is None else self._linecolor.rgba
+        return None if self._linecolor is None else list(self._linecolor)
 
     @linecolor.setter
     def linecolor(self,value):
         import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
+        if VALIDATE:
+            assert value is None or is_color(value), '%s is not a valid color' % repr(value)
         if type(value) in [tuple, list] and len(value) == 3:
             value = list(value)+[1.0]
         elif type(value) in [introcs.RGB, introcs.HSV]:
@@ -245,9 +375,9 @@ class GObject(object):
             else:
                 value = introcs.RGB.CreateName(value).glColor()
 
-        self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        self._linecolor = None if value is None else _shared(tuple(value[:4]))
         if self._defined:
-            self._reset()
+            self._invalidate()
 
     @property
     def fillcolor(self):
@@ -267,12 +397,13 @@ class GObject(object):
 
         **invariant**: Value must be ``None`` or a 4-element list of floats between 0 and 1.
         """
-        return None if self._fillcolor is None else self._fillcolor.rgba
+        return None if self._fillcolor is None else list(self._fillcolor)
 
     @fillcolor.setter
     def fillcolor(self,value):
         import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
+        if VALIDATE:
+            assert value is None or is_color(value), '%s is not a valid color' % repr(value)
         if type(value) in [tuple, list] and len(value) == 3:
             value = list(value)+[1.0]
         elif type(value) in [introcs.RGB, introcs.HSV]:
@@ -283,9 +414,9 @@ class GObject(object):
             else:
                 value = introcs.RGB.CreateName(value).glColor()
 
-        self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        self._fillcolor = None if value is None else _shared(tuple(value[:4]))
         if self._defined:
-            self._reset()
+            self._invalidate()
 
     @property
     def name(self):
@@ -302,7 +433,8 @@ class GObject(object):
 
     @name.setter
     def name(self,value):
-        assert value is None or type(value) == str, '%s is not a valid name' % repr(value)
+        if VALIDATE:
+            assert value is None or type(value) == str, '%s is not a valid name' % repr(value)
         self._name = value
 
     # DERIVED PROPERTIES
@@ -322,24 +454,21 @@ class GObject(object):
         **invariant**: Value must be an ``int`` or ``float``.
         """
         # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.x-self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 180:
-            return self.x-self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 90.0:
-            return self.x-self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 270:
-            return self.x-self._scale.y*self.height/2.0
+        if (self._angle % 360) == 0.0:
+            return self.x-self._sx*self.width/2.0
+        elif (self._angle % 360) == 180:
+            return self.x-self._sx*self.width/2.0
+        elif (self._angle % 360) == 90.0:
+            return self.x-self._sy*self.height/2.0
+        elif (self._angle % 360) == 270:
+            return self.x-self._sy*self.height/2.0
         
-        p0 = tuple(self.matrix._transform(-self.width/2.0, -self.height/2.0))[0]
-        p1 = tuple(self.matrix._transform( self.width/2.0, -self.height/2.0))[0]
-        p2 = tuple(self.matrix._transform( self.width/2.0,  self.height/2.0))[0]
-        p3 = tuple(self.matrix._transform(-self.width/2.0,  self.height/2.0))[0]
-        return min(p0,p1,p2,p3)
+        return float(self._corners()[0].min())
 
     @left.setter
     def left(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
         diff = value-self.left
         self.x += diff
 
@@ -359,24 +488,21 @@ class GObject(object):
         **invariant**: Value must be an ``int`` or ``float``.
         """
         # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.x+self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 180:
-            return self.x+self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 90.0:
-            return self.x+self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 270:
-            return self.x+self._scale.y*self.height/2.0
+        if (self._angle % 360) == 0.0:
+            return self.x+self._sx*self.width/2.0
+        elif (self._angle % 360) == 180:
+            return self.x+self._sx*self.width/2.0
+        elif (self._angle % 360) == 90.0:
+            return self.x+self._sy*self.height/2.0
+        elif (self._angle % 360) == 270:
+            return self.x+self._sy*self.height/2.0
         
-        p0 = tuple(self.matrix._transform(-self.width/2.0, -self.height/2.0))[0]
-        p1 = tuple(self.matrix._transform( self.width/2.0, -self.height/2.0))[0]
-        p2 = tuple(self.matrix._transform( self.width/2.0,  self.height/2.0))[0]
-        p3 = tuple(self.matrix._transform(-self.width/2.0,  self.height/2.0))[0]
-        return max(p0,p1,p2,p3)
+        return float(self._corners()[0].max())
 
     @right.setter
     def right(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
         diff = value-self.right
         self.x += diff
 
@@ -396,24 +522,21 @@ class GObject(object):
         **invariant**: Value must be an ``int`` or ``float``.
         """
         # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.y+self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 180:
-            return self.y+self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 90.0:
-            return self.y+self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 270:
-            return self.y+self._scale.x*self.width/2.0
+        if (self._angle % 360) == 0.0:
+            return self.y+self._sy*self.height/2.0
+        elif (self._angle % 360) == 180:
+            return self.y+self._sy*self.height/2.0
+        elif (self._angle % 360) == 90.0:
+            return self.y+self._sx*self.width/2.0
+        elif (self._angle % 360) == 270:
+            return self.y+self._sx*self.width/2.0
         
-        p0 = tuple(self.matrix._transform(-self.width/2.0, -self.height/2.0))[1]
-        p1 = tuple(self.matrix._transform( self.width/2.0, -self.height/2.0))[1]
-        p2 = tuple(self.matrix._transform( self.width/2.0,  self.height/2.0))[1]
-        p3 = tuple(self.matrix._transform(-self.width/2.0,  self.height/2.0))[1]
-        return max(p0,p1,p2,p3)
+        return float(self._corners()[1].max())
 
     @top.setter
     def top(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
         diff = value-self.top
         self.y += diff
 
@@ -433,24 +556,21 @@ class GObject(object):
         **invariant**: Value must be an ``int`` or ``float``.
         """
         # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.y-self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 180:
-            return self.y-self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 90.0:
-            return self.y-self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 270:
-            return self.y-self._scale.x*self.width/2.0
+        if (self._angle % 360) == 0.0:
+            return self.y-self._sy*self.height/2.0
+        elif (self._angle % 360) == 180:
+            return self.y-self._sy*self.height/2.0
+        elif (self._angle % 360) == 90.0:
+            return self.y-self._sx*self.width/2.0
+        elif (self._angle % 360) == 270:
+            return self.y-self._sx*self.width/2.0
         
-        p0 = tuple(self.matrix._transform(-self.width/2.0, -self.height/2.0))[1]
-        p1 = tuple(self.matrix._transform( self.width/2.0, -self.height/2.0))[1]
-        p2 = tuple(self.matrix._transform( self.width/2.0,  self.height/2.0))[1]
-        p3 = tuple(self.matrix._transform(-self.width/2.0,  self.height/2.0))[1]
-        return min(p0,p1,p2,p3)
+        return float(self._corners()[1].min())
 
     @bottom.setter
     def bottom(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
         diff = value-self.bottom
         self.y += diff
 
@@ -461,10 +581,12 @@ class GObject(object):
         """
         The transformation matrix for this object
 
-        This value is constructed dynamically as needed.  It should only be used
-        internally in this package
+        This is a 3x3 affine matrix taking the local coordinates of this object to
+        the coordinates of its parent.  It is built as needed and kept until the
+        position, angle or scale changes.  It should only be used internally in
+        this package, and it should not be modified.
 
-        **invariant**: Either a :class:`Matrix` or ``None``
+        **invariant**: A 3x3 ``numpy.ndarray``
         """
         if not self._mtrue or self._matrix is None:
             self._build_matrix()
@@ -475,13 +597,17 @@ class GObject(object):
         """
         The inverse transformation matrix for this object
 
-        This value is constructed dynamically as needed.  It should only be used
-        internally in this package
+        This is built as needed and kept until the position, angle or scale changes.
+        It should only be used internally in this package, and it should not be
+        modified.
 
-        **invariant**: Either a :class:`Matrix` or ``None``
+        **invariant**: A 3x3 ``numpy.ndarray``
         """
         if not self._mtrue or self._matrix is None:
             self._build_matrix()
+        if self._invrse is None:
+            self._invrse = _affine(self._x,self._y,self._angle,
+                                   self._sx,self._sy,True)
         return self._invrse
 
 
@@ -508,12 +634,26 @@ class GObject(object):
         """
         # Set the properties.
         self._defined = False
-
-        # Create the Kivy transforms for position and size
-        self._trans  = Translate(0,0,0)
-        self._rotate = Rotate(angle=0,axis=(0,0,1))
-        #self._scale  = Scale(1,1,1)
-        self._scale  = Scale(1,1,1)
+        self._updating = 0
+        self._cache  = None
+        self._stale  = False
+        self._fillpaint = None
+        self._fillshape = None
+        self._linepaint = None
+        self._lineshape = None
+        self._matrix = None
+        self._invrse = None
+        self._mtrue  = False
+
+        # The transform is kept as numbers; the Kivy transforms are made by _reset
+        self._x  = 0.0
+        self._y  = 0.0
+        self._angle = 0.0
+        self._sx = 1.0
+        self._sy = 1.0
+        self._trans  = None
+        self._rotate = None
+        self._scale  = None
 
         # Now update these with the keywords; size first
         if 'width' in keywords:
@@ -589,17 +729,97 @@ class GObject(object):
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        import numpy as np
         if isinstance(point,Point2):
             point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
 
-        if self._rotate.angle != 0.0 or self._scale.x != 1.0 or self._scale.y != 1.0:
-            point = tuple(self.matrix.inverse()._transform(point[0],point[1]))
+        if self._angle != 0.0 or self._sx != 1.0 or self._sy != 1.0:
+            point = _apply(self.inverse,point[0],point[1])
             return abs(point[0]) < self.width/2.0 and abs(point[1]) < self.height/2.0
 
         return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
 
+    def overlaps(self,other):
+        """
+        Checks whether this shape overlaps another one.
+
+        As with :meth:`contains`, each shape is treated as its (rotated and scaled)
+        bounding rectangle.  If neither shape is rotated, this is a single test of
+        their axis-aligned boxes.  Otherwise the two rectangles are tested on the
+        four axes of their edges (the separating axis test), which is exact for
+        rectangles at any angle.
+
+        Shapes that only touch along an edge do not overlap.
+
+        :param other: the shape to check
+        :type other: :class:`GObject`
+
+        :return: True if this shape overlaps ``other``
+        :rtype:  ``bool``
+        """
+        assert isinstance(other,GObject), "%s is not a valid shape" % repr(other)
+        (ax, ay, aux, auy, ahu, ahv) = self._extents()
+        (bx, by, bux, buy, bhu, bhv) = other._extents()
+        dx = bx-ax
+        dy = by-ay
+        if auy == 0 and buy == 0:
+            return abs(dx) < ahu+bhu and abs(dy) < ahv+bhv
+
+        # The edge directions are (ux,uy) and (-uy,ux) for each rectangle
+        for (px, py) in ((aux,auy),(-auy,aux),(bux,buy),(-buy,bux)):
+            ra = ahu*abs(aux*px+auy*py)+ahv*abs(aux*py-auy*px)
+            rb = bhu*abs(bux*px+buy*py)+bhv*abs(bux*py-buy*px)
+            if abs(dx*px+dy*py) >= ra+rb:
+                return False
+        return True
+
+    def intersects(self,left,bottom,right,top):
+        """
+        Checks whether this shape overlaps axis-aligned rectangles.
+
+        This is the batched form of :meth:`overlaps`.  The rectangles are given by
+        their edges, which may be numbers (for one rectangle) or arrays (for many).
+        Arrays are broadcast against each other in the usual NumPy way, and the
+        result is an array of ``bool`` of that shape.  For numbers, the result is
+        a single ``bool``.
+
+        If this shape is not rotated, the test is the overlap of its box with each
+        rectangle.  Otherwise it is the separating axis test of :meth:`overlaps`,
+        done on all of the rectangles at once.
+
+        :param left: The left edges of the rectangles
+        :type left:  ``float`` or array of ``float``
+
+        :param bottom: The bottom edges of the rectangles
+        :type bottom:  ``float`` or array of ``float``
+
+        :param right: The right edges of the rectangles
+        :type right:  ``float`` or array of ``float`` >= left
+
+        :param top: The top edges of the rectangles
+        :type top:  ``float`` or array of ``float`` >= bottom
+
+        :return: True for each rectangle that this shape overlaps
+        :rtype:  ``bool`` or ``numpy.ndarray`` of ``bool``
+        """
+        left   = np.asarray(left,dtype=float)
+        bottom = np.asarray(bottom,dtype=float)
+        right  = np.asarray(right,dtype=float)
+        top    = np.asarray(top,dtype=float)
+        (ax, ay, aux, auy, ahu, ahv) = self._extents()
+        bhu = (right-left)/2.0
+        bhv = (top-bottom)/2.0
+        dx = (left+right)/2.0-ax
+        dy = (bottom+top)/2.0-ay
+        result = ((np.abs(dx) < abs(aux)*ahu+abs(auy)*ahv+bhu) &
+                  (np.abs(dy) < abs(auy)*ahu+abs(aux)*ahv+bhv))
+        if auy != 0:
+            for (px, py) in ((aux,auy),(-auy,aux)):
+                ra = ahu*abs(aux*px+auy*py)+ahv*abs(aux*py-auy*px)
+                rb = bhu*abs(px)+bhv*abs(py)
+                result &= np.abs(dx*px+dy*py) < ra+rb
+        return bool(result) if result.ndim == 0 else result
+
     def transform(self,point):
         """
         Transforms the point to the local coordinate system
@@ -616,11 +836,55 @@ class GObject(object):
         :rtype:  :class:`Point2`
         """
         if isinstance(point,Point2):
-            return self.inverse.transform(point)
+            p = _apply(self.inverse,point.x,point.y)
         else:
             assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-            p = self.inverse._transform(point[0],point[2])
-            return Point2(p[0],p[1])
+            p = _apply(self.inverse,point[0],point[1])
+        return Point2(float(p[0]),float(p[1]))
+
+    def begin_update(self):
+        """
+        Starts a batch of changes to this shape.
+
+        Until the matching call to :meth:`end_update`, changing an attribute such as
+        ``width``, ``fillcolor`` or ``source`` only marks the drawing cache as out of
+        date.  The cache is then rebuilt at most once for the whole batch, at the next
+        draw (or at :meth:`end_update` for a shape, such as a label, whose size depends
+        on its drawing).  Batches may be nested; only the outermost one counts.
+
+        See also :meth:`updating`, which does the same with a ``with`` statement.
+        """
+        self._updating += 1
+
+    def end_update(self):
+        """
+        Ends a batch of changes started by :meth:`begin_update`.
+        """
+        assert self._updating > 0, 'end_update called without begin_update'
+        self._updating -= 1
+        if self._updating == 0 and self._defined and (self._stale or self._cache is None):
+            self._refresh()
+
+    @contextlib.contextmanager
+    def updating(self):
+        """
+        Returns a context manager for a batch of changes to this shape.
+
+        The changes made inside the ``with`` statement rebuild the drawing cache at
+        most once::
+
+            with label.updating():
+                label.text = 'Game Over'
+                label.font_size = 48
+                label.fillcolor = 'red'
+
+        See :meth:`begin_update` for the details.
+        """
+        self.begin_update()
+        try:
+            yield self
+        finally:
+            self.end_update()
 
     def draw(self, view):
         """
@@ -628,39 +892,177 @@ class GObject(object):
 
         Ideally, the view should be the one provided by :class:`GameApp`.
 
+        The Kivy instructions of a shape are not made until it is first drawn.  After
+        a change such as a new color or size, the next draw updates the existing
+        instructions in place; they are only remade if the change adds or removes
+        one (such as a border).  A shape that is never drawn only costs its Python
+        attributes.
+
         :param view: view to draw to
         :type view:  :class:`GView`
         """
+        self._sync()
         try:
             view.draw(self._cache)
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
     # HIDDEN METHODS
+    def _recycle(self,**keywords):
+        """
+        Reinitializes this object in place, for use by :class:`GObjectPool`.
+
+        Only the attributes named in ``keywords`` change; the others keep the values
+        they had when the object was released.  The existing Kivy transforms are
+        reused.  The drawing cache is only discarded if a keyword other than one of
+        the position, rotation, scale or name attributes is given.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        defined = self._defined
+        rebuild = False
+        self._defined = False
+        for key in keywords:
+            setattr(self,key,keywords[key])
+            if not key in GObject._TRANSFORM_KEYS:
+                rebuild = True
+        self._defined = defined
+        if defined and rebuild:
+            self._invalidate()
+
+    # HIDDEN METHODS
+    def _invalidate(self):
+        """
+        Marks the drawing cache as out of date after an attribute change.
+
+        Inside a batch (see :meth:`begin_update`) this only marks the cache stale.
+        Otherwise it calls :meth:`_refresh`.
+        """
+        if self._updating:
+            self._stale = True
+        else:
+            self._refresh()
+
+    def _refresh(self):
+        """
+        Brings the drawing cache up to date after a change.
+
+        By default the cache is marked stale, so that the next draw updates it.
+        Subclasses whose size depends on the drawing rebuild it at once instead.
+        """
+        self._stale = True
+
+    def _sync(self):
+        """
+        Brings the drawing cache up to date before a draw.
+
+        A missing cache is built.  A stale one is updated in place with :meth:`_update`,
+        or rebuilt if that is not possible.
+
+        :return: True if the cache was replaced by a new one
+        :rtype:  ``bool``
+        """
+        if self._cache is None or (self._stale and not self._update()):
+            self._reset()
+            return True
+        self._stale = False
+        return False
+
+    def _update(self):
+        """
+        Updates the instructions of the drawing cache in place.
+
+        The position, angle and scale are always up to date, so this only handles
+        the other attributes.  It returns False, without changing anything, if the
+        cache needs different instructions (such as a border that was not there);
+        the cache is then rebuilt.  By default it always returns False.
+
+        :return: True if the cache was updated
+        :rtype:  ``bool``
+        """
+        return False
+
     def _reset(self):
         """
         Resets the drawing cache.
+
+        This makes the Kivy transforms the first time it is called, and brings them
+        up to date with the position, angle and scale otherwise.
         """
+        if self._trans is None:
+            self._trans  = Translate(self._x,self._y,0)
+            self._rotate = Rotate(angle=self._angle,axis=(0,0,1))
+            self._scale  = Scale(self._sx,self._sy,1)
+        else:
+            self._trans.xy = (self._x,self._y)
+            self._rotate.angle = self._angle
+            self._scale.x = self._sx
+            self._scale.y = self._sy
+        self._mtrue = False
+        self._stale = False
+        self._fillpaint = None
+        self._fillshape = None
+        self._linepaint = None
+        self._lineshape = None
         self._cache = InstructionGroup()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
     
+    def _extents(self):
+        """
+        Returns the center, orientation and half extents of this shape.
+
+        The result is a tuple ``(x, y, ux, uy, hu, hv)``.  The vector ``(ux,uy)`` is
+        the unit direction of the (rotated) horizontal edges, and ``hu`` and ``hv``
+        are the (scaled) half width and half height.  Rotations by a multiple of 90
+        degrees give exact directions, so the common cases have ``uy == 0``.
+        """
+        angle = self._angle % 360
+        if angle == 0:
+            (ux, uy) = (1.0, 0.0)
+        elif angle == 180:
+            (ux, uy) = (-1.0, 0.0)
+        elif angle == 90:
+            (ux, uy) = (0.0, 1.0)
+        elif angle == 270:
+            (ux, uy) = (0.0, -1.0)
+        else:
+            radians = math.radians(angle)
+            (ux, uy) = (math.cos(radians), math.sin(radians))
+        hu = abs(self._sx)*self.width/2.0
+        hv = abs(self._sy)*self.height/2.0
+        if uy != 0 and ux == 0:
+            # A quarter turn swaps the extents of the axis-aligned box
+            (ux, uy, hu, hv) = (1.0, 0.0, hv, hu)
+        return (self.x, self.y, ux, uy, hu, hv)
+
     def _build_matrix(self):
         """
-        Builds the transform matrices after a settings change.
+        Builds the transform matrix after a settings change.
+
+        The inverse is only built when it is first used (see :attr:`inverse`).
         """
-        self._matrix = Matrix()
-        self._matrix.scale(self._scale.x,self._scale.y)
-        self._matrix.rotate(self._rotate.angle)
-        self._matrix.translate(self._trans.x,self._trans.y)
-        self._invrse = Matrix()
-        self._invrse.translate(-self._trans.x,-self._trans.y)
-        self._invrse.rotate(-self._rotate.angle)
-        self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
+        self._matrix = _affine(self._x,self._y,self._angle,
+                               self._sx,self._sy)
+        self._invrse = None
         self._mtrue = True
 
+    def _corners(self):
+        """
+        Returns the corners of the bounding rectangle in parent coordinates.
+
+        The result is a 2x4 array, with the x-coordinates in the first row and the
+        y-coordinates in the second.
+        """
+        hw = self.width/2.0
+        hh = self.height/2.0
+        local = np.array(((-hw,hw,hw,-hw),(-hh,-hh,hh,hh)))
+        matrix = self.matrix
+        return matrix[:2,:2] @ local + matrix[:2,2:]
+
 
 # #mark -
 
@@ -680,6 +1082,7 @@ class GScene(GObject):
 
     All objects stored in a ``GScene`` are drawn as if the point (x,y) is the origin.
     """
+    __slots__ = ('_children',)
 
     # MUTABLE PROPERTIES
     @property
@@ -696,10 +1099,11 @@ class GScene(GObject):
 
     @children.setter
     def children(self,value):
-        assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
+        if VALIDATE:
+            assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
         self._children = list(value)
         if self._defined:
-            self._reset()
+            self._invalidate()
 
 
     # IMMUTABLE PROPERTIES
@@ -758,11 +1162,30 @@ class GScene(GObject):
         self._defined = False
         self.children = keywords['children'] if 'children' in keywords else []
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
 
 
     # PUBLIC METHODS
+    def matrices(self,inverse=False):
+        """
+        Returns the transformation matrices of the children, stacked in one array.
+
+        Row i of the result is the matrix taking the local coordinates of child i to
+        the coordinates of the parent of this scene (so it includes the transform of
+        this scene).  If ``inverse`` is True, the rows are the inverse matrices,
+        which take parent coordinates to the local coordinates of each child.  See
+        :func:`stack_matrices`.
+
+        :param inverse: Whether to stack the inverse matrices
+        :type inverse:  ``bool``
+
+        :return: The stacked transformation matrices
+        :rtype:  ``numpy.ndarray`` of shape (N,3,3)
+        """
+        if inverse:
+            return stack_matrices(self._children,True) @ self.inverse
+        return self.matrix @ stack_matrices(self._children)
+
     def select(self,point):
         """
         Selects the child selected by the given point.
@@ -791,13 +1214,32 @@ class GScene(GObject):
 
         return None
 
-
     # HIDDEN METHODS
+    def _sync(self):
+        """
+        Brings the drawing cache of this scene and its descendants up to date.
+
+        The children are brought up to date first, so that a nested scene syncs its
+        own children in turn.  The scene is rebuilt if any of them had to replace its
+        drawing cache (see :meth:`GObject.draw`).
+
+        :return: True if the cache was replaced by a new one
+        :rtype:  ``bool``
+        """
+        replaced = False
+        for child in self._children:
+            if child._sync():
+                replaced = True
+        if replaced:
+            self._cache = None
+        return GObject._sync(self)
+
     def _reset(self):
         """
         Resets the drawing cache
         """
         GObject._reset(self)
         for x in self.children:
+            x._sync()
             self._cache.add(x._cache)
         self._cache.add(PopMatrix())
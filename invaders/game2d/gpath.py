@@ -10,7 +10,7 @@ Date:   August 1, 2017 (Python 3 version)
 # Lower-level kivy modules to support animation
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from .gobject import GObject
+from .gobject import GObject, VALIDATE
 
 
 def same_side(p1, p2, a, b):
@@ -103,6 +103,7 @@ class GPath(GObject):
     are 0.  However, if they are nonzero, then Python will add them to all of the points
     in the path, shifting the path accordingly.
     """
+    __slots__ = ('_points','_linewidth')
     
     # MUTABLE PROPERTIES
     @property
@@ -117,10 +118,11 @@ class GPath(GObject):
     
     @points.setter
     def points(self,value):
-        assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
+        if VALIDATE:
+            assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     @property
     def linewidth(self):
@@ -135,11 +137,12 @@ class GPath(GObject):
     
     @linewidth.setter
     def linewidth(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
-        assert value >= 0, 'value %s is negative' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+            assert value >= 0, 'value %s is negative' % repr(value)
         self._linewidth = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # IMMUTABLE PROPERTIES
@@ -194,7 +197,6 @@ class GPath(GObject):
         if not 'linecolor' in keywords:
             keywords['linecolor'] = (1,1,1,1)
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
     
     
@@ -232,7 +234,7 @@ class GPath(GObject):
         x = point[0]
         y = point[1]
         
-        size = len(self.points)/2
+        size = len(self.points)//2
         epsilon = 1e-6
         for ii in range(size-1):
             p = self.points[2*ii  :2*ii+2]
@@ -256,10 +258,24 @@ class GPath(GObject):
         """
         GObject._reset(self)
         if not self._linecolor is None:
-            self._cache.add(self._linecolor)
-            line = Line(points=self.points,cap='round',joint='round',width=self.linewidth)
-            self._cache.add(line)
+            self._linepaint = Color(*self._linecolor)
+            self._lineshape = Line(points=self.points,cap='round',joint='round',
+                                   width=self.linewidth)
+            self._cache.add(self._linepaint)
+            self._cache.add(self._lineshape)
         self._cache.add(PopMatrix())
+    
+    def _update(self):
+        """
+        Updates the drawing cache in place, or returns False if it must be rebuilt.
+        """
+        if (self._linecolor is None) != (self._lineshape is None):
+            return False
+        if not self._lineshape is None:
+            self._linepaint.rgba = self._linecolor
+            self._lineshape.points = self.points
+            self._lineshape.width  = self.linewidth
+        return True
 
 
 # #mark -
@@ -280,6 +296,7 @@ class GTriangle(GPath):
     will add them to the triangle vertices.  Similarly, the attributes `width` and 
     `height` are immutable, and are computed directly from the points
     """
+    __slots__ = ()
     
     # MUTABLE PROPERTIES
     @property
@@ -294,11 +311,12 @@ class GTriangle(GPath):
     
     @points.setter
     def points(self,value):
-        assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
-        assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
+        if VALIDATE:
+            assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
+            assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # BUILT-IN METHODS
@@ -322,7 +340,6 @@ class GTriangle(GPath):
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.points = keywords['points'] if 'points' in keywords else (-100,-58,0,116,100,-58)
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
     
     
@@ -349,6 +366,12 @@ class GTriangle(GPath):
     
     
     # HIDDEN METHODS
+    def _update(self):
+        """
+        Returns False, as a triangle is always rebuilt.
+        """
+        return False
+    
     def _reset(self):
         """
         Resets the drawing cache
@@ -362,13 +385,13 @@ class GTriangle(GPath):
         
         mesh = Mesh(vertices=vertices, indices=range(3), mode='triangle_strip')
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
         self._cache.add(mesh)
         
         if self.linewidth > 0:
             line = Line(points=self.points,joint='miter',close=True,width=self.linewidth)
             if not self._linecolor is None:
-                self._cache.add(self._linecolor)
+                self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -400,6 +423,7 @@ class GPolygon(GPath):
     As with :class:`GPath`, the attributes ``width`` and ``height`` are immutable, and 
     are computed directly from the points
     """
+    __slots__ = ('_mesh','_verts','_source','_source_width','_source_height')
     
     # MUTABLE PROPERTIES
     @property
@@ -414,10 +438,11 @@ class GPolygon(GPath):
     
     @points.setter
     def points(self,value):
-        assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
+        if VALIDATE:
+            assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     @property
     def source(self):
@@ -431,10 +456,11 @@ class GPolygon(GPath):
     @source.setter
     def source(self,value):
         from .app import GameApp
-        assert value is None or GameApp.is_image(value), 'value %s is not an image file' % repr(value)
+        if VALIDATE:
+            assert value is None or GameApp.is_image(value), 'value %s is not an image file' % repr(value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     @property
     def source_width(self):
@@ -456,10 +482,11 @@ class GPolygon(GPath):
     
     @source_width.setter
     def source_width(self,value):
-        assert value is None or type(value) in [int,float], 'value %s is not a valid width' % repr(value)
+        if VALIDATE:
+            assert value is None or type(value) in [int,float], 'value %s is not a valid width' % repr(value)
         self._source_width = None
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     @property
     def source_height(self):
@@ -481,10 +508,11 @@ class GPolygon(GPath):
     
     @source_height.setter
     def source_height(self,value):
-        assert value is None or _is_num(value), 'value %s is not a valid width' % repr(value)
+        if VALIDATE:
+            assert value is None or _is_num(value), 'value %s is not a valid width' % repr(value)
         self._source_height = None
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # BUILT-IN METHODS
@@ -511,7 +539,6 @@ class GPolygon(GPath):
         self.source_width  = keywords['source_width']  if 'source_width'  in keywords else None
         self.source_height = keywords['source_height'] if 'source_height' in keywords else None
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
     
     
@@ -535,7 +562,7 @@ class GPolygon(GPath):
         assert is_point_tuple(point,1), "%s is not a valid point" % repr(point)
         
         found = False
-        for i in xrange(4,len(self._points),2):
+        for i in range(4,len(self._points),2):
             t = (0,0)+self.points[i-4:i]
             found = found or in_triangle(point,t)
         
@@ -547,7 +574,7 @@ class GPolygon(GPath):
         """
         Creates the mesh for this polygon
         """
-        size = len(self.points)/2
+        size = len(self.points)//2
         try:
             texture = Image(source=self.source).texture
             texture.wrap = 'repeat'
@@ -574,6 +601,12 @@ class GPolygon(GPath):
             verts += self.points[0:2]+(0,0)
             self._mesh = Mesh(vertices=verts, indices=range(size+2), mode='triangle_fan')
     
+    def _update(self):
+        """
+        Returns False, as a polygon is always rebuilt.
+        """
+        return False
+    
     def _reset(self):
         """
         Resets the drawing cache
@@ -581,12 +614,12 @@ class GPolygon(GPath):
         GObject._reset(self)
         self._make_mesh()
         
-        self._cache.add(self._fillcolor)
+        self._cache.add(Color(*self._fillcolor))
         self._cache.add(self._mesh)
         
         if self.linewidth > 0:
             line = Line(points=self.points,joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -0,0 +1,133 @@
+"""
+Object pools for 2D game support.
+
+Creating a :class:`GObject` is not cheap.  The constructor parses colors, creates the
+Kivy transform instructions and builds the drawing cache.  Games that create and throw
+away many short-lived objects (such as laser bolts) can instead keep the objects they
+are done with in a pool, and reinitialize them in place when they need a new one.
+"""
+
+
+class GObjectPool(object):
+    """
+    A class representing a pool of reusable :class:`GObject` instances.
+
+    The pool creates objects with its ``factory`` when it has no spares.  When you are
+    done with an object, :meth:`release` it back to the pool.  A later :meth:`acquire`
+    will reinitialize that object in place (with the method ``_recycle``) instead of
+    constructing a new one, so steady-state gameplay creates no new objects.
+
+    The arguments to :meth:`acquire` are the same as those of the factory.  The base
+    ``_recycle`` in :class:`GObject` only accepts keywords; subclasses with positional
+    constructor arguments should override ``_recycle`` with a matching signature.
+
+    Never use an object after releasing it, and never release an object twice.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def factory(self):
+        """
+        The callable that creates new objects for this pool.
+
+        **invariant**: Value is a callable returning a :class:`GObject`
+        """
+        return self._factory
+
+    @property
+    def capacity(self):
+        """
+        The maximum number of spare objects kept by this pool.
+
+        Objects released while the pool is full are dropped.  A value of None means
+        that there is no limit.
+
+        **invariant**: Value is an ``int`` >= 0 or None
+        """
+        return self._capacity
+
+    @property
+    def free(self):
+        """
+        The number of spare objects currently in this pool.
+
+        **invariant**: Value is an ``int`` >= 0
+        """
+        return len(self._free)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,factory,capacity=None):
+        """
+        Creates a new, empty object pool.
+
+        :param factory: The callable (usually a class) to create new objects
+        :type factory:  callable returning a :class:`GObject`
+
+        :param capacity: The maximum number of spare objects to keep
+        :type capacity:  ``int`` >= 0 or None
+        """
+        assert callable(factory), '%s is not callable' % repr(factory)
+        assert capacity is None or (type(capacity) == int and capacity >= 0), \
+                '%s is not a valid capacity' % repr(capacity)
+        self._factory  = factory
+        self._capacity = capacity
+        self._free = []
+
+
+    # PUBLIC METHODS
+    def acquire(self,*args,**keywords):
+        """
+        Returns an object initialized with the given arguments.
+
+        If the pool has a spare object, it is reinitialized in place and returned.
+        Otherwise, a new object is created with the factory.
+
+        :param args: the positional arguments for the factory
+        :type args:  ``tuple``
+
+        :param keywords: the keyword arguments for the factory
+        :type keywords:  ``dict``
+        """
+        if self._free:
+            obj = self._free.pop()
+            obj._recycle(*args,**keywords)
+            return obj
+        return self._factory(*args,**keywords)
+
+    def release(self,obj):
+        """
+        Returns an object to this pool for later reuse.
+
+        :param obj: The object to release
+        :type obj:  an object created by this pool's factory
+        """
+        if self._capacity is None or len(self._free) < self._capacity:
+            self._free.append(obj)
+
+    def reserve(self,count,*args,**keywords):
+        """
+        Creates spare objects until the pool has at least ``count`` of them.
+
+        Use this method while loading, so that no objects need to be created during
+        gameplay.
+
+        :param count: The number of spare objects to have
+        :type count:  ``int`` >= 0
+
+        :param args: the positional arguments for the factory
+        :type args:  ``tuple``
+
+        :param keywords: the keyword arguments for the factory
+        :type keywords:  ``dict``
+        """
+        if not self._capacity is None:
+            count = min(count,self._capacity)
+        while len(self._free) < count:
+            self._free.append(self._factory(*args,**keywords))
+
+    def clear(self):
+        """
+        Drops every spare object in this pool.
+        """
+        self._free = []
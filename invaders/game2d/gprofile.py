@@ -0,0 +1,517 @@
+"""
+Frame timing support for 2D games.
+
+This module provides a profiler that records how long the phases of each animation
+frame take.  Every named span has a preallocated ring buffer of the most recent
+durations (in nanoseconds, from ``time.perf_counter_ns``), so recording allocates
+nothing and old frames are forgotten automatically.  Rolling percentiles are computed
+from the buffers on demand.
+
+A disabled profiler records nothing, and its :meth:`GProfiler.span` returns a shared
+do-nothing context manager, so instrumented code costs next to nothing when the
+profiler is off.
+
+For longer runs, the profiler can also keep a :class:`GHistogram` of each span per
+game state.  The histograms never forget anything, use a fixed amount of memory, and
+can be saved as JSON.
+"""
+import time
+import json
+
+import numpy as np
+
+
+class _NullSpan(object):
+    """
+    A context manager that does nothing (the span of a disabled profiler).
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        return False
+
+
+class _Span(object):
+    """
+    A context manager that records the time it was entered to a profiler.
+    """
+
+    def __init__(self,profiler,name):
+        """
+        Creates a span recording to the given profiler under the given name.
+
+        :param profiler: The profiler to record to
+        :type profiler:  :class:`GProfiler`
+
+        :param name: The name of the span
+        :type name:  ``str``
+        """
+        self._profiler = profiler
+        self._name  = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self,*args):
+        self._profiler.record(self._name,time.perf_counter_ns()-self._start)
+        return False
+
+
+# The one span returned by every disabled profiler
+_NULL_SPAN = _NullSpan()
+
+
+class GHistogram(object):
+    """
+    A class representing a log-bucketed histogram of durations.
+
+    Like an HDR histogram, the buckets get wider as the values get larger, so that
+    every value is recorded with the same relative precision.  Each power of two is
+    split into 2**``precision`` equal buckets; with the default precision of 4, a
+    value is known to within 1/16 (about 6%).  Values below 2**(``precision``+1) get
+    a bucket each.  The histogram covers every 64-bit value with a few hundred
+    counters, no matter how many values are recorded.  Larger values are counted in
+    the top bucket.
+
+    The values are durations in nanoseconds, but nothing depends on that.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def precision(self):
+        """
+        The number of bits of each value that are kept.
+
+        **invariant**: Value is an ``int`` between 1 and 10
+        """
+        return self._precision
+
+    @property
+    def count(self):
+        """
+        The number of values recorded.
+
+        **invariant**: Value is an ``int`` >= 0
+        """
+        return self._count
+
+    @property
+    def total(self):
+        """
+        The sum of the values recorded.
+
+        **invariant**: Value is an ``int`` >= 0
+        """
+        return self._total
+
+    @property
+    def min(self):
+        """
+        The smallest value recorded (None if there are none).
+
+        **invariant**: Value is an ``int`` >= 0 or None
+        """
+        return self._min
+
+    @property
+    def max(self):
+        """
+        The largest value recorded (None if there are none).
+
+        **invariant**: Value is an ``int`` >= 0 or None
+        """
+        return self._max
+
+
+    # BUILT-IN METHODS
+    def __init__(self,precision=4):
+        """
+        Creates a new, empty histogram.
+
+        :param precision: The number of bits of each value to keep
+        :type precision:  ``int`` between 1 and 10
+        """
+        assert type(precision) == int, '%s is not an int' % repr(precision)
+        assert 1 <= precision <= 10, '%s is out of range' % repr(precision)
+        self._precision = precision
+        self._counts = np.zeros((64-precision+1) << precision,dtype=np.int64)
+        self._count = 0
+        self._total = 0
+        self._min   = None
+        self._max   = None
+
+    def __len__(self):
+        """
+        :return: The number of values recorded
+        :rtype:  ``int``
+        """
+        return self._count
+
+
+    # PUBLIC METHODS
+    def record(self,value):
+        """
+        Adds one value to this histogram.
+
+        :param value: The value to add
+        :type value:  ``int`` >= 0
+        """
+        self._counts[self._bucket(value)] += 1
+        self._count += 1
+        self._total += value
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def percentile(self,percent):
+        """
+        Returns the value below which ``percent`` percent of the values fall.
+
+        The result is the upper edge of the bucket holding that value (capped at the
+        largest value recorded), so it is never an underestimate by more than one 
+        bucket width.
+
+        :param percent: The percentile to compute
+        :type percent:  ``int`` or ``float`` in 0..100
+
+        :return: The percentile (None if the histogram is empty)
+        :rtype:  ``int`` or None
+        """
+        if self._count == 0:
+            return None
+        rank = max(1,int(np.ceil(self._count*percent/100.0)))
+        index = int(np.searchsorted(np.cumsum(self._counts),rank))
+        if index == len(self._counts)-1:
+            # The top bucket also holds the values too large for any bucket
+            return self._max
+        return min(self._bounds(index)[1]-1,self._max)
+
+    def buckets(self):
+        """
+        Returns the non-empty buckets as a list of ``[low, high, count]`` triples.
+
+        Each bucket holds the values ``v`` with ``low <= v < high``.
+
+        :return: The non-empty buckets, in increasing order
+        :rtype:  ``list``
+        """
+        result = []
+        for index in np.flatnonzero(self._counts).tolist():
+            low, high = self._bounds(index)
+            result.append([low,high,int(self._counts[index])])
+        return result
+
+    def to_dict(self,percents=(50,90,99,99.9)):
+        """
+        Returns a summary of this histogram that can be saved as JSON.
+
+        The dictionary has the count, sum, min, max and mean of the values, the given
+        percentiles (under keys like ``'p99.9'``), the precision and the non-empty 
+        buckets.
+
+        :param percents: The percentiles to include
+        :type percents:  sequence of numbers in 0..100
+
+        :return: The summary
+        :rtype:  ``dict``
+        """
+        result = {'count': self._count, 'sum': self._total, 'min': self._min,
+                  'max': self._max, 'precision': self._precision,
+                  'mean': self._total/self._count if self._count else None}
+        for p in percents:
+            result['p%g' % p] = self.percentile(p)
+        result['buckets'] = self.buckets()
+        return result
+
+    def clear(self):
+        """
+        Forgets every recorded value.
+        """
+        self._counts[:] = 0
+        self._count = 0
+        self._total = 0
+        self._min   = None
+        self._max   = None
+
+
+    # HIDDEN METHODS
+    def _bucket(self,value):
+        """
+        Returns the bucket index of ``value``.
+
+        Values of 2**64 or more are put in the top bucket.
+
+        :param value: The value to locate
+        :type value:  ``int`` >= 0
+        """
+        shift = value.bit_length()-self._precision-1
+        if shift <= 0:
+            return value
+        return min((shift << self._precision)+(value >> shift),len(self._counts)-1)
+
+    def _bounds(self,index):
+        """
+        Returns the ``(low, high)`` values covered by bucket ``index``.
+
+        :param index: The bucket index
+        :type index:  ``int`` >= 0
+        """
+        if index < (2 << self._precision):
+            return (index,index+1)
+        shift = (index >> self._precision)-1
+        mantissa = index-(shift << self._precision)
+        return (mantissa << shift,(mantissa+1) << shift)
+
+
+class GProfiler(object):
+    """
+    A class recording the durations of named spans in ring buffers.
+
+    :class:`GameApp` records the phases of every frame under the names ``'clear'``,
+    ``'prestep'``, ``'update'``, ``'poststep'``, ``'draw'`` and ``'frame'`` (the whole
+    frame).  With a fixed timestep, the update phases are recorded once per tick.
+    Games may add their own spans with :meth:`span`, for example::
+
+        with self.profiler.span('wave.update'):
+            self._wave.update(self.input,dt)
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def enabled(self):
+        """
+        Whether this profiler records spans.
+
+        Disabling the profiler does not forget what it has already recorded.
+
+        **invariant**: Value is a ``bool``
+        """
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._enabled = value
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The number of most recent durations kept for each span.
+
+        **invariant**: Value is an ``int`` > 0
+        """
+        return self._capacity
+
+    @property
+    def names(self):
+        """
+        The names of the spans recorded so far, in the order first recorded.
+
+        **invariant**: Value is a tuple of ``str``
+        """
+        return tuple(self._buffers)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,capacity=600,enabled=False):
+        """
+        Creates a new profiler with no spans recorded.
+
+        :param capacity: The number of most recent durations kept for each span
+        :type capacity:  ``int`` > 0
+
+        :param enabled: Whether the profiler starts enabled
+        :type enabled:  ``bool``
+        """
+        assert type(capacity) == int, '%s is not an int' % repr(capacity)
+        assert capacity > 0, '%s is not positive' % repr(capacity)
+        self._capacity = capacity
+        self._buffers  = {}
+        self._counts   = {}
+        self._histograms = {}
+        self.enabled = enabled
+
+
+    # PUBLIC METHODS
+    def span(self,name):
+        """
+        Returns a context manager recording the time spent inside it as ``name``.
+
+        If the profiler is disabled, the result is a shared context manager that
+        does nothing.
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :return: A context manager for the span
+        :rtype:  context manager
+        """
+        if not self._enabled:
+            return _NULL_SPAN
+        return _Span(self,name)
+
+    def record(self,name,duration):
+        """
+        Records one duration of the span ``name``.
+
+        The oldest duration of the span is dropped if its buffer is full.  This
+        method records even when the profiler is disabled; the check is up to the
+        caller.
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :param duration: The duration in nanoseconds
+        :type duration:  ``int`` >= 0
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None:
+            buffer = np.zeros(self._capacity,dtype=np.int64)
+            self._buffers[name] = buffer
+            self._counts[name]  = 0
+        count = self._counts[name]
+        buffer[count % self._capacity] = duration
+        self._counts[name] = count+1
+
+    def durations(self,name):
+        """
+        Returns the recorded durations of the span ``name``, oldest first.
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :return: The durations in nanoseconds (empty if the span was never recorded)
+        :rtype:  ``numpy.ndarray`` of ``int``
+        """
+        if not name in self._buffers:
+            return np.zeros(0,dtype=np.int64)
+        buffer = self._buffers[name]
+        count  = self._counts[name]
+        if count <= self._capacity:
+            return buffer[:count].copy()
+        start = count % self._capacity
+        return np.concatenate((buffer[start:],buffer[:start]))
+
+    def count(self,name):
+        """
+        Returns the number of times the span ``name`` was recorded (ever).
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :return: The number of records
+        :rtype:  ``int``
+        """
+        return self._counts.get(name,0)
+
+    def percentiles(self,name,percents=(50,90,99)):
+        """
+        Returns the rolling percentiles of the span ``name``, in milliseconds.
+
+        The percentiles only cover the durations still in the ring buffer.
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :param percents: The percentiles to compute
+        :type percents:  sequence of numbers in 0..100
+
+        :return: A dictionary from each percent to its value (None if no data)
+        :rtype:  ``dict``
+        """
+        data = self.durations(name)
+        if len(data) == 0:
+            return dict((p,None) for p in percents)
+        values = np.percentile(data,percents)/1e6
+        return dict((p,float(v)) for (p,v) in zip(percents,values))
+
+    def summary(self,percents=(50,90,99)):
+        """
+        Returns the rolling percentiles of every span, in milliseconds.
+
+        :param percents: The percentiles to compute
+        :type percents:  sequence of numbers in 0..100
+
+        :return: A dictionary from each span name to its percentiles
+        :rtype:  ``dict``
+        """
+        return dict((name,self.percentiles(name,percents)) for name in self._buffers)
+
+    def record_state(self,state,name,duration):
+        """
+        Adds one duration of the span ``name`` to its histogram for ``state``.
+
+        Unlike :meth:`record`, this keeps every duration (in a :class:`GHistogram`),
+        separately for each game state.  This method records even when the profiler
+        is disabled; the check is up to the caller.
+
+        :param state: The game state
+        :type state:  ``str``
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :param duration: The duration in nanoseconds
+        :type duration:  ``int`` >= 0
+        """
+        spans = self._histograms.get(state)
+        if spans is None:
+            spans = {}
+            self._histograms[state] = spans
+        histogram = spans.get(name)
+        if histogram is None:
+            histogram = GHistogram()
+            spans[name] = histogram
+        histogram.record(duration)
+
+    def histogram(self,state,name):
+        """
+        Returns the histogram of the span ``name`` in ``state`` (None if there is none).
+
+        :param state: The game state
+        :type state:  ``str``
+
+        :param name: The name of the span
+        :type name:  ``str``
+
+        :return: The histogram
+        :rtype:  :class:`GHistogram` or None
+        """
+        return self._histograms.get(state,{}).get(name)
+
+    def dump(self,path,extra=None):
+        """
+        Saves the histograms of every state and span to a JSON file.
+
+        The file holds a dictionary with the key ``'histograms'``, mapping each state
+        to a dictionary from span name to :meth:`GHistogram.to_dict`.  The contents of
+        ``extra`` (if any) are added to the top-level dictionary.
+
+        :param path: The file to write
+        :type path:  ``str``
+
+        :param extra: Additional entries for the file
+        :type extra:  ``dict`` or None
+        """
+        data = dict(extra) if extra else {}
+        data['unit'] = 'ns'
+        data['histograms'] = dict((state,dict((name,h.to_dict()) for (name,h) in
+                                  spans.items())) for (state,spans) in
+                                  self._histograms.items())
+        with open(path,'w') as file:
+            json.dump(data,file,indent=2)
+
+    def clear(self):
+        """
+        Forgets every recorded duration, including the histograms.
+        """
+        self._buffers.clear()
+        self._counts.clear()
+        self._histograms.clear()
@@ -12,7 +12,7 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from kivy.uix.label import Label
 from kivy.uix.image import Image
-from .gobject import GObject
+from .gobject import GObject, VALIDATE, _apply
 from .app import GameApp
 
 class GRectangle(GObject):
@@ -28,6 +28,7 @@ class GRectangle(GObject):
     The only new property for this class is ``linewidth``, which controls the width of
     the border around the rectangle.  For all other properties, see the documentation
     for :class:`GObject`."""
+    __slots__ = ('_linewidth',)
     
     # MUTABLE PROPERTIES 
     @property
@@ -43,11 +44,12 @@ class GRectangle(GObject):
     
     @linewidth.setter
     def linewidth(self,value):
-        assert type(value) in [int,float], '%s is not a number' % repr(value)
-        assert value >= 0, '%s is negative' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], '%s is not a number' % repr(value)
+            assert value >= 0, '%s is negative' % repr(value)
         self._linewidth = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # BUILT-IN METHODS
@@ -71,7 +73,6 @@ class GRectangle(GObject):
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         # Always delay the call to parent class, to avoid reset
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
     
     
@@ -85,17 +86,55 @@ class GRectangle(GObject):
         y = -self.height/2.0
         
         if not self._fillcolor is None:
-            fill = Rectangle(pos=(x,y), size=(self.width, self.height))
-            self._cache.add(self._fillcolor)
-            self._cache.add(fill)
+            self._fillshape = Rectangle(pos=(x,y), size=(self.width, self.height))
+            self._fillpaint = Color(*self._fillcolor)
+            self._cache.add(self._fillpaint)
+            self._cache.add(self._fillshape)
         
         if not self._linecolor is None and self.linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',
-                        close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._lineshape = Line(rectangle=(x,y,self.width,self.height),joint='miter',
+                                   close=True,width=self.linewidth)
+            self._linepaint = Color(*self._linecolor)
+            self._cache.add(self._linepaint)
+            self._cache.add(self._lineshape)
         
         self._cache.add(PopMatrix())
+    
+    def _update(self):
+        """
+        Updates the drawing cache in place, or returns False if it must be rebuilt.
+        """
+        if (self._fillcolor is None) != (self._fillshape is None):
+            return False
+        if not self._update_border():
+            return False
+        if not self._fillshape is None:
+            self._fillpaint.rgba = self._fillcolor
+            self._fillshape.pos  = (-self.width/2.0,-self.height/2.0)
+            self._fillshape.size = (self.width,self.height)
+        return True
+    
+    def _update_border(self):
+        """
+        Updates the border in place, or returns False if it was added or removed.
+        """
+        border = not self._linecolor is None and self.linewidth > 0
+        if border != (not self._lineshape is None):
+            return False
+        if border:
+            self._linepaint.rgba = self._linecolor
+            self._lineshape.width = self.linewidth
+            self._trace(self._lineshape)
+        return True
+    
+    def _trace(self,line):
+        """
+        Sets a Kivy line to the outline of this shape.
+        
+        :param line: the line to change
+        :type line:  ``Line``
+        """
+        line.rectangle = (-self.width/2.0,-self.height/2.0,self.width,self.height)
 
 
 # #mark -
@@ -111,6 +150,7 @@ class GEllipse(GRectangle):
     This class has exactly the same properties as :class:`GRectangle`.  See the 
     documentation of that class and :class:`GObject` for a complete list of attributes.
     """
+    __slots__ = ()
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -150,11 +190,11 @@ class GEllipse(GRectangle):
         
         rx = self.width/2.0
         ry = self.height/2.0
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
             dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
         else:
-            p = self.matrix.inverse()._transform(point[0],point[1])
+            p = _apply(self.inverse,point[0],point[1])
             dx = p[0]*p[0]/(rx*rx)
             dy = p[1]*p[1]/(ry*ry)
         
@@ -171,16 +211,28 @@ class GEllipse(GRectangle):
         y = -self.height/2.0
         
         if not self._fillcolor is None:
-            fill = Ellipse(pos=(x,y), size=(self.width,self.height))
-            self._cache.add(self._fillcolor)
-            self._cache.add(fill)
+            self._fillshape = Ellipse(pos=(x,y), size=(self.width,self.height))
+            self._fillpaint = Color(*self._fillcolor)
+            self._cache.add(self._fillpaint)
+            self._cache.add(self._fillshape)
         
         if not self._linecolor is None and self.linewidth > 0:
-            line = Line(ellipse=(x,y,self.width,self.height),close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._lineshape = Line(ellipse=(x,y,self.width,self.height),close=True,
+                                   width=self.linewidth)
+            self._linepaint = Color(*self._linecolor)
+            self._cache.add(self._linepaint)
+            self._cache.add(self._lineshape)
         
         self._cache.add(PopMatrix())
+    
+    def _trace(self,line):
+        """
+        Sets a Kivy line to the outline of this shape.
+        
+        :param line: the line to change
+        :type line:  ``Line``
+        """
+        line.ellipse = (-self.width/2.0,-self.height/2.0,self.width,self.height)
 
 
 # #mark -
@@ -204,6 +256,7 @@ class GImage(GRectangle):
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
     """
+    __slots__ = ('_source','_texture')
     
     # MUTABLE PROPERTIES
     @property
@@ -217,10 +270,12 @@ class GImage(GRectangle):
 
     @source.setter
     def source(self,value):
-        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        if VALIDATE:
+            assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
+        self._texture = None
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # BUILT-IN METHODS
@@ -242,13 +297,25 @@ class GImage(GRectangle):
         :type keywords:  keys are attribute names
         """
         self._defined = False
-        self.source = keywords['source'] if 'source' in keywords else None
         self._texture = None
         GRectangle.__init__(self,**keywords)
-        self._defined = True
+        with self.updating():
+            self.source = keywords['source'] if 'source' in keywords else None
     
     
     # HIDDEN METHODS
+    def _refresh(self):
+        """
+        Marks the drawing cache stale, or rebuilds it at once if the size is not set.
+
+        An image without a width or height takes it from its texture, so it is
+        built at once to keep the size correct.
+        """
+        if self._set_width and self._set_height:
+            self._stale = True
+        else:
+            self._reset()
+
     def _reset(self):
         """
         Resets the drawing cache.
@@ -256,10 +323,11 @@ class GImage(GRectangle):
         # Texture must load FIRST
         self._texture = GameApp.load_texture(self.source)
         if self._texture:
-            if not self._set_width:
-                self.width = self._texture.width
-            if not self._set_height:
-                self.height = self._texture.height
+            with self.updating():
+                if not self._set_width:
+                    self.width = self._texture.width
+                if not self._set_height:
+                    self.height = self._texture.height
         else:
             print('Failed to load',repr(self.source))
         
@@ -269,19 +337,36 @@ class GImage(GRectangle):
         y = -self.height/2.0
         
         
-        fill = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
+        self._fillshape = Rectangle(pos=(x,y), size=(self.width, self.height),
+                                    texture=self._texture)
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._fillpaint = Color(*self._fillcolor)
         else:
-            self._cache.add(Color(1,1,1))
-        self._cache.add(fill)
+            self._fillpaint = Color(1,1,1)
+        self._cache.add(self._fillpaint)
+        self._cache.add(self._fillshape)
         
         if not self._linecolor is None and self.linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._lineshape = Line(rectangle=(x,y,self.width,self.height),joint='miter',
+                                   close=True,width=self.linewidth)
+            self._linepaint = Color(*self._linecolor)
+            self._cache.add(self._linepaint)
+            self._cache.add(self._lineshape)
         
         self._cache.add(PopMatrix())
+    
+    def _update(self):
+        """
+        Updates the drawing cache in place, or returns False if it must be rebuilt.
+        
+        A new source is always rebuilt, as its texture must be loaded.
+        """
+        if self._texture is None or not self._update_border():
+            return False
+        self._fillpaint.rgba = (1,1,1,1) if self._fillcolor is None else self._fillcolor
+        self._fillshape.pos  = (-self.width/2.0,-self.height/2.0)
+        self._fillshape.size = (self.width,self.height)
+        return True
 
 
 # #mark -
@@ -308,6 +393,7 @@ class GLabel(GRectangle):
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
     provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    __slots__ = ('_label','_fsize','_halign','_valign','_hanchor','_vanchor','_ha','_hv')
     
     # MUTABLE PROPERTIES
     @property
@@ -320,7 +406,8 @@ class GLabel(GRectangle):
     
     @font_size.setter
     def font_size(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
         self._label.font_size = value
         self._label.texture_update()
@@ -336,7 +423,8 @@ class GLabel(GRectangle):
     @font_name.setter
     def font_name(self,value):
         from .app import GameApp
-        assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
+        if VALIDATE:
+            assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
         self._label.font_name = value
         self._label.texture_update()
     
@@ -354,7 +442,8 @@ class GLabel(GRectangle):
 
     @bold.setter
     def bold(self,value):
-        assert type(value) == bool, repr(value)+' is not a bool'
+        if VALIDATE:
+            assert type(value) == bool, repr(value)+' is not a bool'
         self._label.bold = value
         self._label.texture_update()
 
@@ -372,7 +461,8 @@ class GLabel(GRectangle):
     
     @text.setter
     def text(self,value):
-        assert type(value) == str, 'value %s is not a string' % repr(value)
+        if VALIDATE:
+            assert type(value) == str, 'value %s is not a string' % repr(value)
         self._label.text = value
         self._label.texture_update()
     
@@ -394,11 +484,12 @@ class GLabel(GRectangle):
     
     @halign.setter
     def halign(self,value):
-        assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
+        if VALIDATE:
+            assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
         self._label.halign = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     @property
     def valign(self):
@@ -418,11 +509,12 @@ class GLabel(GRectangle):
     
     @valign.setter
     def valign(self,value):
-        assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
+        if VALIDATE:
+            assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
         self._label.valign = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     
     # REDEFINED PROPERTIES
@@ -432,12 +524,15 @@ class GLabel(GRectangle):
         The horizontal coordinate of the object center.
         
         **Invariant**: Must be an int or float."""
-        return self._trans.x
+        return self._x
     
     @x.setter
     def x(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
-        self._trans.x = float(value)
+        if VALIDATE:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._x = float(value)
+        if not self._trans is None:
+            self._trans.x = self._x
         self._mtrue = False
         self._hanchor = 'center'
         self._ha = value
@@ -448,12 +543,15 @@ class GLabel(GRectangle):
         The vertical coordinate of the object center..
         
         **Invariant**: Must be an int or float."""
-        return self._trans.y
+        return self._y
     
     @y.setter
     def y(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
-        self._trans.y = float(value)
+        if VALIDATE:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._y = float(value)
+        if not self._trans is None:
+            self._trans.y = self._y
         self._mtrue = False
         self._vanchor = 'center'
         self._hv = value
@@ -473,18 +571,15 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x-self.width/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
+        return float(self._corners()[0].min())
     
     @left.setter
     def left(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         diff = value-self.left
         self.x += diff
         self._hanchor = 'left'
@@ -505,18 +600,15 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x+self.width/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
+        return float(self._corners()[0].max())
     
     @right.setter
     def right(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         diff = value-self.right
         self.x += diff
         self._hanchor = 'right'
@@ -537,18 +629,15 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y+self.height/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
+        return float(self._corners()[1].max())
     
     @top.setter
     def top(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         diff = value-self.top
         self.y += diff
         self._vanchor = 'top'
@@ -568,19 +657,16 @@ class GLabel(GRectangle):
         **Warning**: Accessing this value on a rotated object may slow down your framerate.
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y-self.height/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
+        return float(self._corners()[1].min())
     
     
     @bottom.setter
     def bottom(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        if VALIDATE:
+            assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         diff = value-self.bottom
         self.y += diff
         self._vanchor = 'bottom'
@@ -620,10 +706,10 @@ class GLabel(GRectangle):
         self.valign = keywords['valign'] if 'valign' in keywords else 'middle'
         
         GObject.__init__(self,**keywords)
-        if not 'linecolor' in keywords:
-            self.linecolor = (0,0,0,1)
-        self._reset()
         self._defined = True
+        with self.updating():
+            if not 'linecolor' in keywords:
+                self.linecolor = (0,0,0,1)
         self._label.bind(texture_size=self._callback)
     
     def __str__(self):
@@ -639,12 +725,49 @@ class GLabel(GRectangle):
                 % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
     
     # HIDDEN METHODS
+    def _recycle(self,**keywords):
+        """
+        Reinitializes this label in place, for use by :class:`GObjectPool`.
+        
+        Unless ``width`` or ``height`` is given, the label shrinks back to the size of
+        its text, and it is anchored at its center again, as a new label would be.
+        
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._hanchor = 'center'
+        self._vanchor = 'center'
+        if not 'width' in keywords:
+            self._width = 1
+            self._set_width = False
+        if not 'height' in keywords:
+            self._height = 1
+            self._set_height = False
+        with self.updating():
+            GObject._recycle(self,**keywords)
+            self._invalidate()
+    
+    def _update(self):
+        """
+        Returns False, as a label is always rebuilt.
+        """
+        return False
+    
+    def _refresh(self):
+        """
+        Rebuilds the drawing cache at once.
+
+        Unlike other shapes, a label is not built lazily, because its size depends
+        on the rendered text.
+        """
+        self._reset()
+
     def _callback(self,instance=None,value=None):
         """
         A workaround to deal with parameter requirements for callbacks
         """
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     def _reset(self):
         """
@@ -664,15 +787,15 @@ class GLabel(GRectangle):
         
         # Reset the absolute anchor
         if self._hanchor == 'left':
-            self._trans.x = self._ha+self.width/2.0
+            self._x = self._ha+self.width/2.0
         elif self._hanchor == 'right':
-            self._trans.x = self._ha-self.width/2.0
+            self._x = self._ha-self.width/2.0
         
         # Reset the absolute anchor
         if self._vanchor == 'top':
-            self._trans.y = self._hv-self.height/2.0
+            self._y = self._hv-self.height/2.0
         elif self._vanchor == 'bottom':
-            self._trans.y = self._hv+self.height/2.0
+            self._y = self._hv+self.height/2.0
         
         # Reset the label anchor.
         if self.halign == 'left':
@@ -692,14 +815,14 @@ class GLabel(GRectangle):
         
         if self.fillcolor:
             fill = Rectangle(pos=(x,y), size=(self.width,self.height))
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
             self._cache.add(fill)
         
         self._cache.add(self._label.canvas)
         
         if self._linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -0,0 +1,236 @@
+"""
+Broad-phase collision support for 2D games.
+
+This module provides a uniform-grid spatial hash.  The plane is cut into square cells
+and every object is recorded in each cell its bounding box touches.  A rectangle query
+then only looks at the objects in the cells that the rectangle touches, instead of at
+every object in the game.  The query is only a broad phase: it returns the objects that
+*might* overlap the rectangle, and you should still perform the exact test on them.
+
+Objects are stored in named layers.  A query only searches the layers it asks for, so
+(for example) player bolts can query only the aliens and alien bolts only the ship.
+"""
+import math
+
+
+class GSpatialHash(object):
+    """
+    A class representing a uniform grid of objects, keyed by cell.
+
+    Any object with the attributes ``left``, ``right``, ``bottom`` and ``top`` (which
+    includes every :class:`GObject`) may be inserted.  The hash does not notice when
+    an object moves.  You must call :meth:`move` after changing its position so that
+    the object is filed under the correct cells.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def cellsize(self):
+        """
+        The width (and height) of a single grid cell.
+
+        For best results, this should be about the size of the larger objects in the
+        hash.  Smaller cells make objects span more cells; larger cells make each
+        query return more false positives.
+
+        **invariant**: Value is a ``float`` > 0
+        """
+        return self._cellsize
+
+    @property
+    def layers(self):
+        """
+        The names of the layers with at least one object.
+
+        **invariant**: Value is a tuple of layer names
+        """
+        return tuple(k for (k,v) in self._layers.items() if v)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,cellsize=64):
+        """
+        Creates a new, empty spatial hash.
+
+        :param cellsize: The width (and height) of a single grid cell
+        :type cellsize:  ``int`` or ``float`` > 0
+        """
+        assert type(cellsize) in [int,float], '%s is not a number' % repr(cellsize)
+        assert cellsize > 0, '%s is not positive' % repr(cellsize)
+        self._cellsize = float(cellsize)
+        self._layers = {}
+        self._where  = {}
+
+    def __len__(self):
+        """
+        :return: The number of objects in this hash
+        :rtype:  ``int``
+        """
+        return len(self._where)
+
+    def __contains__(self,obj):
+        """
+        :return: True if ``obj`` is in this hash
+        :rtype:  ``bool``
+        """
+        return obj in self._where
+
+
+    # PUBLIC METHODS
+    def insert(self,obj,layer=None):
+        """
+        Adds an object to this hash.
+
+        If the object is already in the hash, it is moved to the new layer.
+
+        :param obj: The object to add
+        :type obj:  :class:`GObject`
+
+        :param layer: The name of the layer for this object
+        :type layer:  any hashable value
+        """
+        if obj in self._where:
+            self.remove(obj)
+        cells = self._cells(obj.left,obj.bottom,obj.right,obj.top)
+        grid  = self._layers.setdefault(layer,{})
+        for cell in cells:
+            if cell in grid:
+                grid[cell].add(obj)
+            else:
+                grid[cell] = {obj}
+        self._where[obj] = (layer,cells)
+
+    def move(self,obj):
+        """
+        Refiles an object after it has changed position or size.
+
+        This method does nothing if the object still covers the same cells.
+
+        :param obj: The object to refile
+        :type obj:  :class:`GObject` in this hash
+        """
+        layer, old = self._where[obj]
+        new = self._cells(obj.left,obj.bottom,obj.right,obj.top)
+        if new == old:
+            return
+        grid = self._layers[layer]
+        for cell in old:
+            bucket = grid[cell]
+            bucket.discard(obj)
+            if not bucket:
+                del grid[cell]
+        for cell in new:
+            if cell in grid:
+                grid[cell].add(obj)
+            else:
+                grid[cell] = {obj}
+        self._where[obj] = (layer,new)
+
+    def remove(self,obj):
+        """
+        Removes an object from this hash.
+
+        This method does nothing if the object is not in the hash.
+
+        :param obj: The object to remove
+        :type obj:  :class:`GObject`
+        """
+        if not obj in self._where:
+            return
+        layer, cells = self._where.pop(obj)
+        grid = self._layers[layer]
+        for cell in cells:
+            bucket = grid[cell]
+            bucket.discard(obj)
+            if not bucket:
+                del grid[cell]
+
+    def clear(self):
+        """
+        Removes every object from this hash.
+        """
+        self._layers.clear()
+        self._where.clear()
+
+    def query(self,left,bottom,right,top,layers=None):
+        """
+        Returns the objects whose cells overlap the given rectangle.
+
+        This is a broad phase only.  Every object that overlaps the rectangle is in
+        the result, but some objects in the result may not actually overlap it.
+
+        :param left: The left edge of the rectangle
+        :type left:  ``int`` or ``float``
+
+        :param bottom: The bottom edge of the rectangle
+        :type bottom:  ``int`` or ``float``
+
+        :param right: The right edge of the rectangle
+        :type right:  ``int`` or ``float`` >= left
+
+        :param top: The top edge of the rectangle
+        :type top:  ``int`` or ``float`` >= bottom
+
+        :param layers: The layer, or tuple of layers, to search (None for all layers)
+        :type layers:  a layer name, a tuple of layer names, or None
+
+        :return: The candidate objects, each listed once
+        :rtype:  ``list``
+        """
+        if layers is None:
+            grids = list(self._layers.values())
+        elif type(layers) == tuple:
+            grids = [self._layers[k] for k in layers if k in self._layers]
+        elif layers in self._layers:
+            grids = [self._layers[layers]]
+        else:
+            return []
+
+        found = []
+        seen  = set()
+        for cell in self._cells(left,bottom,right,top):
+            for grid in grids:
+                if cell in grid:
+                    for obj in grid[cell]:
+                        if not obj in seen:
+                            seen.add(obj)
+                            found.append(obj)
+        return found
+
+    def query_object(self,obj,layers=None):
+        """
+        Returns the objects whose cells overlap the bounding box of ``obj``.
+
+        The object itself is never in the result, even if it is in the hash.
+
+        :param obj: The object to query with
+        :type obj:  :class:`GObject`
+
+        :param layers: The layer, or tuple of layers, to search (None for all layers)
+        :type layers:  a layer name, a tuple of layer names, or None
+
+        :return: The candidate objects, each listed once
+        :rtype:  ``list``
+        """
+        found = self.query(obj.left,obj.bottom,obj.right,obj.top,layers)
+        if obj in self._where:
+            found = [x for x in found if not x is obj]
+        return found
+
+
+    # HIDDEN METHODS
+    def _cells(self,left,bottom,right,top):
+        """
+        Returns the cells covered by the given rectangle.
+
+        :return: The (column, row) keys of the covered cells
+        :rtype:  ``tuple``
+        """
+        size = self._cellsize
+        x0 = math.floor(left/size)
+        x1 = math.floor(right/size)
+        y0 = math.floor(bottom/size)
+        y1 = math.floor(top/size)
+        if x0 == x1 and y0 == y1:
+            return ((x0,y0),)
+        return tuple((cx,cy) for cx in range(x0,x1+1) for cy in range(y0,y1+1))
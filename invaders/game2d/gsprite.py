@@ -12,6 +12,7 @@ Date:   November 1, 2017 (Python 3 version)
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from .grectangle import GRectangle, GObject
+from .gobject import VALIDATE
 from .app import GameApp
 
 # #mark -
@@ -34,6 +35,7 @@ class GSprite(GRectangle):
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
     """
+    __slots__ = ('_source','_texture','_images','_bounds','_format','_frame')
     
     # MUTABLE PROPERTIES
     @property
@@ -47,10 +49,12 @@ class GSprite(GRectangle):
 
     @source.setter
     def source(self,value):
-        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        if VALIDATE:
+            assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
+        self._bounds = None
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     @property
     def count(self):
@@ -76,14 +80,18 @@ class GSprite(GRectangle):
     
     @format.setter
     def format(self,value):
-        assert type(value) in [tuple,list] and len(value) == 2, '%s does is not a tuple pair' % repr(value)
-        assert type(value[0]) == int and type(value[1]) == int, '%s does not have int values' % repr(value)
-        assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
+        if VALIDATE:
+            assert type(value) in [tuple,list] and len(value) == 2, '%s does is not a tuple pair' % repr(value)
+            assert type(value[0]) == int and type(value[1]) == int, '%s does not have int values' % repr(value)
+            assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
         self._format = tuple(value)
+        self._bounds = None
         count = value[0]*value[1]
         
         if self.frame >= count:
             self.frame = 0
+        if self._defined:
+            self._invalidate()
     
     @property
     def frame(self):
@@ -96,8 +104,9 @@ class GSprite(GRectangle):
     
     @frame.setter
     def frame(self,value):
-        assert type(value) == int, '%s is not an int' % repr(value)
-        assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
+        if VALIDATE:
+            assert type(value) == int, '%s is not an int' % repr(value)
+            assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
         self._frame = value
         if self._bounds:
             self._texture = self._images[self._frame]
@@ -131,7 +140,7 @@ class GSprite(GRectangle):
         self._bounds = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
-        self._defined = True
+        self._refresh()
     
     # HIDDEN METHODS
     def _setFormat(self,value):
@@ -146,12 +155,25 @@ class GSprite(GRectangle):
         assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
         self._format = value
     
+    def _refresh(self):
+        """
+        Marks the drawing cache stale, or rebuilds it at once if the size is not set.
+
+        An image without a width or height takes it from its texture, so it is
+        built at once to keep the size correct.
+        """
+        if self._set_width and self._set_height:
+            self._stale = True
+        else:
+            self._reset()
+
     def _reset(self):
         """
         Resets the drawing cache.
         """
         # Texture must load FIRST
         texture = GameApp.load_texture(self.source)
+        self._images = [None]*self.count
         if texture:
             width  = texture.width/self._format[1]
             height = texture.height/self._format[0]
@@ -163,10 +185,11 @@ class GSprite(GRectangle):
                     self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
                     tx += width
                 ty += height
-            if not self._set_width:
-                self.width = width
-            if not self._set_height:
-                self.height = height
+            with self.updating():
+                if not self._set_width:
+                    self.width = width
+                if not self._set_height:
+                    self.height = height
         else:
             print('Failed to load',repr(self.source))
         
@@ -177,16 +200,33 @@ class GSprite(GRectangle):
         
         self._texture = self._images[self._frame]
         self._bounds = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
+        self._fillshape = self._bounds
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._fillpaint = Color(*self._fillcolor)
         else:
-            self._cache.add(Color(1,1,1))
+            self._fillpaint = Color(1,1,1)
+        self._cache.add(self._fillpaint)
         self._cache.add(self._bounds)
         
         if not self._linecolor is None and self.linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._lineshape = Line(rectangle=(x,y,self.width,self.height),joint='miter',
+                                   close=True,width=self.linewidth)
+            self._linepaint = Color(*self._linecolor)
+            self._cache.add(self._linepaint)
+            self._cache.add(self._lineshape)
         
         self._cache.add(PopMatrix())
+    
+    def _update(self):
+        """
+        Updates the drawing cache in place, or returns False if it must be rebuilt.
+        
+        A new source or format is always rebuilt, as the frames must be cut again.
+        """
+        if self._bounds is None or not self._update_border():
+            return False
+        self._fillpaint.rgba = (1,1,1,1) if self._fillcolor is None else self._fillcolor
+        self._bounds.pos  = (-self.width/2.0,-self.height/2.0)
+        self._bounds.size = (self.width,self.height)
+        return True
 
@@ -11,10 +11,11 @@ Date:   November 1, 2020
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from .grectangle import GRectangle, GObject
+from .gobject import VALIDATE
 from .app import GameApp
 
 
-class GTile(GObject):
+class GTile(GRectangle):
     """
     An class representing a tiles image
     
@@ -24,6 +25,7 @@ class GTile(GObject):
     to fill in all of the remaining space.  This is ideal for terrain and other
     background features
     """
+    __slots__ = ('_source','_texture')
     
     # MUTABLE PROPERTIES
     @property
@@ -37,10 +39,11 @@ class GTile(GObject):
     
     @source.setter
     def source(self,value):
-        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        if VALIDATE:
+            assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._invalidate()
     
     # IMMUTABLE PROPERTIES
     @property
@@ -94,6 +97,12 @@ class GTile(GObject):
         self._defined = True
     
     # HIDDEN METHODS
+    def _update(self):
+        """
+        Returns False, as the tiles are always remade when the tile changes.
+        """
+        return False
+
     def _reset(self):
         """
         Resets the drawing cache.
@@ -134,7 +143,7 @@ class GTile(GObject):
         
         mesh = Mesh(vertices=vert, indices=indx,mode='triangles',texture=self._texture)
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
         else:
             self._cache.add(Color(1,1,1))
         self._cache.add(mesh)
@@ -16,6 +16,46 @@ from kivy.metrics import dp
 
 from introcs.geom import Point2
 
+import operator
+
+
+def diff_frames(shown,drawn):
+    """
+    Returns the edits that turn the draw list ``shown`` into ``drawn``.
+    
+    The lists hold the commands of two animation frames, in draw order and without
+    duplicates; they are compared by identity.  The result is a pair of lists: the
+    commands of ``shown`` to remove, and the (position, command) pairs to insert.
+    After removing the first ones, inserting the second ones in order turns
+    ``shown`` into ``drawn``.  Both lists are empty if the frames are the same.
+    
+    If the commands in both frames are not in the same order, or more than half
+    of ``drawn`` changed, the result is None: it is then cheaper to rebuild the
+    list from ``drawn``.
+    
+    :param shown: The commands of the previous frame
+    :type shown:  ``list``
+    
+    :param drawn: The commands of the current frame
+    :type drawn:  ``list``
+    
+    :return: The commands to remove and insert, or None to rebuild
+    :rtype:  ``tuple`` of two ``list`` or ``None``
+    """
+    if len(drawn) == len(shown) and all(map(operator.is_,drawn,shown)):
+        return ([],[])
+    
+    before = set(shown)
+    after  = set(drawn)
+    kept = [cmd for cmd in shown if cmd in after]
+    changed = len(shown)-len(kept) + len(drawn)-len(kept)
+    if changed > len(drawn)//2 or not all(map(operator.is_,kept,
+                                     [cmd for cmd in drawn if cmd in before])):
+        return None
+    removed  = [cmd for cmd in shown if not cmd in after]
+    inserted = [(pos,cmd) for (pos,cmd) in enumerate(drawn) if not cmd in before]
+    return (removed,inserted)
+
 
 class GInput(object):
     """
@@ -473,8 +513,37 @@ class GView(FloatLayout):
     See the documentation of that class for more information.
     """
 
+    # PROPERTIES
+    @property
+    def retained(self):
+        """
+        Whether this view keeps its canvas from one animation frame to the next.
+        
+        In immediate mode (the default), :meth:`clear` empties the canvas and every 
+        :meth:`draw` adds to it again, so Kivy relinks the whole canvas each frame.  In
+        retained mode, :meth:`clear` only starts a new draw list, and :meth:`flush` 
+        compares it to the list of the previous frame.  Only the commands that appeared
+        or vanished are added to or removed from the canvas.  The order of the draws is
+        kept, so what is on screen is the same in both modes.
+        
+        Changing this attribute clears the view.
+        
+        **Invariant**: Must be a ``bool``.
+        """
+        return self._retained
+    
+    @retained.setter
+    def retained(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._retained = value
+        self._frame.clear()
+        self._shown = []
+        self._drawn = []
+        self._contents = set()
+    
+    
     # BUILT-IN METHODS
-    def __init__(self):
+    def __init__(self,retained=False):
         """
         Creates a new view for display
 
@@ -482,13 +551,16 @@ class GView(FloatLayout):
         window.  That functionality happens behind the scenes with hidden methods.
         You should only use use the object provided in the `view` attribute of
         :class:`GameApp`. See the documentation of that class for more information.
+        
+        :param retained: Whether to keep the canvas between frames (see :attr:`retained`)
+        :type retained:  ``bool``
         """
         FloatLayout.__init__(self)
         self._frame = InstructionGroup()
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
-        self._contents = set()
+        self.retained = retained
 
 
     # PUBLIC METHODS
@@ -503,18 +575,52 @@ class GView(FloatLayout):
         :type cmd:  A Kivy graphics command
         """
         if not cmd in self._contents:
-            self._frame.add(cmd)
             self._contents.add(cmd)
+            if self._retained:
+                self._drawn.append(cmd)
+            else:
+                self._frame.add(cmd)
 
     def clear(self):
         """
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  In 
+        retained mode, the canvas is left alone until :meth:`flush`.
         """
-        self._frame.clear()
-        self._contents.clear()
+        if self._retained:
+            self._drawn = []
+            self._contents = set()
+        else:
+            self._frame.clear()
+            self._contents.clear()
+
+    def flush(self):
+        """
+        Brings the canvas up to date with the commands drawn since :meth:`clear`.
+        
+        This method is called for you automatically at the end of the animation frame.
+        It does nothing in immediate mode.  In retained mode, the commands of the last
+        frame that were not drawn again are removed, and the new ones are inserted at 
+        their place in the draw order.  If the commands kept from the last frame were 
+        drawn in a different order, or most of the commands changed, the canvas is 
+        rebuilt instead.
+        """
+        if not self._retained:
+            return
+        edits = diff_frames(self._shown,self._drawn)
+        if edits is None:
+            self._frame.clear()
+            for cmd in self._drawn:
+                self._frame.add(cmd)
+        else:
+            (removed, inserted) = edits
+            for cmd in removed:
+                self._frame.remove(cmd)
+            for (pos, cmd) in inserted:
+                self._frame.insert(pos,cmd)
+        self._shown = self._drawn
 
     # HIDDEN METHODS
     def _reset(self,obj=None,value=None):
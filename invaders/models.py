@@ -57,6 +57,8 @@ class Ship(GImage):
     inherited by GImage. You would only add attributes if you needed them
     for extra gameplay features (like animation).
     """
+    # No attributes beyond those of GImage, so no per-object dictionary
+    __slots__ = ()
 
     # GETTERS AND SETTERS
     def getX(self):
@@ -65,6 +67,12 @@ class Ship(GImage):
         """
         return self.x
 
+    def getY(self):
+        """
+        Returns the y-coordinate of the center of the ship.
+        """
+        return self.y
+
     def setX(self, pos):
         """
         Sets the x-coordinate of the ship to pos.
@@ -93,6 +101,19 @@ class Ship(GImage):
         super().__init__(x=w,y=h,width=SHIP_WIDTH,height=SHIP_HEIGHT,\
         source=SHIP_IMAGE)
 
+    def _recycle(self,w,h=SHIP_BOTTOM):
+        """
+        Reinitializes a pooled ship so that it is centered at (w,h).
+
+        Parameter w: the x-coordinate of the ship
+        Precondition: w is a float >= 0 and <= GAME_WIDTH
+
+        Parameter h: the y-coordinate of the ship
+        Precondition: h is a float > 0 and < DEFENSE_LINE
+        """
+        assert isinstance(w,float)
+        super()._recycle(x=w,y=h)
+
     # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
     def moveShip(self,input,dt):
         """
@@ -119,18 +140,7 @@ class Ship(GImage):
         Parameter bolt: The laser bolt to check
         Precondition: bolt is of class Bolt
         """
-        if bolt.getPlayer() == False: #Could only be hit if the alien shoots.
-            w = self.contains((bolt.getX() - BOLT_WIDTH/2, bolt.getY() - \
-            BOLT_HEIGHT/2))
-            x = self.contains((bolt.getX() - BOLT_WIDTH/2, bolt.getY() + \
-            BOLT_HEIGHT/2))
-            y = self.contains((bolt.getX() + BOLT_WIDTH/2, bolt.getY() - \
-            BOLT_HEIGHT/2))
-            z = self.contains((bolt.getX() + BOLT_WIDTH/2, bolt.getY() + \
-            BOLT_HEIGHT/2))
-            return w or x or y or z
-        else:
-            return False
+        return bolt.getPlayer() == False and self.overlaps(bolt)
 
 
 class Alien(GImage):
@@ -151,6 +161,8 @@ class Alien(GImage):
     inherited by GImage. You would only add attributes if you needed them
     for extra gameplay features (like giving each alien a score value).
     """
+    # No attributes beyond those of GImage, so no per-object dictionary
+    __slots__ = ()
 
     # GETTERS AND SETTERS
     def getX(self):
@@ -166,12 +178,14 @@ class Alien(GImage):
         return self.y
 
     # INITIALIZER TO CREATE AN ALIEN
-    def __init__(self,w,z,row):
+    def __init__(self,w,z,row,width=ALIEN_WIDTH,height=ALIEN_HEIGHT):
         """
         Creates an alien centered at (w,z) with an image based off the row it's
         in.
 
-        The alien image cycles between 3 different images every 2 rows.
+        The alien image cycles between 3 different images every 2 rows.  The
+        size is ALIEN_WIDTH by ALIEN_HEIGHT unless given (large formations use
+        smaller aliens).
 
         Parameter w: the x-coordinate of the alien
         Precondition: w is a float >= 0 and <= GAME_WIDTH
@@ -180,10 +194,16 @@ class Alien(GImage):
         Precondition: z is a float > DEFENSE_LINE
 
         Parameter row: the row of the alien
-        Precondition: row is an int >= 0 and < ALIEN_ROWS
+        Precondition: row is an int >= 0
+
+        Parameter width: the width of the alien
+        Precondition: width is a number > 0
+
+        Parameter height: the height of the alien
+        Precondition: height is a number > 0
         """
-        super().__init__(x = w,y = z,width = ALIEN_WIDTH,height = \
-        ALIEN_HEIGHT,source = ALIEN_IMAGES[(row % 6) // 2])
+        super().__init__(x = w,y = z,width = width,height = height,\
+        source = ALIEN_IMAGES[(row % 6) // 2])
 
     # METHOD TO CHECK FOR COLLISION
     def collides(self,bolt):
@@ -195,18 +215,7 @@ class Alien(GImage):
         Parameter bolt: The laser bolt to check
         Precondition: bolt is of class Bolt
         """
-        if bolt.getPlayer() == True:
-            w = self.contains((bolt.getX() - BOLT_WIDTH/2, bolt.getY() - \
-            BOLT_HEIGHT/2))
-            x = self.contains((bolt.getX() - BOLT_WIDTH/2, bolt.getY() + \
-            BOLT_HEIGHT/2))
-            y = self.contains((bolt.getX() + BOLT_WIDTH/2, bolt.getY() - \
-            BOLT_HEIGHT/2))
-            z = self.contains((bolt.getX() + BOLT_WIDTH/2, bolt.getY() + \
-            BOLT_HEIGHT/2))
-            return w or x or y or z
-        else:
-            return False
+        return bolt.getPlayer() == True and self.overlaps(bolt)
 
     # METHODS
     def moveAlienRight(self):
@@ -257,6 +266,7 @@ class Bolt(GRectangle):
     # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     # Attribute _player: determines whether the bolt is from a player or alien
     # Invariant: _player is a bool; True is player, False is alien
+    __slots__ = ('_velocity','_player')
 
     # GETTERS AND SETTERS
     def getX(self):
@@ -309,6 +319,35 @@ class Bolt(GRectangle):
         self._velocity = velocity
         self._player = pl
 
+    def _recycle(self,xpos,choseny,velocity,pl):
+        """
+        Reinitializes a pooled bolt with the same arguments as __init__.
+
+        The fill color is only changed (and the drawing rebuilt) if the bolt
+        changes owner.
+
+        Parameter xpos: the x-coordinate of the bolt
+        Precondition: xpos is a float >= 0 and <= GAME_WIDTH
+
+        Parameter choseny: the y-coordinate of the bolt
+        Precondition: choseny is a float >= 0 and <= GAME_HEIGHT
+
+        Parameter velocity: the velocity of the bolt
+        Precondition: velocity is a float
+
+        Parameter pl: pl is whether the bolt is shot by a ship or an alien
+        Precondition: pl is a bool that's True if the bolt is from the ship and
+        False if it's from the alien
+        """
+        if pl == self._player:
+            super()._recycle(x=xpos, y=choseny)
+        elif pl == True:
+            super()._recycle(x=xpos, y=choseny, fillcolor='blue')
+        else:
+            super()._recycle(x=xpos, y=choseny, fillcolor='red')
+        self._velocity = velocity
+        self._player = pl
+
     # METHODS
     def moveBolt(self):
         """
@@ -322,6 +361,7 @@ class DefenseLine(GPath):
     """
     A class representing a defense line.
     """
+    __slots__ = ()
 
     def __init__(self,p=[0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],lw=3):
         """
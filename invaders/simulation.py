@@ -0,0 +1,1466 @@
+"""
+Headless simulation module for Alien Invaders
+
+This module contains the rules of a single wave with no drawing at all.  It
+does not import Kivy (only the NumPy collision tests of game2d), so
+constructing and running a wave here needs neither a window nor a GL context.
+It is what CI and analytics jobs use to simulate many games, and the class
+Wave in wave.py is a thin renderer on top of it.
+
+The state of a wave is kept in NumPy arrays: a Formation for the aliens and a
+BoltBuffer for the laser bolts.  The ship is just an x-coordinate.
+"""
+from consts import *
+from game2d.gcollide import sweep_boxes, intercept
+import numpy as np
+import random
+import math
+
+# PRIMARY RULE: This module may not import models, wave or app, and from game2d
+# only the modules that do not need Kivy (gcollide).  Input is any object with a
+# method is_key_down(key), like GInput.
+
+
+class WaveSim(object):
+    """
+    This class simulates a single wave of Alien Invaders.
+
+    It follows the same rules as the original Wave: the ship moves with the 'a'
+    and 'd' keys and fires one bolt at a time, the aliens march back and forth
+    and down every ALIEN_SPEED seconds and fire every few steps, and the wave
+    ends when all the aliens are dead, they pass the defense line, or the ship
+    has no lives left.  An endless wave never runs out of lives: the ships lost
+    are counted, but they do not end the wave.
+
+    When the ship is destroyed, it stays destroyed (and the wave keeps still
+    for the ship) until restoreShip is called.
+
+    A wave draws its random numbers from its own generator.  Two waves with
+    the same seed that are updated with the same inputs and the same dt play
+    exactly the same game, so for replays use a fixed timestep.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _width: the width of the window
+    # Invariant: _width is a number > 0
+    #
+    # Attribute _height: the height of the window
+    # Invariant: _height is a number > 0
+    #
+    # Attribute _geometry: the size and spacing of the aliens
+    # Invariant: _geometry is a Geometry, the one of _formation
+    #
+    # Attribute _formation: the positions and alive flags of the aliens
+    # Invariant: _formation is a Formation (ALIEN_ROWS by ALIENS_IN_ROW unless
+    # configured otherwise)
+    #
+    # Attribute _speed: the number of seconds between alien steps
+    # Invariant: _speed is a float > 0
+    #
+    # Attribute _rate: the maximum number of alien steps between alien bolts
+    # Invariant: _rate is an int >= 1
+    #
+    # Attribute _volley: the number of bolts the aliens fire at once
+    # Invariant: _volley is an int >= 1
+    #
+    # Attribute _intercept: whether opposing bolts that meet destroy each other
+    # Invariant: _intercept is a bool
+    #
+    # Attribute _random: the random number generator of this wave
+    # Invariant: _random is a random.Random
+    #
+    # Attribute _bolts: the laser bolts currently on screen
+    # Invariant: _bolts is a BoltBuffer (of capacity BOLT_CAPACITY unless
+    # configured otherwise)
+    #
+    # Attribute _shipx: the x-coordinate of the center of the ship
+    # Invariant: _shipx is a float >= 0 and <= _width, or None if the ship
+    # is destroyed
+    #
+    # Attribute _savedx: the ship position when a life is lost
+    # Invariant: _savedx is a float >= 0 and <= _width
+    #
+    # Attribute _lives: the number of lives left
+    # Invariant: _lives is an int >= 0; it never changes if _endless is True
+    #
+    # Attribute _endless: whether a lost ship never ends the wave
+    # Invariant: _endless is a bool
+    #
+    # Attribute _lost: the number of ships lost
+    # Invariant: _lost is an int >= 0
+    #
+    # Attribute _time: the amount of time since the last Alien "step"
+    # Invariant: _time is a float >= 0s
+    #
+    # Attribute _num: the first attribute that helps keep track of alien movement
+    # Invariant: _num is an int >= 0
+    #
+    # Attribute _down: the second attribute that helps keep track of alien movement
+    # Invariant: _down is an int >= 0
+    #
+    # Attribute _walkies: the number of steps each alien takes per _fire interval
+    # Invariant: _walkies is an int >= 0 that resets to 0 each time it's >= _fire
+    #
+    # Attribute _fire: the step number at which an alien fires a bolt
+    # Invariant: _fire is an int >= 1 and <= _rate
+    #
+    # Attribute _destroyed: whether all the aliens are destroyed or not
+    # Invariant: _destroyed is a bool that is True when there are no aliens left
+    #
+    # Attribute _passed: whether the botom row of aliens has passed the defense
+    # line
+    # Invariant: _passed is a bool that is True if the aliens have passed
+    # DEFENSE_LINE and is False if they haven't
+
+    # GETTERS AND SETTERS
+    def getFormation(self):
+        """
+        Returns the Formation of aliens.
+        """
+        return self._formation
+
+    def getBolts(self):
+        """
+        Returns the BoltBuffer of bolts on screen.
+        """
+        return self._bolts
+
+    def getGeometry(self):
+        """
+        Returns the Geometry (size and spacing) of the aliens.
+        """
+        return self._geometry
+
+    def getWidth(self):
+        """
+        Returns the width of the window.
+        """
+        return self._width
+
+    def getShipX(self):
+        """
+        Returns the x-coordinate of the ship, or None if it is destroyed.
+        """
+        return self._shipx
+
+    def setShipX(self,value):
+        """
+        Places the ship at x-coordinate value.
+
+        Parameter value: the x-coordinate of the ship
+        Precondition: value is a float >= 0 and <= the window width
+        """
+        assert isinstance(value, float)
+        self._shipx = value
+
+    def getLives(self):
+        """
+        Returns the number of lives left.
+        """
+        return self._lives
+
+    def getLost(self):
+        """
+        Returns the number of ships lost.
+        """
+        return self._lost
+
+    def isEndless(self):
+        """
+        Returns True if a lost ship never ends the wave.
+        """
+        return self._endless
+
+    def getPassed(self):
+        """
+        Returns a bool specifying whether the aliens have passed the defense line.
+        """
+        return self._passed
+
+    def getDestroyed(self):
+        """
+        Returns a bool specifying whether all of the aliens are destroyed.
+        """
+        return self._destroyed
+
+    def getSavedX(self):
+        """
+        Returns the position of x at which the player ship lost a life.
+        """
+        return self._savedx
+
+    def isComplete(self):
+        """
+        Returns True if the wave is over (won or lost).
+        """
+        return self._lives == 0 or self._passed or self._destroyed
+
+    # INITIALIZER TO CREATE SHIP AND ALIENS
+    def __init__(self,height=GAME_HEIGHT,width=GAME_WIDTH,rows=ALIEN_ROWS,
+                 cols=ALIENS_IN_ROW,speed=ALIEN_SPEED,rate=BOLT_RATE,
+                 volley=ALIEN_VOLLEY,capacity=BOLT_CAPACITY,geometry=None,
+                 intercept=BOLT_INTERCEPT,lives=SHIP_LIVES,endless=False,seed=None):
+        """
+        Initializes a wave of aliens, bolts, and the ship.
+
+        The formation is rows by cols. The ship starts at x width/2.  The
+        defaults are the constants in consts.py; the batch runner overrides
+        them to try out other balance settings.
+
+        Parameter height: is window height
+        Precondition: height is an int > 0
+
+        Parameter width: is window width
+        Precondition: width is an int > 0
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
+
+        Parameter speed: the number of seconds between alien steps
+        Precondition: speed is a number > 0
+
+        Parameter rate: the maximum number of alien steps between alien bolts
+        Precondition: rate is an int >= 1
+
+        Parameter volley: the number of bolts the aliens fire at once
+        Precondition: volley is an int >= 1
+
+        Parameter capacity: the maximum number of bolts on screen
+        Precondition: capacity is an int > 0
+
+        Parameter geometry: the size and spacing of the aliens (None for the
+        sizes in consts.py)
+        Precondition: geometry is None or a Geometry
+
+        Parameter intercept: whether opposing bolts that meet destroy each other
+        Precondition: intercept is a bool
+
+        Parameter lives: the number of ships the player can lose
+        Precondition: lives is an int > 0
+
+        Parameter endless: whether a lost ship never ends the wave (the lives
+        are then never used up)
+        Precondition: endless is a bool
+
+        Parameter seed: the seed of the random numbers (None for a random seed)
+        Precondition: seed is None or an int
+        """
+        assert isinstance(rows,int) and rows > 0
+        assert isinstance(cols,int) and cols > 0
+        assert type(speed) in [int,float] and speed > 0
+        assert isinstance(rate,int) and rate >= 1
+        assert isinstance(volley,int) and volley >= 1
+        assert geometry == None or isinstance(geometry,Geometry)
+        assert isinstance(lives,int) and lives > 0
+        assert isinstance(endless,bool)
+        if geometry == None:
+            geometry = Geometry()
+        self._width = width
+        self._height = height
+        self._geometry = geometry
+        self._formation = Formation(rows,cols,height,geometry)
+        self._speed = float(speed)
+        self._rate = rate
+        self._volley = volley
+        self._intercept = intercept
+        self._random = random.Random(seed)
+        self._bolts = BoltBuffer(capacity)
+        self._shipx = width/2
+        self._savedx = width/2
+        self._time = 0
+        self._num = 0
+        self._down = 0
+        self._walkies = 0
+        self._fire = self._random.randint(1,self._rate)
+        self._lives = lives
+        self._endless = endless
+        self._lost = 0
+        self._destroyed = False
+        self._passed = False
+
+    # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
+    def update(self,input,dt):
+        """
+        Moves and removes the ship, bolts, and aliens.
+
+        Aliens move every time self._time reaches self._speed. If the aliens go
+        across the defense line, then self._passed is True. If all of the aliens
+        are destroyed, then self._destroyed is True.
+
+        Parameter input: The keyboard input
+        Precondition: input has a method is_key_down(key)
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self.moveShip(input)
+        self._bolts.step()
+        self.delEntity()
+        self._bolts.cull(0,self._height)
+        if self.aliensDead() == True:
+            self._destroyed = True
+        elif self.bottomRowY() - self._geometry.getHeight() / 2 < DEFENSE_LINE:
+            self._passed = True
+        elif(self._time <= self._speed): #Keeps track of the time.
+            self._time = self._time + dt
+        else: #Resets the time and makes the aliens move.
+            self.alienMarch()
+            self._walkies = self._walkies + 1
+            if(self._walkies >= self._fire): #Makes the aliens fire.
+                self._walkies = 0
+                self.makeAlienBolt(self._volley)
+                self._fire = self._random.randint(1,self._rate)
+
+    #HELPER METHODS
+    def moveShip(self,input):
+        """
+        Moves the ship left if the 'a' key is pressed and right if the 'd' key
+        is pressed.  Nothing happens if the ship is destroyed.
+
+        Parameter input: the keyboard input
+        Precondition: input has a method is_key_down(key)
+        """
+        if self._shipx == None:
+            return
+        if input.is_key_down('a') and self._shipx >= SHIP_WIDTH/2: #Left
+            self._shipx = self._shipx - SHIP_MOVEMENT
+        if input.is_key_down('d') and self._shipx <= self._width - (SHIP_WIDTH /2):
+            self._shipx = self._shipx + SHIP_MOVEMENT
+
+    def restoreShip(self):
+        """
+        Restores the destroyed ship at the position where it was shot.
+        """
+        self._shipx = self._savedx
+
+    def firstColX(self):
+        """
+        Returns the x-coordinate of the left-most column of aliens.
+        """
+        return self._formation.getColumnX(self.firstCol())
+
+    def lastColX(self):
+        """
+        Returns the x-coordinate of the right-most column of aliens.
+        """
+        return self._formation.getColumnX(self.lastCol())
+
+    def firstCol(self):
+        """
+        Returns the number of the left-most non-empty column (None if all dead).
+        """
+        return self._formation.getFirstCol()
+
+    def lastCol(self):
+        """
+        Returns the number of the right-most non-empty column (None if all dead).
+        """
+        return self._formation.getLastCol()
+
+    def bottomRow(self):
+        """
+        Returns the bottom non-empty row number of aliens (None if all dead).
+        """
+        return self._formation.getBottomRow()
+
+    def bottomRowY(self):
+        """
+        Returns the y-coordinate of the bottom row of aliens.
+        """
+        return self._formation.getRowY(self.bottomRow())
+
+    def alienMarch(self):
+        """
+        Coordinates the movement of aliens across the screen.
+
+        First, the aliens step right until they're one horizontal separation away
+        from the right side of the screen. Then, they move down a step and go left
+        until they're one separation away from the left side of the screen.
+        Lastly, they move a step down and repeat the process.
+        """
+        g = self._geometry
+        if self._down % 2 == 1:
+            if self._num % 2 == 1:
+                self._formation.march(-g.getHWalk(),0)
+            else:
+                self._formation.march(g.getHWalk(),0)
+            self._down = self._down + 1
+        elif((self.lastColX() + (g.getWidth() / 2) > \
+        self._width - g.getHSep()) or (self.firstColX() - \
+        (g.getWidth() / 2) < g.getHSep())):
+            self._formation.march(0,-g.getVWalk())
+            self._num = self._num + 1
+            self._down = self._down + 1
+        elif self._num % 2 == 0:
+            self._formation.march(g.getHWalk(),0)
+        elif self._num % 2 == 1:
+            self._formation.march(-g.getHWalk(),0)
+        self._time = 0
+
+    def makeBolt(self):
+        """
+        Creates a player ship bolt.
+
+        Nothing happens if a player bolt is already on screen or the ship is
+        destroyed.
+        """
+        if self._shipx != None and self._bolts.getPlayerCount() == 0:
+            ypos = (SHIP_BOTTOM + SHIP_HEIGHT + (BOLT_HEIGHT/2))
+            self._bolts.spawn(self._shipx,ypos,BOLT_SPEED,True)
+
+    def makeAlienBolt(self,count=1):
+        """
+        Creates a volley of alien bolts.
+
+        Each bolt is fired by the bottom-most alien of a different random column,
+        chosen from the firing index of the formation.  Nothing happens if every
+        alien is dead.
+
+        Parameter count: the number of bolts in the volley
+        Precondition: count is an int >= 1
+        """
+        for (row,col) in self._formation.chooseShooters(self._random,count):
+            x, y = self._formation.getPosition(row,col)
+            self._bolts.spawn(x,y - self._geometry.getHeight() / 2,\
+            -1 * BOLT_SPEED,False)
+
+    def delEntity(self):
+        """
+        Removes the aliens and the ship hit by bolts and decreases player lives.
+
+        Once an alien is shot, it's dead. Once the ship is shot, it's destroyed
+        and self._lives is decreased by 1 (unless the wave is endless).  The test is swept: a bolt hits
+        anything it touched on its way from its previous position, so fast bolts
+        cannot pass through a target between two updates.  First of all, player
+        and alien bolts that met destroy each other (if interception is on).
+        Player bolts are only tested against the aliens returned by hitQuery for
+        their path, and each bolt destroys the first entity on its path (at most
+        one).
+        """
+        formation = self._formation
+        if self._intercept:
+            self._bolts.killAll(self._bolts.intercept())
+        active = self._bolts.getActive(True)
+        if len(active) > 0:
+            cells = set()
+            for slot in active.tolist():
+                cells.update(self.hitQuery(*self._bolts.getSweptBox(slot)))
+            cells = sorted(cells)
+            if cells:
+                rows = np.array([cell[0] for cell in cells])
+                cols = np.array([cell[1] for cell in cells])
+                xs = formation.getXs()[rows,cols]
+                ys = formation.getYs()[rows,cols]
+                hw = self._geometry.getWidth() / 2
+                hh = self._geometry.getHeight() / 2
+                slots, index, times = self._bolts.sweep(xs - hw,ys - hh,xs + hw,\
+                ys + hh,True)
+                for i in np.argsort(times,kind='stable').tolist():
+                    row, col = cells[int(index[i])]
+                    if formation.isAlive(row,col):
+                        self._bolts.kill(int(slots[i]))
+                        formation.kill(row,col)
+        if self._shipx != None:
+            slots, index, times = self._bolts.sweep(\
+            [self._shipx - SHIP_WIDTH / 2],[SHIP_BOTTOM - SHIP_HEIGHT / 2],\
+            [self._shipx + SHIP_WIDTH / 2],[SHIP_BOTTOM + SHIP_HEIGHT / 2],False)
+            if len(slots) > 0:
+                self._bolts.kill(int(slots[np.argmin(times)]))
+                self._lost = self._lost + 1
+                if not self._endless:
+                    self._lives = self._lives - 1
+                self._savedx = self._shipx
+                self._shipx = None
+
+    def hitQuery(self,left,bottom,right,top):
+        """
+        Returns the (row, col) of every living alien that a bolt could hit.
+
+        The aliens sit on a regular lattice that moves as one, so the aliens near
+        the bolt are found by arithmetic from the formation origin rather than by
+        searching.  The result has at most a few entries, however big the wave.
+
+        Parameter left: the left edge of the bolt
+        Precondition: left is a number (int or float)
+
+        Parameter bottom: the bottom edge of the bolt
+        Precondition: bottom is a number (int or float)
+
+        Parameter right: the right edge of the bolt
+        Precondition: right is a number >= left
+
+        Parameter top: the top edge of the bolt
+        Precondition: top is a number >= bottom
+        """
+        return self._formation.query(left,bottom,right,top)
+
+    def aliensDead(self):
+        """
+        Returns True if all of the aliens are dead.
+        """
+        return self._formation.isEmpty()
+
+
+class Geometry(object):
+    """
+    A class storing the size and spacing of the aliens in a formation.
+
+    The default geometry is the one in consts.py.  Large formations (such as
+    the stress test) shrink the aliens so that the formation still fits in the
+    window; see the function fitGeometry.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _width: the width of an alien
+    # Invariant: _width is a float > 0
+    #
+    # Attribute _height: the height of an alien
+    # Invariant: _height is a float > 0
+    #
+    # Attribute _hsep: the horizontal separation between aliens
+    # Invariant: _hsep is a float >= 0
+    #
+    # Attribute _vsep: the vertical separation between aliens
+    # Invariant: _vsep is a float >= 0
+    #
+    # Attribute _hwalk: the horizontal distance of one alien step
+    # Invariant: _hwalk is a float > 0
+    #
+    # Attribute _vwalk: the vertical distance of one alien step
+    # Invariant: _vwalk is a float > 0
+    #
+    # Attribute _ceiling: the distance from the top of the window to the top row
+    # Invariant: _ceiling is a float >= 0
+
+    # GETTERS AND SETTERS
+    def getWidth(self):
+        """
+        Returns the width of an alien.
+        """
+        return self._width
+
+    def getHeight(self):
+        """
+        Returns the height of an alien.
+        """
+        return self._height
+
+    def getHSep(self):
+        """
+        Returns the horizontal separation between aliens.
+        """
+        return self._hsep
+
+    def getVSep(self):
+        """
+        Returns the vertical separation between aliens.
+        """
+        return self._vsep
+
+    def getHWalk(self):
+        """
+        Returns the horizontal distance of one alien step.
+        """
+        return self._hwalk
+
+    def getVWalk(self):
+        """
+        Returns the vertical distance of one alien step.
+        """
+        return self._vwalk
+
+    def getCeiling(self):
+        """
+        Returns the distance from the top of the window to the top row.
+        """
+        return self._ceiling
+
+    def getXStep(self):
+        """
+        Returns the distance between the centers of neighboring columns.
+        """
+        return self._hsep + self._width
+
+    def getYStep(self):
+        """
+        Returns the distance between the centers of neighboring rows.
+        """
+        return self._vsep + self._height
+
+    # INITIALIZER
+    def __init__(self,width=ALIEN_WIDTH,height=ALIEN_HEIGHT,hsep=ALIEN_H_SEP,
+                 vsep=ALIEN_V_SEP,hwalk=ALIEN_H_WALK,vwalk=ALIEN_V_WALK,
+                 ceiling=ALIEN_CEILING):
+        """
+        Creates a geometry with the given sizes (the constants by default).
+
+        Parameter width: the width of an alien
+        Precondition: width is a number > 0
+
+        Parameter height: the height of an alien
+        Precondition: height is a number > 0
+
+        Parameter hsep: the horizontal separation between aliens
+        Precondition: hsep is a number >= 0
+
+        Parameter vsep: the vertical separation between aliens
+        Precondition: vsep is a number >= 0
+
+        Parameter hwalk: the horizontal distance of one alien step
+        Precondition: hwalk is a number > 0
+
+        Parameter vwalk: the vertical distance of one alien step
+        Precondition: vwalk is a number > 0
+
+        Parameter ceiling: the distance from the top of the window to the top row
+        Precondition: ceiling is a number >= 0
+        """
+        assert width > 0 and height > 0 and hwalk > 0 and vwalk > 0
+        assert hsep >= 0 and vsep >= 0 and ceiling >= 0
+        self._width = float(width)
+        self._height = float(height)
+        self._hsep = float(hsep)
+        self._vsep = float(vsep)
+        self._hwalk = float(hwalk)
+        self._vwalk = float(vwalk)
+        self._ceiling = float(ceiling)
+
+    def scaled(self,factor):
+        """
+        Returns a copy of this geometry with every size multiplied by factor.
+
+        Parameter factor: the scale factor
+        Precondition: factor is a number > 0
+        """
+        return Geometry(self._width*factor,self._height*factor,
+                        self._hsep*factor,self._vsep*factor,self._hwalk*factor,
+                        self._vwalk*factor,self._ceiling)
+
+
+def fitGeometry(rows,cols,width=GAME_WIDTH,height=GAME_HEIGHT):
+    """
+    Returns the geometry of consts.py, shrunk so that rows x cols aliens fit.
+
+    The formation must fit across the window (with a separation on each side),
+    and in the top half of the space between the ceiling and the defense line,
+    so that it has room to march down.  Formations that already fit keep the
+    sizes of consts.py.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens in each row
+    Precondition: cols is an int > 0
+
+    Parameter width: the width of the window
+    Precondition: width is a number > 0
+
+    Parameter height: the height of the window
+    Precondition: height is a number > ALIEN_CEILING + DEFENSE_LINE
+    """
+    g = Geometry()
+    across = width / (cols * g.getXStep() + g.getHSep())
+    down = (height - g.getCeiling() - DEFENSE_LINE) / 2 / (rows * g.getYStep())
+    factor = min(1.0,across,down)
+    if factor == 1.0:
+        return g
+    return g.scaled(factor)
+
+
+class Formation(object):
+    """
+    A class storing the alien formation as a structure of arrays.
+
+    Instead of asking every Alien to move itself, the formation keeps the x and
+    y coordinates, the alive flags and the row types of all aliens in NumPy
+    arrays of shape (rows, cols).  Marching, the edge tests and the alive count
+    are then each a single vectorized operation, no matter how many aliens
+    there are.  The formation knows nothing about drawing; Wave copies the
+    positions of the living aliens into their images.
+
+    The formation also keeps bitmasks of which aliens are alive in each row and
+    in each column.  They are updated by kill, so the left-most column, the
+    right-most column, the bottom row and whether every alien is dead are all
+    bit operations rather than scans of the whole grid.  As every alien moves
+    by the same amount, all the aliens of a column share one x-coordinate and
+    all the aliens of a row share one y-coordinate.
+
+    Finally, the formation keeps a firing index: the columns that still have a
+    living alien, and the bottom-most living alien of each column (the only one
+    that can shoot).  It is also updated by kill, so choosing a random shooter
+    takes constant time.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _x: the x-coordinate of the center of every alien
+    # Invariant: _x is a float array of shape (rows, cols)
+    #
+    # Attribute _y: the y-coordinate of the center of every alien
+    # Invariant: _y is a float array of shape (rows, cols)
+    #
+    # Attribute _alive: whether each alien is still alive
+    # Invariant: _alive is a bool array of shape (rows, cols)
+    #
+    # Attribute _geometry: the size and spacing of the aliens
+    # Invariant: _geometry is a Geometry
+    #
+    # Attribute _kind: the image type of each alien (an index into ALIEN_IMAGES)
+    # Invariant: _kind is an int array of shape (rows, cols) with values in
+    # 0..len(ALIEN_IMAGES)-1
+    #
+    # Attribute _count: the number of aliens still alive
+    # Invariant: _count is an int >= 0 equal to the number of True in _alive
+    #
+    # Attribute _rowbits: the living aliens of each row, as a bitmask of columns
+    # Invariant: _rowbits is a list of ints; bit col of _rowbits[row] is set
+    # exactly when _alive[row,col] is True
+    #
+    # Attribute _colbits: the living aliens of each column, as a bitmask of rows
+    # Invariant: _colbits is a list of ints; bit row of _colbits[col] is set
+    # exactly when _alive[row,col] is True
+    #
+    # Attribute _rowmask: the rows with at least one living alien
+    # Invariant: _rowmask is an int; bit row is set exactly when _rowbits[row]
+    # is not 0
+    #
+    # Attribute _colmask: the columns with at least one living alien
+    # Invariant: _colmask is an int; bit col is set exactly when _colbits[col]
+    # is not 0
+    #
+    # Attribute _moves: the number of times the formation has marched
+    # Invariant: _moves is an int >= 0
+    #
+    # Attribute _firing: the columns with at least one living alien
+    # Invariant: _firing is a list of the cols whose bit is set in _colmask, in
+    # no particular order
+    #
+    # Attribute _firingpos: the position of each column in _firing
+    # Invariant: _firingpos is a dict; _firing[_firingpos[col]] == col for every
+    # col in _firing
+    #
+    # Attribute _shooters: the bottom-most living row of each column
+    # Invariant: _shooters is a list of ints of length cols; _shooters[col] is
+    # the lowest set bit of _colbits[col], or -1 if the column is empty
+    #
+    # Attribute _kills: the aliens killed so far, in order
+    # Invariant: _kills is a list of (row, col) tuples, one per dead alien
+
+    # GETTERS AND SETTERS
+    def getCount(self):
+        """
+        Returns the number of aliens still alive.
+        """
+        return self._count
+
+    def isAlive(self,row,col):
+        """
+        Returns True if the alien at (row, col) is still alive.
+
+        Parameter row: the row of the alien
+        Precondition: row is an int >= 0 and < the number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int >= 0 and < the number of columns
+        """
+        return bool(self._alive[row,col])
+
+    def getPosition(self,row,col):
+        """
+        Returns the center (x, y) of the alien at (row, col) as a tuple of floats.
+
+        Parameter row: the row of the alien
+        Precondition: row is an int >= 0 and < the number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int >= 0 and < the number of columns
+        """
+        return (float(self._x[row,col]),float(self._y[row,col]))
+
+    def getKind(self,row,col):
+        """
+        Returns the image type of the alien at (row, col).
+
+        Parameter row: the row of the alien
+        Precondition: row is an int >= 0 and < the number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int >= 0 and < the number of columns
+        """
+        return int(self._kind[row,col])
+
+    def getGeometry(self):
+        """
+        Returns the Geometry (size and spacing) of the aliens.
+        """
+        return self._geometry
+
+    def getKills(self):
+        """
+        Returns the (row, col) of every alien killed so far, in order.
+
+        The list only grows, so a renderer can remember how much of it it has
+        seen and only look at the new entries.  It must not be modified.
+        """
+        return self._kills
+
+    def getMoves(self):
+        """
+        Returns the number of times the formation has marched.
+
+        A renderer can compare this value between frames to know whether the
+        positions changed.
+        """
+        return self._moves
+
+    def getXs(self):
+        """
+        Returns the (rows, cols) array of alien x-coordinates.
+
+        The array is shared with the formation and must not be modified.
+        """
+        return self._x
+
+    def getYs(self):
+        """
+        Returns the (rows, cols) array of alien y-coordinates.
+
+        The array is shared with the formation and must not be modified.
+        """
+        return self._y
+
+    def getAlive(self):
+        """
+        Returns the (rows, cols) array of alive flags.
+
+        The array is shared with the formation and must not be modified.
+        """
+        return self._alive
+
+    def getShape(self):
+        """
+        Returns the (rows, cols) size of the formation.
+        """
+        return self._alive.shape
+
+    def isEmpty(self):
+        """
+        Returns True if every alien in the formation is dead.
+        """
+        return self._rowmask == 0
+
+    def getFirstCol(self):
+        """
+        Returns the left-most column with a living alien (or None if all dead).
+        """
+        if self._colmask == 0:
+            return None
+        return (self._colmask & -self._colmask).bit_length() - 1
+
+    def getLastCol(self):
+        """
+        Returns the right-most column with a living alien (or None if all dead).
+        """
+        if self._colmask == 0:
+            return None
+        return self._colmask.bit_length() - 1
+
+    def getBottomRow(self):
+        """
+        Returns the bottom row with a living alien (or None if all dead).
+        """
+        if self._rowmask == 0:
+            return None
+        return (self._rowmask & -self._rowmask).bit_length() - 1
+
+    def getFiringCount(self):
+        """
+        Returns the number of columns with at least one living alien.
+        """
+        return len(self._firing)
+
+    def getShooter(self,col):
+        """
+        Returns the row of the bottom-most living alien of column col (None if
+        the column is empty).
+
+        Parameter col: the column
+        Precondition: col is an int >= 0 and < the number of columns
+        """
+        row = self._shooters[col]
+        return None if row == -1 else row
+
+    def chooseShooters(self,rng,count=1):
+        """
+        Returns the (row, col) of up to count aliens chosen to fire, each from a
+        different column.
+
+        Only the bottom-most alien of a column can fire.  Choosing one shooter
+        takes constant time; a volley of count shooters takes time proportional
+        to count.  The result is empty if every alien is dead, and has fewer
+        than count entries if fewer columns are left.
+
+        Parameter rng: the random number generator to choose with
+        Precondition: rng is a random.Random
+
+        Parameter count: the number of shooters
+        Precondition: count is an int >= 1
+        """
+        firing = self._firing
+        if not firing:
+            return []
+        if count == 1:
+            cols = [firing[rng.randrange(len(firing))]]
+        else:
+            cols = rng.sample(firing,min(count,len(firing)))
+        return [(self._shooters[col],col) for col in cols]
+
+    def getColumnX(self,col):
+        """
+        Returns the x-coordinate shared by the aliens of column col.
+
+        Parameter col: the column
+        Precondition: col is an int >= 0 and < the number of columns
+        """
+        return float(self._x[0,col])
+
+    def getRowY(self,row):
+        """
+        Returns the y-coordinate shared by the aliens of row row.
+
+        Parameter row: the row
+        Precondition: row is an int >= 0 and < the number of rows
+        """
+        return float(self._y[row,0])
+
+    def getLeft(self):
+        """
+        Returns the smallest x-coordinate of a living alien (or None if all dead).
+        """
+        if self._colmask == 0:
+            return None
+        return self.getColumnX(self.getFirstCol())
+
+    def getRight(self):
+        """
+        Returns the largest x-coordinate of a living alien (or None if all dead).
+        """
+        if self._colmask == 0:
+            return None
+        return self.getColumnX(self.getLastCol())
+
+    def getBottom(self):
+        """
+        Returns the smallest y-coordinate of a living alien (or None if all dead).
+        """
+        if self._rowmask == 0:
+            return None
+        return self.getRowY(self.getBottomRow())
+
+    # INITIALIZER TO LAY OUT THE FORMATION
+    def __init__(self,rows,cols,height=GAME_HEIGHT,geometry=None):
+        """
+        Creates a formation of rows by cols living aliens.
+
+        Row 0 is the bottom row.  The top row is the ceiling of the geometry
+        below the top of the window and the left column is one horizontal
+        separation from the left edge.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
+
+        Parameter height: is window height
+        Precondition: height is an int > 0
+
+        Parameter geometry: the size and spacing of the aliens (None for the
+        sizes in consts.py)
+        Precondition: geometry is None or a Geometry
+        """
+        if geometry == None:
+            geometry = Geometry()
+        g = geometry
+        self._geometry = g
+        col = np.arange(cols,dtype=float)
+        row = np.arange(rows,dtype=float)
+        x = g.getHSep() + (g.getWidth() / 2) + col * g.getXStep()
+        y = height - g.getCeiling() - g.getHeight() / 2 - ((rows - (row + 1)) * \
+        g.getYStep())
+        self._x = np.tile(x,(rows,1))
+        self._y = np.tile(y[:,np.newaxis],(1,cols))
+        self._alive = np.ones((rows,cols),dtype=bool)
+        kind = (np.arange(rows) % 6) // 2
+        self._kind = np.tile(kind[:,np.newaxis],(1,cols))
+        self._count = rows*cols
+        self._rowbits = [(1 << cols) - 1]*rows
+        self._colbits = [(1 << rows) - 1]*cols
+        self._rowmask = (1 << rows) - 1
+        self._colmask = (1 << cols) - 1
+        self._moves = 0
+        self._firing = list(range(cols))
+        self._firingpos = dict((col,col) for col in range(cols))
+        self._shooters = [0]*cols
+        self._kills = []
+
+    # METHODS
+    def march(self,dx,dy):
+        """
+        Moves every alien by (dx, dy).
+
+        Dead aliens move too; their positions are never read.
+
+        Parameter dx: the horizontal distance to move
+        Precondition: dx is a number (int or float)
+
+        Parameter dy: the vertical distance to move
+        Precondition: dy is a number (int or float)
+        """
+        if dx:
+            self._x += dx
+        if dy:
+            self._y += dy
+        self._moves = self._moves + 1
+
+    def kill(self,row,col):
+        """
+        Marks the alien at (row, col) as dead.
+
+        Parameter row: the row of the alien
+        Precondition: row is an int >= 0 and < the number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int >= 0 and < the number of columns
+        """
+        row, col = int(row), int(col)
+        if self._alive[row,col]:
+            self._alive[row,col] = False
+            self._count = self._count - 1
+            self._kills.append((row,col))
+            self._rowbits[row] &= ~(1 << col)
+            if self._rowbits[row] == 0:
+                self._rowmask &= ~(1 << row)
+            self._colbits[col] &= ~(1 << row)
+            bits = self._colbits[col]
+            if bits == 0:
+                self._colmask &= ~(1 << col)
+                self._shooters[col] = -1
+                # Swap the last firing column into the hole
+                pos = self._firingpos.pop(col)
+                last = self._firing.pop()
+                if last != col:
+                    self._firing[pos] = last
+                    self._firingpos[last] = pos
+            elif self._shooters[col] == row:
+                self._shooters[col] = (bits & -bits).bit_length()-1
+
+    def query(self,left,bottom,right,top):
+        """
+        Returns the (row, col) of the living aliens that may overlap a rectangle.
+
+        The aliens of column col are centered at x0 + col*xstep and those of row
+        row at y0 + row*ystep (the steps of the geometry), where (x0,y0) is the
+        current center of the alien at (0,0).  So the columns and rows the
+        rectangle can touch follow directly from its edges.  The result may include
+        aliens that only come close to the rectangle; use an exact test on them.
+
+        Parameter left: the left edge of the rectangle
+        Precondition: left is a number (int or float)
+
+        Parameter bottom: the bottom edge of the rectangle
+        Precondition: bottom is a number (int or float)
+
+        Parameter right: the right edge of the rectangle
+        Precondition: right is a number >= left
+
+        Parameter top: the top edge of the rectangle
+        Precondition: top is a number >= bottom
+        """
+        rows, cols = self._alive.shape
+        x0 = self._x[0,0]
+        y0 = self._y[0,0]
+        g = self._geometry
+        hw = g.getWidth() / 2
+        hh = g.getHeight() / 2
+        xstep = g.getXStep()
+        ystep = g.getYStep()
+        col0 = max(int(math.floor((left - hw - x0) / xstep)),0)
+        col1 = min(int(math.ceil((right + hw - x0) / xstep)),cols-1)
+        row0 = max(int(math.floor((bottom - hh - y0) / ystep)),0)
+        row1 = min(int(math.ceil((top + hh - y0) / ystep)),rows-1)
+        result = []
+        for row in range(row0,row1+1):
+            for col in range(col0,col1+1):
+                if self._alive[row,col]:
+                    result.append((row,col))
+        return result
+
+    def overlaps(self,row,col,left,bottom,right,top):
+        """
+        Returns True if the alien at (row, col) is alive and overlaps a rectangle.
+
+        Parameter row: the row of the alien
+        Precondition: row is an int >= 0 and < the number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int >= 0 and < the number of columns
+
+        Parameter left: the left edge of the rectangle
+        Precondition: left is a number (int or float)
+
+        Parameter bottom: the bottom edge of the rectangle
+        Precondition: bottom is a number (int or float)
+
+        Parameter right: the right edge of the rectangle
+        Precondition: right is a number >= left
+
+        Parameter top: the top edge of the rectangle
+        Precondition: top is a number >= bottom
+        """
+        if not self._alive[row,col]:
+            return False
+        x = self._x[row,col]
+        y = self._y[row,col]
+        hw = self._geometry.getWidth() / 2
+        hh = self._geometry.getHeight() / 2
+        return (x - hw < right and left < x + hw and y - hh < top and
+                bottom < y + hh)
+
+
+class BoltBuffer(object):
+    """
+    A class storing the laser bolts in fixed-capacity NumPy arrays.
+
+    Every bolt lives in a slot.  The x and y coordinates, the velocities and the
+    owner flags of all the slots are kept in parallel arrays, with a free list of
+    the slots that are not in use.  Moving every bolt, culling the bolts that left
+    the screen and compacting the live slots into an index array are then each a
+    single array operation per frame, whatever the number of bolts.
+
+    The buffer knows nothing about drawing.  A bolt is identified by its slot.
+    Every spawn also gets a new serial number, so that a renderer can tell when
+    a slot was reused by a different bolt.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _x: the x-coordinate of the center of the bolt in each slot
+    # Invariant: _x is a float array of length capacity
+    #
+    # Attribute _y: the y-coordinate of the center of the bolt in each slot
+    # Invariant: _y is a float array of length capacity
+    #
+    # Attribute _vy: the velocity of the bolt in each slot
+    # Invariant: _vy is a float array of length capacity; 0 for free slots
+    #
+    # Attribute _player: whether the bolt in each slot was shot by the player
+    # Invariant: _player is a bool array of length capacity
+    #
+    # Attribute _live: whether each slot holds a bolt
+    # Invariant: _live is a bool array of length capacity
+    #
+    # Attribute _free: the slots not in use
+    # Invariant: _free is a list of the ints i with _live[i] False
+    #
+    # Attribute _active: the live slots in increasing order, or None if stale
+    # Invariant: _active is None or an int array of the i with _live[i] True
+    #
+    # Attribute _serial: the serial number of the bolt last spawned in each slot
+    # Invariant: _serial is an int array of length capacity; values are > 0
+    # for slots that have been used and unique among the live slots
+    #
+    # Attribute _spawned: the number of bolts ever spawned
+    # Invariant: _spawned is an int >= 0
+    #
+    # Attribute _nplayer: the number of live player bolts
+    # Invariant: _nplayer is an int >= 0 equal to the number of True in
+    # _live & _player
+
+    # GETTERS AND SETTERS
+    def getCapacity(self):
+        """
+        Returns the maximum number of bolts in this buffer.
+        """
+        return len(self._live)
+
+    def getCount(self):
+        """
+        Returns the number of live bolts.
+        """
+        return len(self._live) - len(self._free)
+
+    def getPlayerCount(self):
+        """
+        Returns the number of live bolts shot by the player.
+        """
+        return self._nplayer
+
+    def getXs(self):
+        """
+        Returns the array of x-coordinates of every slot (live or not).
+
+        Index it with getActive() to get the coordinates of the live bolts.
+        """
+        return self._x
+
+    def getYs(self):
+        """
+        Returns the array of y-coordinates of every slot (live or not).
+
+        Index it with getActive() to get the coordinates of the live bolts.
+        """
+        return self._y
+
+    def getPlayers(self):
+        """
+        Returns the array of owner flags of every slot (live or not).
+
+        Index it with getActive() to get the owners of the live bolts.
+        """
+        return self._player
+
+    def getSerials(self):
+        """
+        Returns the array of serial numbers of every slot (live or not).
+
+        Index it with getActive() to get the serial numbers of the live bolts.
+        """
+        return self._serial
+
+    def getLive(self):
+        """
+        Returns the array of flags of the slots that hold a bolt.
+
+        The array is shared with the buffer and must not be modified.
+        """
+        return self._live
+
+    def isPlayer(self,slot):
+        """
+        Returns True if the bolt in slot was shot by the player.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int, a live slot of this buffer
+        """
+        return bool(self._player[slot])
+
+    def getBox(self,slot):
+        """
+        Returns the (left, bottom, right, top) edges of the bolt in slot.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int, a live slot of this buffer
+        """
+        x = float(self._x[slot])
+        y = float(self._y[slot])
+        return (x - BOLT_WIDTH / 2,y - BOLT_HEIGHT / 2,x + BOLT_WIDTH / 2,\
+        y + BOLT_HEIGHT / 2)
+
+    def getSweptBox(self,slot):
+        """
+        Returns the (left, bottom, right, top) edges of the path of the bolt in
+        slot during the last step.
+
+        The path covers the bolt at its previous position, at its current
+        position and everywhere in between.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int, a live slot of this buffer
+        """
+        x = float(self._x[slot])
+        y = float(self._y[slot])
+        y0 = y - float(self._vy[slot])
+        return (x - BOLT_WIDTH / 2,min(y,y0) - BOLT_HEIGHT / 2,\
+        x + BOLT_WIDTH / 2,max(y,y0) + BOLT_HEIGHT / 2)
+
+    def getActive(self,player=None):
+        """
+        Returns the live slots as an int array in increasing order.
+
+        Parameter player: True for only player bolts, False for only alien bolts,
+        or None for all bolts
+        Precondition: player is a bool or None
+        """
+        if self._active is None:
+            self._active = np.flatnonzero(self._live)
+        if player is None:
+            return self._active
+        elif player:
+            return self._active[self._player[self._active]]
+        return self._active[~self._player[self._active]]
+
+    # INITIALIZER TO ALLOCATE THE BUFFER
+    def __init__(self,capacity):
+        """
+        Creates an empty bolt buffer with room for capacity bolts.
+
+        Parameter capacity: the maximum number of bolts
+        Precondition: capacity is an int > 0
+        """
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._vy = np.zeros(capacity)
+        self._player = np.zeros(capacity,dtype=bool)
+        self._live = np.zeros(capacity,dtype=bool)
+        self._free = list(range(capacity-1,-1,-1))
+        self._active = None
+        self._serial = np.zeros(capacity,dtype=np.int64)
+        self._spawned = 0
+        self._nplayer = 0
+
+    # METHODS
+    def spawn(self,x,y,velocity,player):
+        """
+        Adds a bolt centered at (x,y) and returns its slot (-1 if full).
+
+        Parameter x: the x-coordinate of the bolt
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y-coordinate of the bolt
+        Precondition: y is a number (int or float)
+
+        Parameter velocity: the velocity of the bolt
+        Precondition: velocity is a number (int or float)
+
+        Parameter player: whether the bolt is shot by the ship
+        Precondition: player is a bool
+        """
+        if not self._free:
+            return -1
+        slot = self._free.pop()
+        self._x[slot] = x
+        self._y[slot] = y
+        self._vy[slot] = velocity
+        self._player[slot] = player
+        self._live[slot] = True
+        self._spawned = self._spawned + 1
+        self._serial[slot] = self._spawned
+        self._active = None
+        if player:
+            self._nplayer = self._nplayer + 1
+        return slot
+
+    def kill(self,slot):
+        """
+        Removes the bolt in slot, freeing the slot.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int, a live slot of this buffer
+        """
+        self._live[slot] = False
+        self._vy[slot] = 0
+        self._free.append(slot)
+        self._active = None
+        if self._player[slot]:
+            self._nplayer = self._nplayer - 1
+
+    def killAll(self,slots):
+        """
+        Removes the bolts in all of the given slots at once.
+
+        Parameter slots: the slots of the bolts
+        Precondition: slots is an int array of distinct live slots
+        """
+        if len(slots) > 0:
+            self._live[slots] = False
+            self._vy[slots] = 0
+            self._nplayer = self._nplayer - int(np.count_nonzero(self._player[slots]))
+            self._free.extend(slots.tolist())
+            self._active = None
+
+    def step(self):
+        """
+        Moves every bolt vertically by its velocity.
+        """
+        self._y += self._vy
+
+    def cull(self,bottom,top):
+        """
+        Removes the bolts that are completely off screen and returns their slots.
+
+        A bolt is kept as long as its bottom edge is <= top and its top edge is
+        > bottom.
+
+        Parameter bottom: the bottom of the screen
+        Precondition: bottom is a number (int or float)
+
+        Parameter top: the top of the screen
+        Precondition: top is a number > bottom
+        """
+        off = self._live & ((self._y - BOLT_HEIGHT / 2 > top) | \
+        (self._y + BOLT_HEIGHT / 2 <= bottom))
+        slots = np.flatnonzero(off)
+        self.killAll(slots)
+        return slots
+
+    def sweep(self,left,bottom,right,top,player):
+        """
+        Returns the live bolts of one owner that hit boxes during the last step.
+
+        Each bolt is swept from its previous position to its current one, and the
+        first box it touched on the way is reported (see game2d.gcollide).  The
+        result is three arrays of the same length, one entry per bolt that hit
+        something: the slots, the index of the box each one hit first, and the
+        time of that hit as a fraction of the step.
+
+        Parameter left: the left edges of the boxes
+        Precondition: left is a sequence of numbers
+
+        Parameter bottom: the bottom edges of the boxes
+        Precondition: bottom is a sequence of numbers, as long as left
+
+        Parameter right: the right edges of the boxes
+        Precondition: right is a sequence of numbers, as long as left
+
+        Parameter top: the top edges of the boxes
+        Precondition: top is a sequence of numbers, as long as left
+
+        Parameter player: True to test player bolts, False to test alien bolts
+        Precondition: player is a bool
+        """
+        active = self.getActive(player)
+        vy = self._vy[active]
+        index, times = sweep_boxes(self._x[active],self._y[active] - vy,0.0,vy,\
+        BOLT_WIDTH,BOLT_HEIGHT,left,bottom,right,top)
+        hit = index >= 0
+        return (active[hit],index[hit],times[hit])
+
+    def intercept(self):
+        """
+        Returns the slots of the player and alien bolts that met in the last step.
+
+        A player bolt and an alien bolt meet if they overlapped at any moment of
+        the step.  The pairs are found for all bolts at once by a sort-and-sweep
+        on x (see game2d.gcollide.intercept), and each bolt meets at most one
+        other.  The bolts are not removed; that is up to the caller.
+        """
+        player = self.getActive(True)
+        alien = self.getActive(False)
+        if len(player) == 0 or len(alien) == 0:
+            return np.zeros(0,dtype=np.intp)
+        first, second, times = intercept(self._x[player],self._y[player],\
+        self._vy[player],self._x[alien],self._y[alien],self._vy[alien],\
+        BOLT_WIDTH,BOLT_HEIGHT)
+        return np.concatenate((player[first],alien[second]))
+
+    def hits(self,x,y,width,height,player):
+        """
+        Returns the live slots of one owner whose bolts overlap a rectangle.
+
+        Parameter x: the x-coordinate of the center of the rectangle
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y-coordinate of the center of the rectangle
+        Precondition: y is a number (int or float)
+
+        Parameter width: the width of the rectangle
+        Precondition: width is a number > 0
+
+        Parameter height: the height of the rectangle
+        Precondition: height is a number > 0
+
+        Parameter player: True to test player bolts, False to test alien bolts
+        Precondition: player is a bool
+        """
+        active = self.getActive(player)
+        near = (np.abs(self._x[active] - x) < (width + BOLT_WIDTH) / 2) & \
+        (np.abs(self._y[active] - y) < (height + BOLT_HEIGHT) / 2)
+        return active[near]
@@ -0,0 +1,160 @@
+"""
+Stress test for Alien Invaders
+
+This module runs a wave with a formation far larger than the 10 x 15 that
+consts.py accepts from the command line (hundreds by hundreds of aliens).  The
+aliens and their spacing are scaled down so that the formation fits the window
+(see fitGeometry in simulation.py), and the aliens fire volleys so that there
+are many bolts on screen too.  For example
+
+    python stress.py --rows 200 --cols 200             (in a window)
+    python stress.py --rows 200 --cols 200 --headless  (without one)
+
+The windowed mode is the regular game with the frame profiler on.  The
+headless mode plays the wave with a scripted policy (see batch.py) and prints
+the latency of each update and the throughput in frames per second.
+"""
+from consts import *
+from simulation import *
+import argparse
+import time
+
+import numpy as np
+
+# The rows and columns of the default stress formation
+STRESS_ROWS = 100
+STRESS_COLS = 100
+
+# The number of frames to run headless
+STRESS_FRAMES = 3600
+
+
+def options(rows,cols,seed=None):
+    """
+    Returns the WaveSim keyword arguments of a rows x cols stress wave.
+
+    The aliens fire one bolt per 12 columns at once, and the bolt buffer has
+    room for all of them.  The wave is endless, so it only ends when the aliens
+    are all dead or reach the defense line; the ships lost are still counted.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens in each row
+    Precondition: cols is an int > 0
+
+    Parameter seed: the seed of the random numbers (None for a random seed)
+    Precondition: seed is None or an int
+    """
+    volley = max(1,cols // ALIENS_IN_ROW)
+    return {'rows': rows, 'cols': cols, 'geometry': fitGeometry(rows,cols),
+            'volley': volley, 'capacity': max(BOLT_CAPACITY,volley*64),
+            'endless': True, 'seed': seed}
+
+
+def headless(rows,cols,frames=STRESS_FRAMES,policy='sweep',seed=0):
+    """
+    Plays a stress wave without a window and returns its timing.
+
+    The wave is played for the given number of frames (or until it ends), and a
+    lost ship is restored at once.  The result is a dictionary with the number
+    of frames requested and run, the update latency percentiles in
+    milliseconds, the throughput in frames per second, the number of aliens
+    killed, whether the wave was endless and the number of ships lost.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens in each row
+    Precondition: cols is an int > 0
+
+    Parameter frames: the maximum number of frames
+    Precondition: frames is an int > 0
+
+    Parameter policy: the name of the input policy
+    Precondition: policy is a key of batch.POLICIES
+
+    Parameter seed: the seed of the random numbers
+    Precondition: seed is an int
+    """
+    from batch import POLICIES, FRAME_TIME
+    clock = time.perf_counter_ns
+    sim = WaveSim(**options(rows,cols,seed))
+    player = POLICIES[policy]()
+    latency = np.zeros(frames,dtype=np.int64)
+    count = 0
+    start = clock()
+    while count < frames and not sim.isComplete():
+        if sim.getShipX() == None:
+            sim.restoreShip()
+        player.observe(sim)
+        begin = clock()
+        sim.update(player,FRAME_TIME)
+        if player.is_key_down('spacebar'):
+            sim.makeBolt()
+        latency[count] = clock() - begin
+        count = count + 1
+    elapsed = (clock() - start) / 1e9
+
+    p50, p99, p100 = np.percentile(latency[:count],(50,99,100)) / 1e6
+    return {'requested': frames, 'frames': count, 'p50_ms': p50, 'p99_ms': p99, 'max_ms': p100,
+            'frames_per_second': count / max(elapsed,1e-9),
+            'aliens_killed': rows*cols - sim.getFormation().getCount(),
+            'endless': sim.isEndless(), 'ships_lost': sim.getLost()}
+
+
+def windowed(rows,cols):
+    """
+    Plays a stress wave in a window, with the frame profiler on.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens in each row
+    Precondition: cols is an int > 0
+    """
+    from app import Invaders
+    settings = options(rows,cols)
+    del settings['seed'] # Invaders passes WAVE_SEED
+
+    class StressInvaders(Invaders):
+        WAVE_OPTIONS = settings
+
+    StressInvaders(width=GAME_WIDTH,height=GAME_HEIGHT,timestep=TIMESTEP,
+                   profile=True,budget=FRAME_BUDGET,
+                   profile_file=PROFILE_FILE,retained=RETAINED).run()
+
+
+def main(argv=None):
+    """
+    Runs the stress test from the command line.
+
+    Parameter argv: the command line arguments (None for sys.argv)
+    Precondition: argv is None or a list of strings
+    """
+    parser = argparse.ArgumentParser(description='Play a huge wave.')
+    parser.add_argument('--rows',type=int,default=STRESS_ROWS)
+    parser.add_argument('--cols',type=int,default=STRESS_COLS)
+    parser.add_argument('--headless',action='store_true')
+    parser.add_argument('--frames',type=int,default=STRESS_FRAMES)
+    parser.add_argument('--policy',default='sweep')
+    parser.add_argument('--seed',type=int,default=0)
+    args = parser.parse_args(argv)
+
+    if not args.headless:
+        windowed(args.rows,args.cols)
+        return
+    result = headless(args.rows,args.cols,args.frames,args.policy,args.seed)
+    print('formation:          %d x %d' % (args.rows,args.cols))
+    print('frames:             %d of %d' % (result['frames'],result['requested']))
+    print('aliens killed:      %d' % result['aliens_killed'])
+    print('ships lost:         %d%s' % (result['ships_lost'],
+                                        ' (endless wave)' if result['endless'] else ''))
+    print('update p50:         %.3f ms' % result['p50_ms'])
+    print('update p99:         %.3f ms' % result['p99_ms'])
+    print('update max:         %.3f ms' % result['max_ms'])
+    print('frames/sec:         %.0f' % result['frames_per_second'])
+
+
+if __name__ == '__main__':
+    main()
@@ -19,7 +19,9 @@ Izabela L. & Luca G.
 from game2d import *
 from consts import *
 from models import *
-import random
+from simulation import *
+
+import numpy as np
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Wave is NOT allowed to access anything in app.py (Subcontrollers are not
@@ -42,6 +44,12 @@ class Wave(object):
     class will be similar to than one in how it interacts with the main class
     Invaders.
 
+    The rules of the wave live in a WaveSim (see simulation.py), which does
+    not need a window.  This class only keeps the models that draw it, and
+    brings them up to date with the simulation when it is drawn.  Unless
+    BATCH_DRAW is False, the aliens and the bolts are not drawn by their
+    models but by sprite batches, one per alien image and bolt color.
+
     All of the attributes of this class ar to be hidden. You may find that
     you want to access an attribute in class Invaders. It is okay if you do,
     but you MAY NOT ACCESS THE ATTRIBUTES DIRECTLY. You must use a getter
@@ -51,56 +59,70 @@ class Wave(object):
 
     """
     # HIDDEN ATTRIBUTES:
+    # Attribute _sim: the simulation of this wave
+    # Invariant: _sim is a WaveSim
+    #
     # Attribute _ship: the player ship to control
     # Invariant: _ship is a Ship object or None
     #
     # Attribute _aliens: the 2d list of aliens in the wave
-    # Invariant: _aliens is a rectangular 2d list containing Alien objects or None
+    # Invariant: _aliens is a rectangular 2d list containing Alien objects or
+    # None, or it is None if the aliens have no models yet (with BATCH_DRAW, they
+    # are only made when asked for)
+    #
+    # Attribute _living: the aliens of _aliens that are not None
+    # Invariant: _living is a dict from (row, col) to _aliens[row][col], for
+    # every entry of _aliens that is not None; None if _aliens is None
+    #
+    # Attribute _sprites: the Bolt objects drawing the live slots of the bolts
+    # Invariant: _sprites is a list as long as the bolt capacity; entry i is a
+    # Bolt or None
+    #
+    # Attribute _serials: the serial number of the bolt drawn by each sprite
+    # Invariant: _serials is a list as long as _sprites; entry i is an int, 0
+    # when _sprites[i] is None
+    #
+    # Attribute _playerpool: the spare player bolts, for reuse
+    # Invariant: _playerpool is a GObjectPool of Bolt, none of them in _sprites
     #
-    # Attribute _bolts: the laser bolts currently on screen
-    # Invariant: _bolts is a list of Bolt objects, possibly empty
+    # Attribute _alienpool: the spare alien bolts, for reuse
+    # Invariant: _alienpool is a GObjectPool of Bolt, none of them in _sprites
+    #
+    # Attribute _shippool: the destroyed ships, for reuse by restoreShip
+    # Invariant: _shippool is a GObjectPool of Ship, not containing _ship
     #
     # Attribute _dline: the defensive line being protected
     # Invariant : _dline is a GPath object
     #
-    # Attribute _lives: the number of lives left
-    # Invariant: _lives is an int >= 0
+    # Attribute _alienbatches: the batches drawing the aliens, one per image
+    # Invariant: _alienbatches is a list of GSpriteBatch, one per entry of
+    # ALIEN_IMAGES (empty if BATCH_DRAW is False)
     #
-    # Attribute _time: the amount of time since the last Alien "step"
-    # Invariant: _time is a float >= 0s
+    # Attribute _alienquads: the aliens drawn by each batch
+    # Invariant: _alienquads is a list of int arrays, one per batch; quad i of
+    # _alienbatches[k] draws the alien at flat index _alienquads[k][i] of the
+    # formation
     #
-    # You may change any attribute above, as long as you update the invariant
-    # You may also add any new attributes as long as you document them.
-    # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-
-    # Attribute _savedx: the ship position when a life is lost
-    # Invariant: _savedx is a float >= 0 and <= GAME_WIDTH
-
-    # Attribute _num: the first attribute that helps keep track of alien movement
-    # Invariant: _num is an int >= 0
-
-    # Attribute _down: the second attribute that helps keep track of alien movement
-    # Invariant: _down is an int >= 0
-
-    # Attribute _walkies: the number of steps each alien takes per _fire interval
-    # Invariant: _walkies is an int >= 0 that resets to 0 each time it's >= _fire
-
-    # Attribute _fire: the step number at which an alien fires a bolt
-    # Invariant: _fire is an int >= 1 and <= BOLT_RATE
-
-    # Attribute _destroyed: whether all the aliens are destroyed or not
-    # Invariant: _destroyed is a bool that is True when there are no aliens left
-    # in self._aliens
-
-    # Attribute _passed: whether the botom row of aliens has passed the _dline
-    # Invariant: _passed is a bool that is True if the aliens have passed the
-    # _dline and is False if they haven't
+    # Attribute _boltbatches: the batches drawing the player and alien bolts
+    # Invariant: _boltbatches is a pair of GSpriteBatch, as long as the bolt
+    # capacity; quad i draws the bolt in slot i (empty if BATCH_DRAW is False)
+    #
+    # Attribute _batched: the formation (moves, kills) when the batches were
+    # last synced
+    # Invariant: _batched is a pair of ints, or None if never synced
+    #
+    # Attribute _moves: the formation move count when the aliens were last synced
+    # Invariant: _moves is an int >= 0
+    #
+    # Attribute _kills: the number of formation kills already removed from _aliens
+    # Invariant: _kills is an int >= 0
 
     # GETTERS AND SETTERS
     def getShip(self):
         """
         Returns the player ship to control.
         """
+        self.syncShip()
         return self._ship
 
     def setShip(self, value):
@@ -112,6 +134,7 @@ class Wave(object):
         """
         assert isinstance(value, Ship)
         self._ship = value
+        self._sim.setShipX(float(value.getX()))
 
     def getAlien(self,row,col):
         """
@@ -123,48 +146,73 @@ class Wave(object):
         Parameter col: the col of the alien
         Precondition: col is an int >= 0 and an int < ALIENS_IN_ROW
         """
+        self.syncAliens()
         if self._aliens[row][col] != None:
             return self._aliens[row][col]
 
     def getBolts(self):
         """
-        Returns the list of bolt objects.
+        Returns the list of bolt objects on screen.
+
+        The list is built from the live slots of the bolt buffer, so it is a
+        snapshot: changing it does not add or remove bolts.
+        """
+        self.syncBolts()
+        bolts = self._sim.getBolts()
+        return [self._sprites[slot] for slot in bolts.getActive().tolist()]
+
+    def getBoltCount(self):
+        """
+        Returns the number of bolts on screen.
+        """
+        return self._sim.getBolts().getCount()
+
+    def getAlienCount(self):
+        """
+        Returns the number of aliens still alive.
+        """
+        return self._sim.getFormation().getCount()
+
+    def getSim(self):
+        """
+        Returns the WaveSim with the rules of this wave.
         """
-        return self._bolts
+        return self._sim
 
     def getLives(self):
         """
         Returns the number of lives left.
         """
-        return self._lives
+        return self._sim.getLives()
 
     def getPassed(self):
         """
         Returns a bool specifying whether the aliens have passed the _dline.
         """
-        return self._passed
+        return self._sim.getPassed()
 
     def getDestroyed(self):
         """
         Returns a bool specifying whether the array self._aliens is empty.
         """
-        return self._destroyed
+        return self._sim.getDestroyed()
 
     def getSavedX(self):
         """
         Returns the position of x at which the player ship lost a life.
         """
-        return self._savedx
+        return self._sim.getSavedX()
 
     # INITIALIZER TO CREATE SHIP AND ALIENS
-    def __init__(self,height=GAME_HEIGHT,width=GAME_WIDTH):
+    def __init__(self,height=GAME_HEIGHT,width=GAME_WIDTH,seed=None,**options):
         """
         Initializes a wave of aliens, bolts, and the ship inside a game window.
 
-        The wave of aliens is a nested list of ALIEN_ROWS by ALIENS_IN_ROW. The
-        ship spawns at (width/2, SHIP_HEIGHT). Additionally creates an array of
-        bolts that will store all of the on-screen bolts and a _dline that
-        the player must prevent the aliens from passing.
+        The wave of aliens is a nested list of ALIEN_ROWS by ALIENS_IN_ROW
+        (unless options says otherwise). The
+        ship spawns at (width/2, SHIP_HEIGHT). Additionally creates the sprites
+        that will draw the on-screen bolts and a _dline that the player must
+        prevent the aliens from passing.
 
         DEFAULT: The game window has a height of GAME_HEIGHT and a width
         of GAME_WIDTH.
@@ -174,42 +222,42 @@ class Wave(object):
 
         Parameter width: is window width
         Precondition: width is an int > 0
+
+        Parameter seed: the seed of the random numbers (None for a random seed)
+        Precondition: seed is None or an int
+
+        Parameter options: more keyword arguments for the WaveSim (rows, cols,
+        geometry and so on)
+        Precondition: options are keyword arguments of WaveSim
         """
-        #Creates the 2D nested list of aliens.
-        self._aliens = []
-        for row in range(ALIEN_ROWS):
-            r = []
-            for col in range(ALIENS_IN_ROW):
-                r.append(0)
-            self._aliens.append(r)
-        for row in range(ALIEN_ROWS):
-            for col in range (ALIENS_IN_ROW):
-                x = ALIEN_H_SEP + (ALIEN_WIDTH / 2) + col * (ALIEN_H_SEP + \
-                ALIEN_WIDTH)
-                y = height - ALIEN_CEILING - ALIEN_HEIGHT / 2 - ((ALIEN_ROWS - \
-                (row + 1)) * (ALIEN_V_SEP + ALIEN_HEIGHT))
-                self._aliens[row][col] = Alien(x,y,row)
+        self._sim = WaveSim(height,width,seed=seed,**options)
+        self._aliens = None
+        self._living = None
+        self._moves = 0
+        self._kills = 0
+        if not BATCH_DRAW:
+            self.makeAliens()
         self._ship = Ship(width/2)
-        self._savedx = width/2
         self._dline = DefenseLine()
-        self._time = 0
-        self._num = 0
-        self._down = 0
-        self._bolts = []
-        self._walkies = 0
-        self._fire = random.randint(1,BOLT_RATE)
-        self._lives = SHIP_LIVES
-        self._destroyed = False
-        self._passed = False
+        capacity = self._sim.getBolts().getCapacity()
+        self._sprites = [None]*capacity
+        self._serials = [0]*capacity
+        self._playerpool = GObjectPool(Bolt)
+        self._alienpool = GObjectPool(Bolt)
+        self._shippool = GObjectPool(Ship)
+        self._alienbatches = []
+        self._alienquads = []
+        self._boltbatches = ()
+        self._batched = None
+        if BATCH_DRAW:
+            self.makeBatches()
 
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
     def update(self,input,dt):
         """
         Moves and removes the ship, bolts, and aliens.
 
-        Aliens move every time self._time reaches ALIEN_SPEED. If the aliens go
-        across the _dline, then self._passed is True. If all of the aliens are
-        destroyed, then self._destroyed is True.
+        The work is done by the simulation; the models catch up when drawn.
 
         Parameter input: The keyboard input
         Precondition: input is a touched key on the keyboard.
@@ -217,210 +265,242 @@ class Wave(object):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        self.getShip().moveShip(input,dt)
-        q = []
-        for x in range(len(self._bolts)):
-            self._bolts[x].moveBolt()
-            if(self._bolts[x].getY() - BOLT_HEIGHT / 2 <= GAME_HEIGHT and \
-            self._bolts[x].getY() + BOLT_HEIGHT / 2 > 0):
-                q.append(self._bolts[x])
-        self._bolts = q[:]
-        for y in range(len(q)):
-            self.delEntity(q[y])
-        if self.aliensDead() == True:
-            self._destroyed = True
-        elif self.bottomRowY() - ALIEN_HEIGHT / 2 < DEFENSE_LINE:
-            self._passed = True
-        elif(self._time <= ALIEN_SPEED): #Keeps track of the time.
-            self._time = self._time + dt
-        else: #Resets the time and makes the aliens move.
-            self.alienMarch()
-            self._walkies = self._walkies + 1
-            if(self._walkies >= self._fire): #Makes the aliens fire.
-                self._walkies = 0
-                self.makeAlienBolt()
-                self._fire = random.randint(1,BOLT_RATE)
+        self._sim.update(input,dt)
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
     def draw(self,view):
         """
         Draws the aliens, bolts, and ship into view.
 
+        If BATCH_DRAW is True, the aliens and the bolts are drawn by the
+        batches, each with a single mesh, and their models are not synced.
+
         Parameter view: the view window
         Precondition: view is a GView.
         """
-        for row in self._aliens: #Draws the aliens.
-            for alien in row:
-                if alien != None:
-                    alien.draw(view)
-        self._ship.draw(view) #Draws the ship.
+        if not BATCH_DRAW:
+            self.drawModels(view)
+            return
+        self.syncBatches()
+        self.syncShip()
+        for batch in self._alienbatches: #Draws the aliens.
+            batch.draw(view)
+        if self._ship != None: #Draws the ship.
+            self._ship.draw(view)
         self._dline.draw(view)
-        for x in range(len(self._bolts)):
-            self._bolts[x].draw(view)
+        for batch in self._boltbatches:
+            batch.draw(view)
 
-    #HELPER METHODS
-    def firstColX(self):
-        """
-        Returns the x-coordinate of the left-most column of aliens.
-        """
-        for x in range(ALIEN_ROWS):
-            if self._aliens[x][self.firstCol()] != None:
-                alien = self._aliens[x][self.firstCol()]
-                return alien.getX()
-
-    def lastColX(self):
-        """
-        Returns the x-coordinate of the right-most column of aliens.
-        """
-        for x in range(ALIEN_ROWS):
-            if self._aliens[x][self.lastCol()] != None:
-                alien = self._aliens[x][self.lastCol()]
-                return alien.getX()
-
-    def firstCol(self):
-        """
-        Returns the number of the left-most non-empty column.
-        """
-        for x in range(ALIENS_IN_ROW):
-            count = 0
-            for y in range(len(self._aliens)):
-                if self._aliens[y][x] != None:
-                    count = count + 1
-            if count > 0:
-                return x
-        return len(self._aliens)
-
-    def lastCol(self):
-        """
-        Returns the number of the right-most non-empty column.
-        """
-        for x in range(ALIENS_IN_ROW):
-            count = 0
-            for y in range(len(self._aliens)):
-                if self._aliens[y][ALIENS_IN_ROW - 1 - x] != None:
-                    count = count + 1
-            if count > 0:
-                return ALIENS_IN_ROW - 1 - x
-
-    def bottomRow(self):
-        """
-        Returns the bottom non-empty row number of aliens.
-        """
-        for x in range(len(self._aliens)):
-            count = 0
-            for y in range(len(self._aliens[x])):
-                if self._aliens[x][y] != None:
-                    count = count + 1
-                if count > 0:
-                    return x
-        return None
-
-    def bottomRowY(self):
-        """
-        Returns the y-coordinate of the bottom row of aliens.
-        """
-        for x in range(len(self._aliens[self.bottomRow()])):
-            if self._aliens[self.bottomRow()][x] != None:
-                alien = self._aliens[self.bottomRow()][x]
-                return alien.getY()
-
-    def alienMarch(self):
-        """
-        Coordinates the movement of aliens across the screen.
-
-        First, the aliens step right until they're ALIEN_H_SEP away from the right
-        side of the screen. Then, they move down a step and go left until they're
-        ALIEN_H_SEP away from the left side of the screen. Lastly, they move a
-        step down and repeat the process.
-        """
-        if self._down % 2 == 1:
-            for row in range(ALIEN_ROWS):
-                for col in range (ALIENS_IN_ROW):
-                    if self._aliens[row][col] != None:
-                        if self._num % 2 == 1:
-                            self.getAlien(row,col).moveAlienLeft()
-                        else:
-                            self.getAlien(row,col).moveAlienRight()
-            self._down = self._down + 1
-        elif((self.lastColX() + (ALIEN_WIDTH / 2) > \
-        GAME_WIDTH - ALIEN_H_SEP) or (self.firstColX() - \
-        (ALIEN_WIDTH / 2) < ALIEN_H_SEP)):
-            for row in range(ALIEN_ROWS):
-                for col in range (ALIENS_IN_ROW):
-                    if self._aliens[row][col] != None:
-                        self.getAlien(row,col).moveAlienDown()
-            self._num = self._num + 1
-            self._down = self._down + 1
-        elif self._num % 2 == 0:
-            for row in range(ALIEN_ROWS):
-                for col in range (ALIENS_IN_ROW):
-                    if self._aliens[row][col] != None:
-                        self.getAlien(row,col).moveAlienRight()
-        elif self._num % 2 == 1:
-            for row in range(ALIEN_ROWS):
-                for col in range (ALIENS_IN_ROW):
-                    if self._aliens[row][col] != None:
-                        self.getAlien(row,col).moveAlienLeft()
-        self._time = 0
+    def drawModels(self,view):
+        """
+        Draws the aliens, bolts, and ship into view, each with its own model.
 
+        Parameter view: the view window
+        Precondition: view is a GView.
+        """
+        self.syncAliens()
+        self.syncShip()
+        self.syncBolts()
+        for alien in self._living.values(): #Draws the aliens.
+            alien.draw(view)
+        if self._ship != None: #Draws the ship.
+            self._ship.draw(view)
+        self._dline.draw(view)
+        for slot in self._sim.getBolts().getActive().tolist():
+            self._sprites[slot].draw(view)
+
+    #HELPER METHODS
     def makeBolt(self):
         """
         Creates a player ship bolt.
         """
-        count = 0
-        for x in range(len(self._bolts)):
-            if self._bolts[x].getPlayer():
-                count = count + 1
-        if count == 0:
-            ypos = (SHIP_BOTTOM + SHIP_HEIGHT + (BOLT_HEIGHT/2))
-            self._bolts.append(Bolt(self._ship.getX(),ypos,BOLT_SPEED,True))
-
-    def makeAlienBolt(self):
-        """
-        Creates an alien bolt.
-        """
-        list = []
-        for x in range(ALIENS_IN_ROW):
-            empty = True
-            for y in range(ALIEN_ROWS):
-                if(self._aliens[y][x] != None):
-                    empty = False
-            if(empty == False):
-                list.append(x)
-        call = random.randint(0,len(list) - 1)
-        column = list[call]
-        for x in range(ALIEN_ROWS):
-            if(self._aliens[ALIEN_ROWS - 1 - x][column] != None):
-                high = ALIEN_ROWS - 1 - x
-        chosen = self._aliens[high][column]
-        self._bolts.append(Bolt(chosen.getX(),chosen.getY() - \
-        ALIEN_HEIGHT / 2,-1 * BOLT_SPEED,False))
-
-    def delEntity(self, bolt):
-        """
-        Removes aliens and ship from screen and decreases player lives.
-
-        Once an alien is shot, it's set to None. Once the ship is shot, it's set
-        to None and self._lives is decreased by 1.
-
-        Parameter bolt: the laser bolt to check
-        Precondition: bolt of the class Bolt
-        """
-        for row in range(ALIEN_ROWS):
-            for col in range(ALIENS_IN_ROW):
-                if self._aliens[row][col] != None:
-                    if self._aliens[row][col].collides(bolt):
-                        self._aliens[row][col] = None
-                        self._bolts.remove(bolt)
-        if self._ship != None:
-            if self._ship.collides(bolt):
-                self._lives = self._lives - 1
-                self._bolts.remove(bolt)
-                self._savedx = self._ship.getX()
-                self._ship = None
+        self._sim.makeBolt()
+
+    def restoreShip(self):
+        """
+        Restores the destroyed ship at the position where it was shot.
+
+        The ship is reused from the pool of destroyed ships if possible.
+        """
+        self._sim.restoreShip()
+        self.syncShip()
+
+    def syncAliens(self):
+        """
+        Brings the alien images up to date with the formation.
 
-    def aliensDead(self):
+        Dead aliens are set to None; only the kills since the last call are
+        looked at.  Positions are only copied when the formation has marched
+        since the last call, and only to the living aliens.  The aliens are
+        made by the first call if they have no models yet.
         """
-        Returns True if all of the aliens are dead.
+        if self._aliens == None:
+            self.makeAliens()
+            return
+        formation = self._sim.getFormation()
+        kills = formation.getKills()
+        if len(kills) != self._kills:
+            for (row,col) in kills[self._kills:]:
+                self._aliens[row][col] = None
+                del self._living[(row,col)]
+            self._kills = len(kills)
+        if formation.getMoves() != self._moves:
+            xs = formation.getXs()[0].tolist()
+            ys = formation.getYs()[:,0].tolist()
+            for ((row,col),alien) in self._living.items():
+                alien.x = xs[col]
+                alien.y = ys[row]
+            self._moves = formation.getMoves()
+
+    def makeAliens(self):
+        """
+        Creates the 2D nested list of aliens drawing the formation.
+
+        Only the living aliens get an Alien, at their current position.
         """
-        return self.bottomRow() == None
+        formation = self._sim.getFormation()
+        geometry = formation.getGeometry()
+        rows, cols = formation.getShape()
+        self._aliens = []
+        self._living = {}
+        for row in range(rows):
+            r = []
+            for col in range(cols):
+                alien = None
+                if formation.isAlive(row,col):
+                    x, y = formation.getPosition(row,col)
+                    alien = Alien(x,y,row,geometry.getWidth(),geometry.getHeight())
+                    self._living[(row,col)] = alien
+                r.append(alien)
+            self._aliens.append(r)
+        self._moves = formation.getMoves()
+        self._kills = len(formation.getKills())
+
+    def makeBatches(self):
+        """
+        Creates the batches drawing the aliens and the bolts.
+
+        The aliens with the same image share a batch, and their sizes never
+        change.  The player bolts and the alien bolts each have a batch of
+        their color, with a quad for every slot of the bolt buffer.
+        """
+        formation = self._sim.getFormation()
+        geometry = formation.getGeometry()
+        rows, cols = formation.getShape()
+        kinds = np.array([formation.getKind(row,0) for row in range(rows)])
+        kinds = np.repeat(kinds,cols)
+        self._alienbatches = []
+        self._alienquads = []
+        for kind in range(len(ALIEN_IMAGES)):
+            quads = np.flatnonzero(kinds == kind)
+            batch = GSpriteBatch(len(quads),source=ALIEN_IMAGES[kind])
+            batch.place(np.zeros(len(quads)),0.0,geometry.getWidth(),\
+            geometry.getHeight())
+            self._alienbatches.append(batch)
+            self._alienquads.append(quads)
+        capacity = self._sim.getBolts().getCapacity()
+        self._boltbatches = (GSpriteBatch(capacity,fillcolor='blue'),
+                             GSpriteBatch(capacity,fillcolor='red'))
+        for batch in self._boltbatches:
+            batch.place(np.zeros(capacity),0.0,BOLT_WIDTH,BOLT_HEIGHT)
+        self._batched = None
+
+    def syncBatches(self):
+        """
+        Brings the alien and bolt batches up to date with the simulation.
+
+        The aliens are only placed again when the formation has marched or
+        lost an alien since the last call.  The bolts move every frame, so
+        they are placed whenever there are bolts (or were some before).
+        """
+        if not self._boltbatches:
+            self.makeBatches()
+        formation = self._sim.getFormation()
+        state = (formation.getMoves(),len(formation.getKills()))
+        if state != self._batched:
+            xs = formation.getXs().ravel()
+            ys = formation.getYs().ravel()
+            alive = formation.getAlive().ravel()
+            for (batch,quads) in zip(self._alienbatches,self._alienquads):
+                batch.place(xs[quads],ys[quads])
+                batch.show(slice(None),alive[quads])
+            self._batched = state
+
+        bolts = self._sim.getBolts()
+        if bolts.getCount() == 0 and self._boltbatches[0].count == 0 \
+        and self._boltbatches[1].count == 0:
+            return
+        live = bolts.getLive()
+        players = bolts.getPlayers()
+        xs = bolts.getXs()
+        ys = bolts.getYs()
+        for (batch,owner) in zip(self._boltbatches,(players,~players)):
+            batch.place(xs,ys)
+            batch.show(slice(None),live & owner)
+
+    def syncShip(self):
+        """
+        Brings the ship image up to date with the simulation.
+
+        A destroyed ship goes back to its pool, and a restored ship is taken
+        from the pool.
+        """
+        x = self._sim.getShipX()
+        if x == None:
+            if self._ship != None:
+                self._shippool.release(self._ship)
+                self._ship = None
+        elif self._ship == None:
+            self._ship = self._shippool.acquire(float(x))
+        else:
+            self._ship.x = x
+
+    def syncBolts(self):
+        """
+        Brings the bolt sprites up to date with the bolt buffer.
+
+        Sprites of dead bolts go back to the pool of their owner, new bolts get a
+        sprite from the pool of their owner, and every sprite gets the position
+        of its bolt.  A slot that was reused since the last call is recognized by
+        its serial number.
+        """
+        bolts = self._sim.getBolts()
+        active = bolts.getActive()
+        slots = active.tolist()
+        serials = bolts.getSerials()[active].tolist()
+        xs = bolts.getXs()[active].tolist()
+        ys = bolts.getYs()[active].tolist()
+        players = bolts.getPlayers()[active].tolist()
+        live = set(slots)
+        for slot in range(len(self._sprites)):
+            if self._sprites[slot] != None and not slot in live:
+                self.releaseBolt(slot)
+        for i in range(len(slots)):
+            slot = slots[i]
+            if self._serials[slot] != serials[i]:
+                if self._sprites[slot] != None:
+                    self.releaseBolt(slot)
+                velocity = BOLT_SPEED if players[i] else -1 * BOLT_SPEED
+                pool = self._playerpool if players[i] else self._alienpool
+                self._sprites[slot] = pool.acquire(float(xs[i]),float(ys[i]),\
+                velocity,players[i])
+                self._serials[slot] = serials[i]
+            else:
+                bolt = self._sprites[slot]
+                bolt.x = xs[i]
+                bolt.y = ys[i]
+
+    def releaseBolt(self,slot):
+        """
+        Returns the sprite of a bolt slot to the pool of its owner.
+
+        Parameter slot: the slot of the bolt
+        Precondition: slot is an int; a slot with a sprite
+        """
+        bolt = self._sprites[slot]
+        self._sprites[slot] = None
+        self._serials[slot] = 0
+        if bolt.getPlayer():
+            self._playerpool.release(bolt)
+        else:
+            self._alienpool.release(bolt)
@@ -0,0 +1,64 @@
+"""
+Test configuration for Alien Invaders
+
+The game modules import each other by their bare names (they are run from
+the invaders folder), so that folder is put on the path.  The tests of the
+simulation and of the collision tests need only NumPy; the others skip
+themselves when Kivy is not installed.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,os.path.join(ROOT,'invaders'))
+
+# Keep Kivy from parsing the pytest arguments or flooding the output
+os.environ.setdefault('KIVY_NO_ARGS','1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG','1')
+
+
+@pytest.fixture(scope='module')
+def images():
+    """
+    Sets the resource paths of the game, so that the images can be loaded.
+    """
+    pytest.importorskip('kivy')
+    from app import Invaders
+    Invaders.__new__(Invaders)._setpaths()
+
+
+class KeyInput(object):
+    """
+    An input that reports a fixed set of keys as pressed and held.
+
+    It stands in for GInput (which needs a window) when driving the game.
+    """
+
+    def __init__(self,*keys):
+        """
+        Creates an input with the given keys held down.
+
+        Parameter keys: the names of the keys
+        Precondition: keys are strings
+        """
+        self.keys = set(keys)
+
+    def is_key_down(self,key):
+        """
+        Returns True if key is held down.
+        """
+        return key in self.keys
+
+    def is_key_pressed(self,key):
+        """
+        Returns True if key is held down.
+        """
+        return key in self.keys
+
+    def _prestep(self):
+        pass
+
+    def _poststep(self):
+        pass
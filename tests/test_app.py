@@ -0,0 +1,113 @@
+"""
+Tests of the game states of Invaders, driven with a fixed timestep.
+
+The game is built without opening its window: the frames are run with
+_refresh, a real view and an input that holds fixed keys.
+"""
+import pytest
+
+pytest.importorskip('kivy')
+
+from conftest import KeyInput
+from consts import *
+
+
+@pytest.fixture
+def game():
+    """
+    Returns an Invaders playing a new wave, with a fixed timestep.
+    """
+    from app import Invaders
+    from game2d import GView, GProfiler
+    game = Invaders.__new__(Invaders)
+    game._setpaths()
+    game._gwidth = GAME_WIDTH
+    game._gheight = GAME_HEIGHT
+    game._timestep = TIMESTEP
+    game._maxsteps = 5
+    game._backlog = 0.0
+    game._profiler = GProfiler(enabled=False)
+    game._view = GView()
+    game._input = KeyInput()
+    game.start()
+    game._input = KeyInput('s')
+    game._refresh(TIMESTEP)
+    game._input = KeyInput()
+    assert game._state == STATE_ACTIVE
+    return game
+
+
+def lose_ship(game):
+    """
+    Fires an alien bolt at the ship and runs frames until the game pauses.
+    """
+    sim = game._wave.getSim()
+    sim.getBolts().spawn(sim.getShipX(),SHIP_BOTTOM+SHIP_HEIGHT,-BOLT_SPEED,False)
+    for _ in range(20):
+        game._refresh(TIMESTEP)
+        if game._state == STATE_PAUSED:
+            return
+    pytest.fail('the bolt did not hit the ship')
+
+
+def test_continue_in_a_frame_of_one_tick(game):
+    lose_ship(game)
+    game._input = KeyInput('s')
+    game._refresh(TIMESTEP)
+    assert game._state == STATE_CONTINUE
+    game._input = KeyInput()
+    game._refresh(TIMESTEP)
+    assert game._state == STATE_ACTIVE
+    assert game._wave.getSim().getShipX() != None
+
+
+def test_continue_in_a_frame_of_two_ticks(game):
+    lose_ship(game)
+    game._input = KeyInput('s')
+    game._refresh(2*TIMESTEP)
+    assert game._state == STATE_ACTIVE
+    assert game._wave.getSim().getShipX() != None
+    assert game._wave.getShip() != None
+
+
+def test_batched_wave_makes_alien_models_on_demand(game):
+    import wave
+    if not wave.BATCH_DRAW:
+        pytest.skip('the aliens are drawn by their models')
+    game._refresh(TIMESTEP)
+    assert game._wave._aliens == None
+    formation = game._wave.getSim().getFormation()
+    formation.kill(0,0)
+    assert game._wave.getAlien(0,0) == None
+    alien = game._wave.getAlien(1,2)
+    assert (alien.getX(),alien.getY()) == formation.getPosition(1,2)
+    assert len(game._wave._living) == formation.getCount()
+
+
+def test_ticks_are_capped_by_maxsteps(game):
+    game._backlog = 0.0
+    assert game._ticks(0.5*TIMESTEP) == ()
+    assert game._ticks(0.75*TIMESTEP) == (TIMESTEP,)
+    assert game._backlog == pytest.approx(0.25*TIMESTEP)
+    # A long stall only catches up maxsteps, and drops the rest of the backlog
+    assert game._ticks(20*TIMESTEP) == (TIMESTEP,)*game._maxsteps
+    assert 0 <= game._backlog < TIMESTEP
+    assert len(game._ticks(2*TIMESTEP)) in (2,3)
+
+
+def test_a_long_frame_runs_at_most_maxsteps_updates(game):
+    from app import Invaders
+    steps = []
+    update = Invaders.update
+    game.update = lambda dt: steps.append(dt) or update(game,dt)
+    game._backlog = 0.0
+    game._refresh(20*TIMESTEP)
+    assert steps == [TIMESTEP]*game._maxsteps
+    del steps[:]
+    game._refresh(TIMESTEP)
+    assert steps == [TIMESTEP]
+
+
+def test_variable_timestep_runs_one_update(game):
+    game._timestep = None
+    assert game._ticks(0.123) == (0.123,)
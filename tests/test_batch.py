@@ -0,0 +1,108 @@
+"""
+Tests of the scripted policies and of the batch runner in batch.py.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from consts import *
+from simulation import *
+from batch import *
+
+
+def test_sweep_turns_at_the_walls_of_a_narrow_window():
+    width = GAME_WIDTH // 2
+    sim = WaveSim(width=width,seed=0)
+    player = SweepPolicy()
+    turns = 0
+    right = True
+    for _ in range(400):
+        sim.moveShip(player)
+        player.observe(sim)
+        if player.is_key_down('d') != right:
+            right = not right
+            turns = turns + 1
+        assert SHIP_WIDTH/2 - SHIP_MOVEMENT <= sim.getShipX() <= width
+    assert turns >= 2
+
+
+def test_bot_stays_under_a_column_it_can_reach():
+    width = GAME_WIDTH // 2
+    sim = WaveSim(width=width,rows=1,cols=1,seed=0)
+    sim.setShipX(float(width - SHIP_WIDTH/2))
+    formation = sim.getFormation()
+    # A column beyond the right wall is out of reach: the bot waits at the wall
+    formation.march(width + 100.0 - formation.getColumnX(0),0.0)
+    player = BotPolicy()
+    player.observe(sim)
+    assert not player.is_key_down('d') and not player.is_key_down('a')
+
+
+def test_play_reports_the_lives_of_its_config():
+    result = play((7,{'rows':5,'cols':12,'lives':1},'sweep',20000))
+    assert set(result) == {'seed','frames','duration','lives_lost','aliens_killed',
+                           'won','finished'}
+    assert result['seed'] == 7
+    assert result['finished'] and not result['won']
+    assert result['lives_lost'] == 1
+    assert result['duration'] == result['frames']*FRAME_TIME
+    assert 0 <= result['aliens_killed'] < 5*12
+
+
+def test_play_stops_at_the_frame_limit():
+    result = play((0,{'rows':2,'cols':3},'idle',50))
+    assert result['frames'] == 50
+    assert not result['finished']
+    assert result['lives_lost'] == 0 and result['aliens_killed'] == 0
+
+
+def batch(code):
+    """
+    Runs code in a new interpreter in the invaders folder and returns its output.
+
+    The process pool of run forks its workers, which hangs once other tests
+    have loaded Kivy (and its threads), so run is only called in a fresh
+    process.
+    """
+    folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'invaders')
+    result = subprocess.run([sys.executable,'-c',code],cwd=folder,capture_output=True,
+                            text=True,timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_run_sums_the_games():
+    config = {'rows':2,'cols':3,'lives':1}
+    output = batch("""
+import json
+from batch import run
+seen = []
+summary = run(range(4),%r,'sweep',2000,processes=2,callback=seen.append)
+print(json.dumps([summary,seen]))
+""" % config)
+    summary, seen = json.loads(output)
+    games = [play((seed,config,'sweep',2000)) for seed in range(4)]
+    assert sorted(seen,key=lambda result: result['seed']) == games
+    assert summary['games'] == 4
+    assert summary['wins'] == sum(game['won'] for game in games)
+    assert summary['frames'] == sum(game['frames'] for game in games)
+    assert summary['mean_lives_lost'] == sum(game['lives_lost'] for game in games)/4
+
+
+def test_parse_seeds():
+    assert parse_seeds('3') == range(3)
+    assert parse_seeds('10:14') == range(10,14)
+
+
+def test_main_passes_the_lives():
+    output = batch("""
+from batch import main
+main(['--seeds','2','--rows','2','--cols','3','--lives','1',
+      '--policy','sweep','--max-frames','2000','--processes','1'])
+""")
+    assert 'games:              2' in output
+    games = [play((seed,{'rows':2,'cols':3,'lives':1},'sweep',2000)) for seed in range(2)]
+    lost = sum(game['lives_lost'] for game in games)/2
+    assert 'mean lives lost:    %.2f' % lost in output
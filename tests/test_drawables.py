@@ -0,0 +1,219 @@
+"""
+Tests of the game2d drawables that need Kivy (but not a window).
+"""
+import pytest
+
+pytest.importorskip('kivy')
+
+from game2d import GLabel, GObjectPool
+
+
+def drawables():
+    """
+    Returns a factory for every drawable class with __slots__, by name.
+    """
+    import game2d
+    import models
+    return {
+        'GObject':      lambda: game2d.GObject(x=1,y=2,width=10,height=10),
+        'GScene':       lambda: game2d.GScene(children=[game2d.GRectangle(width=5,height=5)]),
+        'GRectangle':   lambda: game2d.GRectangle(width=10,height=10,linewidth=2,linecolor='red'),
+        'GEllipse':     lambda: game2d.GEllipse(width=10,height=20),
+        'GImage':       lambda: game2d.GImage(source='ship.png'),
+        'GLabel':       lambda: game2d.GLabel(text='Hi'),
+        'GSprite':      lambda: game2d.GSprite(width=10,height=10,source='alien-strip1.png',
+                                               format=(3,2)),
+        'GTile':        lambda: game2d.GTile(width=100,height=50,source='barrier.png'),
+        'GPath':        lambda: game2d.GPath(points=(0,0,10,10,20,0),linewidth=2),
+        'GTriangle':    lambda: game2d.GTriangle(points=(0,0,10,0,5,5)),
+        'GPolygon':     lambda: game2d.GPolygon(points=(0,0,10,0,10,10,0,10)),
+        'GSpriteBatch': lambda: game2d.GSpriteBatch(4,source='alien1.png'),
+        'Ship':         lambda: models.Ship(100.0),
+        'Alien':        lambda: models.Alien(100,200,0),
+        'Bolt':         lambda: models.Bolt(100,200,10,True),
+        'DefenseLine':  lambda: models.DefenseLine(),
+    }
+
+
+@pytest.mark.parametrize('name',sorted(drawables()))
+def test_every_drawable_can_be_built_and_drawn(images,name):
+    from game2d import GView
+    shape = drawables()[name]()
+    shape.x = 50
+    shape.angle = 30
+    shape.draw(GView())
+    assert shape._cache is not None
+
+
+@pytest.mark.parametrize('name',sorted(drawables()))
+def test_drawables_have_no_dictionary(images,name):
+    shape = drawables()[name]()
+    assert not hasattr(shape,'__dict__')
+    with pytest.raises(AttributeError):
+        shape.undeclared = 1
+
+
+def test_drawables_share_their_sizes_and_colors():
+    from game2d import GRectangle
+    first = GRectangle(width=33,height=27.0,fillcolor='red',linecolor=[0,0,1])
+    second = GRectangle(width=33.0,height=27,fillcolor=(1,0,0,1),linecolor='blue')
+    assert first._width is second._width and first._height is second._height
+    assert first._fillcolor is second._fillcolor
+    assert first._linecolor is second._linecolor
+    assert first.fillcolor == [1,0,0,1]
+
+
+def rendered(label):
+    """
+    Returns label after rendering its text, as the Kivy clock would.
+    """
+    label._label.texture_update()
+    return label
+
+
+def test_recycled_label_fits_its_new_text():
+    pool = GObjectPool(GLabel)
+    label = rendered(pool.acquire(text="Press 'S' to Continue",font_size=64,x=400,y=350))
+    wide = label.width
+    pool.release(label)
+    again = rendered(pool.acquire(text='GAME OVER!',font_size=64,x=400,y=350))
+    fresh = rendered(GLabel(text='GAME OVER!',font_size=64,x=400,y=350))
+    assert again is label
+    assert again.width < wide
+    assert (again.width,again.height) == (fresh.width,fresh.height)
+    assert (again.left,again.bottom) == (fresh.left,fresh.bottom)
+
+
+def test_recycled_label_keeps_a_given_size():
+    pool = GObjectPool(GLabel)
+    label = rendered(pool.acquire(text='Hi',width=300,height=100))
+    pool.release(label)
+    again = rendered(pool.acquire(text='Hello',width=300,height=100))
+    assert (again.width,again.height) == (300,100)
+
+
+def test_batch_without_a_fillcolor_is_white():
+    import numpy as np
+    from kivy.graphics import Color, Mesh
+    from game2d import GSpriteBatch
+    batch = GSpriteBatch(3,fillcolor=None)
+    batch.place(np.arange(3)*10.0,0.0,4.0,4.0)
+    batch.show(slice(None))
+    batch._sync()
+    colors = [cmd for cmd in batch._cache.children if isinstance(cmd,Color)]
+    meshes = [cmd for cmd in batch._cache.children if isinstance(cmd,Mesh)]
+    assert [list(color.rgba) for color in colors] == [[1,1,1,1]]
+    assert len(meshes) == 1 and len(meshes[0].indices) == 18
+
+
+def test_nested_scene_syncs_its_grandchildren():
+    from kivy.graphics import Color
+    from game2d import GRectangle, GScene, GView
+    rect = GRectangle(x=0,y=0,width=10,height=10,fillcolor='red')
+    inner = GScene(children=[rect])
+    outer = GScene(children=[inner])
+    view = GView()
+    outer.draw(view)
+    # An update in place
+    rect.fillcolor = 'blue'
+    outer.draw(view)
+    colors = [cmd for cmd in rect._cache.children if isinstance(cmd,Color)]
+    assert list(colors[0].rgba) == [0,0,1,1]
+    # A change that rebuilds the cache of the grandchild, and so of both scenes
+    rect.linecolor = 'green'
+    rect.linewidth = 2
+    outer.draw(view)
+    assert not rect._stale
+    assert rect._cache in inner._cache.children
+    assert inner._cache in outer._cache.children
+
+
+def count_resets(monkeypatch,cls):
+    """
+    Returns a list that gets one entry for every cache rebuild of a cls object.
+    """
+    calls = []
+    reset = cls._reset
+    def counted(self):
+        calls.append(self)
+        reset(self)
+    monkeypatch.setattr(cls,'_reset',counted)
+    return calls
+
+
+def test_label_batch_rebuilds_once(monkeypatch):
+    calls = count_resets(monkeypatch,GLabel)
+    label = GLabel(text='Hi',font_size=20)
+    del calls[:]
+    label.text = 'Game Over'
+    label.font_size = 48
+    label.fillcolor = 'red'
+    assert len(calls) >= 2
+    del calls[:]
+    with label.updating():
+        label.text = 'Press S'
+        label.font_size = 64
+        label.fillcolor = 'blue'
+        assert calls == []
+    assert calls == [label]
+    # The same changes one at a time give the same label
+    twin = GLabel(text='Hi',font_size=20)
+    twin.text = 'Game Over'
+    twin.font_size = 48
+    twin.fillcolor = 'red'
+    twin.text = 'Press S'
+    twin.font_size = 64
+    twin.fillcolor = 'blue'
+    assert (rendered(label).width,label.height) == (rendered(twin).width,twin.height)
+    assert label.fillcolor == twin.fillcolor
+
+
+def test_rectangle_batch_rebuilds_once_at_the_draw(monkeypatch):
+    from game2d import GRectangle, GView
+    calls = count_resets(monkeypatch,GRectangle)
+    view = GView()
+    shape = GRectangle(width=10,height=10)
+    shape.draw(view)
+    del calls[:]
+    with shape.updating():
+        shape.width = 20
+        shape.linecolor = 'red'
+        shape.linewidth = 2
+    assert calls == []
+    shape.draw(view)
+    shape.draw(view)
+    assert calls == [shape]
+    assert shape._lineshape is not None and shape._fillshape.size == (20,10)
+
+
+def test_nested_batches_refresh_at_the_outermost_end(monkeypatch):
+    calls = count_resets(monkeypatch,GLabel)
+    label = GLabel(text='Hi')
+    del calls[:]
+    label.begin_update()
+    label.text = 'One'
+    with label.updating():
+        label.text = 'Two'
+    assert calls == [] and label._updating == 1
+    label.font_size = 40
+    label.end_update()
+    assert calls == [label] and label._updating == 0
+    assert label.text == 'Two' and label.font_size == 40
+    with pytest.raises(AssertionError):
+        label.end_update()
+
+
+def test_exception_inside_a_batch(monkeypatch):
+    calls = count_resets(monkeypatch,GLabel)
+    label = GLabel(text='Hi')
+    del calls[:]
+    with pytest.raises(ZeroDivisionError):
+        with label.updating():
+            label.text = 'Before'
+            1/0
+    # The batch is closed, and the change before the error was applied
+    assert label._updating == 0
+    assert calls == [label] and not label._stale
+    assert label.text == 'Before'
+    label.text = 'After'
+    assert calls == [label,label]
@@ -0,0 +1,93 @@
+"""
+Property tests of the bookkeeping of Formation in simulation.py.
+
+The aliens are killed in random orders, and after every kill the bitmasks,
+the firing index and the shooters are compared to a brute-force scan of the
+alive array.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from simulation import Formation
+
+
+def check(formation):
+    """
+    Checks every invariant of formation against a scan of its alive array.
+    """
+    alive = formation.getAlive()
+    rows, cols = alive.shape
+    for row in range(rows):
+        bits = sum(1 << col for col in range(cols) if alive[row,col])
+        assert formation._rowbits[row] == bits
+        assert bool(formation._rowmask >> row & 1) == alive[row].any()
+    for col in range(cols):
+        bits = sum(1 << row for row in range(rows) if alive[row,col])
+        assert formation._colbits[col] == bits
+        assert bool(formation._colmask >> col & 1) == alive[:,col].any()
+        living = np.flatnonzero(alive[:,col])
+        assert formation.getShooter(col) == (int(living[0]) if len(living) else None)
+
+    # The firing index holds each column with a living alien exactly once
+    firing = [col for col in range(cols) if alive[:,col].any()]
+    assert sorted(formation._firing) == firing
+    assert formation.getFiringCount() == len(firing)
+    for (col, pos) in formation._firingpos.items():
+        assert formation._firing[pos] == col
+    assert len(formation._firingpos) == len(firing)
+
+    assert formation.getCount() == int(alive.sum())
+    assert formation.isEmpty() == (not alive.any())
+    living = np.argwhere(alive)
+    if len(living):
+        assert formation.getFirstCol() == living[:,1].min()
+        assert formation.getLastCol() == living[:,1].max()
+        assert formation.getBottomRow() == living[:,0].min()
+    else:
+        assert formation.getFirstCol() == None
+        assert formation.getLastCol() == None
+        assert formation.getBottomRow() == None
+
+
+@pytest.mark.parametrize('seed',range(8))
+def test_random_kills_keep_the_invariants(seed):
+    rng = random.Random(seed)
+    rows = rng.randint(1,7)
+    cols = rng.randint(1,12)
+    formation = Formation(rows,cols)
+    check(formation)
+    cells = [(row,col) for row in range(rows) for col in range(cols)]
+    rng.shuffle(cells)
+    for (row, col) in cells:
+        formation.kill(row,col)
+        check(formation)
+        # Killing a dead alien changes nothing
+        formation.kill(row,col)
+        assert formation.getKills()[-1] == (row,col)
+    assert formation.isEmpty()
+    assert len(formation.getKills()) == rows*cols
+
+
+def test_column_bit_clears_only_with_the_last_alien():
+    formation = Formation(3,2)
+    formation.kill(0,1)
+    formation.kill(2,1)
+    assert formation._colmask == 0b11
+    assert formation.getShooter(1) == 1
+    formation.kill(1,1)
+    assert formation._colmask == 0b01
+    assert formation.getShooter(1) == None
+    check(formation)
+
+
+def test_shooters_are_the_bottom_aliens():
+    formation = Formation(4,5)
+    rng = random.Random(3)
+    for (row, col) in [(0,0),(1,0),(0,3),(2,4),(0,4)]:
+        formation.kill(row,col)
+    for _ in range(50):
+        for (row, col) in formation.chooseShooters(rng,3):
+            assert formation.isAlive(row,col)
+            assert not formation.getAlive()[:row,col].any()
@@ -0,0 +1,103 @@
+"""
+Tests of the quads of GSpriteBatch and of the meshes that draw them.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip('kivy')
+
+
+def meshes(batch):
+    """
+    Returns the meshes of batch after bringing its drawing cache up to date.
+    """
+    from kivy.graphics import Mesh
+    batch._sync()
+    return [cmd for cmd in batch._cache.children if isinstance(cmd,Mesh)]
+
+
+def quads(mesh):
+    """
+    Returns the vertices of a mesh as a (count,4,4) array.
+    """
+    return np.asarray(mesh.vertices,dtype=float).reshape(-1,4,4)
+
+
+def test_vertices_of_the_visible_quads():
+    from game2d import GSpriteBatch
+    batch = GSpriteBatch(4,fillcolor='red')
+    batch.place(np.array([0.0,10.0,20.0,30.0]),5.0,[2.0,4.0,6.0,8.0],2.0)
+    batch.show([1,3])
+    (mesh,) = meshes(batch)
+    verts = quads(mesh)
+    assert verts.shape == (2,4,4)
+    # Bottom left, bottom right, top right, top left
+    assert verts[0,:,:2].tolist() == [[8,4],[12,4],[12,6],[8,6]]
+    assert verts[1,:,:2].tolist() == [[26,4],[34,4],[34,6],[26,6]]
+    assert list(mesh.indices) == [0,1,2,2,3,0,4,5,6,6,7,4]
+
+
+def test_update_in_place_follows_the_quads():
+    from game2d import GSpriteBatch
+    batch = GSpriteBatch(3)
+    batch.place(np.zeros(3),0.0,2.0,2.0)
+    batch.show(slice(None))
+    (mesh,) = meshes(batch)
+    batch.place(np.array([5.0,6.0]),1.0,start=1)
+    batch.hide(0)
+    assert meshes(batch) == [mesh]
+    verts = quads(mesh)
+    assert verts.shape == (2,4,4)
+    assert verts[:,0,:2].tolist() == [[4,0],[5,0]]
+    assert batch.count == 2
+
+
+def test_texture_coordinates_follow_the_crop(images):
+    from game2d import GSpriteBatch
+    batch = GSpriteBatch(3,source='alien-strip1.png')
+    batch.place(np.zeros(3),0.0,10.0,10.0)
+    batch.show(slice(None))
+    batch.crop(1,0.5,0.0,1.0,1/3)
+    batch.crop(2,0.0,2/3,0.5,1.0)
+    verts = quads(meshes(batch)[0])
+    coords = batch._texture.tex_coords
+    (u0, v0) = coords[0:2]
+    du = coords[2]-u0
+    dv = coords[7]-v0
+    for (quad, (left, bottom, right, top)) in zip(verts,[(0,0,1,1),(0.5,0,1,1/3),
+                                                          (0,2/3,0.5,1)]):
+        expected = [[u0+left*du,v0+bottom*dv],[u0+right*du,v0+bottom*dv],
+                    [u0+right*du,v0+top*dv],[u0+left*du,v0+top*dv]]
+        assert np.allclose(quad[:,2:],expected)
+
+
+def test_contains_only_the_visible_quads():
+    from game2d import GSpriteBatch
+    batch = GSpriteBatch(2,x=100,y=50,angle=90)
+    batch.place(np.array([0.0,20.0]),0.0,10.0,4.0)
+    batch.show(0)
+    # The batch is turned a quarter, so a quad 10 wide is 10 high on screen
+    assert batch.contains((100,54))
+    assert not batch.contains((104,50))
+    # The second quad is at (100,70) on screen, but hidden
+    assert not batch.contains((100,70))
+    batch.show(1)
+    assert batch.contains((100,70))
+
+
+def test_large_batches_are_split_into_meshes():
+    from game2d import GSpriteBatch
+    from game2d.gbatch import MESH_QUADS
+    total = MESH_QUADS+10
+    batch = GSpriteBatch(total)
+    batch.place(np.arange(total,dtype=float),0.0,1.0,1.0)
+    batch.show(slice(None))
+    first, second = meshes(batch)
+    assert len(first.indices) == 6*MESH_QUADS and len(second.indices) == 60
+    assert quads(first).shape[0] == MESH_QUADS and quads(second).shape[0] == 10
+    # Each mesh numbers its own corners from 0
+    assert max(first.indices) == 4*MESH_QUADS-1 and max(second.indices) == 39
+    assert quads(second)[0,0,0] == MESH_QUADS-0.5
+    # Hiding quads joins them again
+    batch.hide(slice(MESH_QUADS,None))
+    assert len(meshes(batch)) == 1
@@ -0,0 +1,126 @@
+"""
+Tests of the vectorized swept collision tests in game2d.gcollide.
+"""
+import math
+
+import numpy as np
+
+from game2d.gcollide import sweep, sweep_boxes, overlap_pairs, intercept
+
+
+def test_sweep_entry_time():
+    # A point moving up by 10 enters the box [-1,1]x[4,6] at 0.4 of the step
+    assert sweep(0.0,0.0,0.0,10.0,-1.0,4.0,1.0,6.0) == 0.4
+
+
+def test_sweep_through_a_box_thinner_than_the_step():
+    # The point starts below the box and ends above it, never inside at an end
+    assert sweep(0.0,0.0,0.0,100.0,-1.0,40.0,1.0,41.0) == 0.4
+
+
+def test_sweep_starting_inside():
+    assert sweep(0.0,5.0,0.0,10.0,-1.0,4.0,1.0,6.0) == 0.0
+
+
+def test_sweep_misses():
+    # Short of the box, moving away from it, and beside it
+    assert math.isinf(sweep(0.0,0.0,0.0,3.0,-1.0,4.0,1.0,6.0))
+    assert math.isinf(sweep(0.0,0.0,0.0,-10.0,-1.0,4.0,1.0,6.0))
+    assert math.isinf(sweep(2.0,0.0,0.0,10.0,-1.0,4.0,1.0,6.0))
+
+
+def test_sweep_touching_an_edge_does_not_enter():
+    # Sliding along the left edge, stopping at the bottom edge, standing on the top
+    assert math.isinf(sweep(-1.0,0.0,0.0,10.0,-1.0,4.0,1.0,6.0))
+    assert math.isinf(sweep(0.0,0.0,0.0,4.0,-1.0,4.0,1.0,6.0))
+    assert math.isinf(sweep(0.0,6.0,0.0,0.0,-1.0,4.0,1.0,6.0))
+    # Leaving from the top edge
+    assert math.isinf(sweep(0.0,6.0,0.0,5.0,-1.0,4.0,1.0,6.0))
+
+
+def test_sweep_broadcasts_points_against_boxes():
+    times = sweep(np.array([[0.0],[5.0]]),0.0,0.0,10.0,np.array([-1.0,4.0]),
+                  np.array([2.0,8.0]),np.array([1.0,6.0]),np.array([3.0,9.0]))
+    assert times.shape == (2,2)
+    assert times[0,0] == 0.2 and math.isinf(times[0,1])
+    assert math.isinf(times[1,0]) and times[1,1] == 0.8
+
+
+def test_sweep_boxes_reports_the_first_box_on_the_path():
+    # Three boxes stacked above a rectangle moving up through all of them
+    left   = np.array([-5.0,-5.0,-5.0])
+    right  = np.array([5.0,5.0,5.0])
+    bottom = np.array([60.0,20.0,40.0])
+    top    = bottom+5.0
+    index, times = sweep_boxes([0.0],[0.0],0.0,[100.0],2.0,4.0,left,bottom,right,top)
+    assert index.tolist() == [1]
+    assert times[0] == (20.0-2.0)/100.0
+
+
+def test_sweep_boxes_without_a_hit():
+    index, times = sweep_boxes([0.0,50.0],[0.0,0.0],0.0,[10.0,10.0],2.0,4.0,
+                               [20.0],[0.0],[30.0],[10.0])
+    assert index.tolist() == [-1,-1]
+    assert np.isinf(times).all()
+
+
+def test_sweep_boxes_without_boxes():
+    index, times = sweep_boxes([0.0],[0.0],0.0,[10.0],2.0,4.0,[],[],[],[])
+    assert index.tolist() == [-1]
+    assert np.isinf(times).all()
+
+
+def pairs(first,second):
+    """
+    Returns the pairs of index arrays as a sorted list of tuples.
+    """
+    return sorted(zip(first.tolist(),second.tolist()))
+
+
+def test_overlap_pairs_matches_brute_force():
+    rng = np.random.default_rng(0)
+    xa = rng.uniform(0,100,50)
+    xb = rng.uniform(0,100,70)
+    found = pairs(*overlap_pairs(xa,xb,3.0))
+    expected = [(i,j) for i in range(50) for j in range(70) if abs(xa[i]-xb[j]) < 3.0]
+    assert found == expected
+
+
+def test_overlap_pairs_touching_edges_do_not_overlap():
+    # Boxes of width 4 centered 4 apart only share an edge
+    first, second = overlap_pairs([0.0,10.0],[4.0,-4.0,13.9],4.0)
+    assert pairs(first,second) == [(1,2)]
+
+
+def test_overlap_pairs_empty():
+    first, second = overlap_pairs([],[1.0],1.0)
+    assert len(first) == 0 and len(second) == 0
+
+
+def test_intercept_touching_edges_do_not_meet():
+    # Side by side, and end to end at the end of the step
+    first, second, times = intercept([0.0],[0.0],[0.0],[4.0],[0.0],[0.0],4.0,16.0)
+    assert len(first) == 0
+    first, second, times = intercept([0.0],[0.0],[5.0],[0.0],[16.0],[0.0],4.0,16.0)
+    assert len(first) == 0
+
+
+def test_intercept_crossing_bolts_without_an_overlapping_frame():
+    # a goes from 50 to 100 and b from 110 to 60: they never overlap at the end
+    # of a step (16 high), but they pass through each other during it
+    first, second, times = intercept([0.0],[100.0],[50.0],[1.0],[60.0],[-50.0],4.0,16.0)
+    assert first.tolist() == [0] and second.tolist() == [0]
+    assert 0 < times[0] < 1
+
+
+def test_intercept_one_against_many():
+    # One bolt moving up into a column of three bolts moving down
+    xb  = np.zeros(3)
+    yb  = np.array([200.0,80.0,140.0])
+    dyb = np.full(3,-10.0)
+    first, second, times = intercept([0.0],[90.0],[40.0],xb,yb,dyb,4.0,16.0)
+    assert first.tolist() == [0] and second.tolist() == [1]
+    # Three bolts moving up into one moving down; two reach it, the first one wins
+    ya = np.array([100.0,95.0,40.0])
+    first, second, times = intercept(xb,ya,[80.0]*3,[0.0],[110.0],[-40.0],4.0,16.0)
+    assert first.tolist() == [0] and second.tolist() == [0]
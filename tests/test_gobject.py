@@ -0,0 +1,206 @@
+"""
+Tests of the geometry of GObject: the transform matrices, overlaps, intersects and
+the model collisions.
+"""
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip('kivy')
+
+from game2d import GRectangle, stack_matrices
+
+
+def rect(x,y,width,height,angle=0,scale=1):
+    """
+    Returns a rectangle with the given center, size, angle and scale.
+    """
+    shape = GRectangle(x=x,y=y,width=width,height=height,angle=angle)
+    shape.scale = scale
+    return shape
+
+
+def old_matrices(shape):
+    """
+    Returns the matrix and inverse of shape as the introcs Matrix used to build them.
+
+    The results are the upper-left 2x2 block and the translation of each 4x4 matrix,
+    put into 3x3 affine form.
+    """
+    from introcs import Matrix
+    matrix = Matrix()
+    matrix.scale(shape._sx,shape._sy)
+    matrix.rotate(shape.angle)
+    matrix.translate(shape.x,shape.y)
+    inverse = Matrix()
+    inverse.translate(-shape.x,-shape.y)
+    inverse.rotate(-shape.angle)
+    inverse.scale(1.0/shape._sx,1.0/shape._sy)
+    result = []
+    for old in (matrix,inverse):
+        data = np.array(old._data,dtype=float)
+        affine = np.eye(3)
+        affine[:2,:2] = data[:2,:2]
+        affine[:2,2] = data[:2,3]
+        result.append(affine)
+    return result
+
+
+def random_shapes(seed,count):
+    """
+    Returns count rectangles with random positions, angles and scales.
+    """
+    rng = random.Random(seed)
+    return [rect(rng.uniform(-100,100),rng.uniform(-100,100),rng.uniform(1,20),
+                 rng.uniform(1,20),rng.uniform(-360,360),
+                 (rng.uniform(0.25,4),rng.uniform(0.25,4))) for _ in range(count)]
+
+
+def test_matrices_match_introcs():
+    for shape in random_shapes(0,100):
+        matrix, inverse = old_matrices(shape)
+        assert np.allclose(shape.matrix,matrix,atol=1e-4)
+        assert np.allclose(shape.inverse,inverse,atol=1e-4)
+        assert np.allclose(shape.matrix @ shape.inverse,np.eye(3))
+        assert np.allclose(shape.inverse @ shape.matrix,np.eye(3))
+
+
+def test_stacked_matrices_match_each_shape():
+    shapes = random_shapes(1,20)
+    stacked = stack_matrices(shapes)
+    inverse = stack_matrices(shapes,True)
+    assert stacked.shape == (20,3,3)
+    for (i, shape) in enumerate(shapes):
+        assert np.allclose(stacked[i],shape.matrix)
+        assert np.allclose(inverse[i],shape.inverse)
+    assert stack_matrices([]).shape == (0,3,3)
+
+
+def test_inverse_follows_the_transform():
+    shape = rect(0,0,10,4,angle=30,scale=2)
+    assert shape.contains((8,4))
+    assert not shape.contains((-8,4))
+    first = shape.inverse
+    shape.x = 100
+    assert not shape.contains((8,4))
+    assert shape.contains((108,4))
+    assert shape.inverse is not first
+    shape.angle = 150
+    assert shape.contains((92,4)) and not shape.contains((108,4))
+    shape.scale = 0.5
+    assert not shape.contains((92,4))
+    assert shape.contains((98,1))
+    for value in (shape.matrix @ shape.inverse, shape.inverse @ shape.matrix):
+        assert np.allclose(value,np.eye(3))
+    matrix, inverse = old_matrices(shape)
+    assert np.allclose(shape.inverse,inverse,atol=1e-4)
+
+
+def test_inverse_is_kept_until_a_change():
+    shape = rect(5,5,10,10,angle=45)
+    first = shape.inverse
+    assert shape.inverse is first
+    shape.fillcolor = 'red'
+    assert shape.inverse is first
+    shape.y = 6
+    assert shape.inverse is not first
+
+
+def separated(first,second):
+    """
+    Returns True if the two rectangles have a separating axis, using their corners.
+
+    The corners come from the transform matrices, so this does not share any
+    code with overlaps.
+    """
+    a = first._corners()
+    b = second._corners()
+    for corners in (a,b):
+        for i in range(2):
+            edge = corners[:,i+1]-corners[:,i]
+            axis = np.array((-edge[1],edge[0]))
+            pa = axis @ a
+            pb = axis @ b
+            if pa.max() <= pb.min() or pb.max() <= pa.min():
+                return True
+    return False
+
+
+def test_axis_aligned_pairs():
+    a = rect(0,0,10,10)
+    assert a.overlaps(rect(8,3,10,10))
+    assert a.overlaps(rect(0,0,2,2))
+    assert not a.overlaps(rect(20,0,10,10))
+    assert not a.overlaps(rect(0,-20,10,10))
+
+
+def test_touching_edges_do_not_overlap():
+    a = rect(0,0,10,10)
+    assert not a.overlaps(rect(10,0,10,10))
+    assert not a.overlaps(rect(3,10,10,10))
+    assert not a.overlaps(rect(10,10,10,10))
+    # A quarter turn swaps the extents exactly
+    tall = rect(0,0,20,10,angle=90)
+    assert not tall.overlaps(rect(10,0,10,10))
+    assert tall.overlaps(rect(9.9,0,10,10))
+    assert not tall.overlaps(rect(0,15,10,10))
+
+
+def test_rotated_pairs():
+    diamond = rect(0,0,10,10,angle=45)
+    # The bounding boxes overlap, but the corner is beyond the diamond edge
+    assert not diamond.overlaps(rect(11,11,10,10))
+    assert not rect(11,11,10,10).overlaps(diamond)
+    # The tip of the diamond (at 7.07) reaches into the box
+    assert diamond.overlaps(rect(11,0,10,10))
+    assert not diamond.overlaps(rect(12.1,0,10,10))
+    assert diamond.overlaps(rect(6,6,10,10,angle=30))
+
+
+def test_overlaps_matches_the_corners():
+    rng = random.Random(0)
+    for _ in range(500):
+        a = rect(rng.uniform(-20,20),rng.uniform(-20,20),rng.uniform(1,20),
+                 rng.uniform(1,20),rng.choice([0,90,rng.uniform(0,360)]),
+                 rng.uniform(0.5,2))
+        b = rect(rng.uniform(-20,20),rng.uniform(-20,20),rng.uniform(1,20),
+                 rng.uniform(1,20),rng.choice([0,180,rng.uniform(0,360)]))
+        assert a.overlaps(b) == (not separated(a,b))
+        assert a.overlaps(b) == b.overlaps(a)
+
+
+@pytest.mark.parametrize('angle',[0,90,30,135])
+def test_intersects_agrees_with_overlaps(angle):
+    rng = np.random.default_rng(angle)
+    shape = rect(5,-3,16,6,angle=angle,scale=1.5)
+    left = rng.uniform(-30,30,400)
+    bottom = rng.uniform(-30,30,400)
+    width = rng.uniform(0.5,15,400)
+    height = rng.uniform(0.5,15,400)
+    result = shape.intersects(left,bottom,left+width,bottom+height)
+    assert result.shape == (400,)
+    for i in range(400):
+        other = GRectangle(left=float(left[i]),bottom=float(bottom[i]),
+                           width=float(width[i]),height=float(height[i]))
+        assert result[i] == shape.overlaps(other)
+    assert result.any() and not result.all()
+
+
+def test_intersects_one_rectangle():
+    shape = rect(0,0,10,10)
+    assert shape.intersects(-2,-2,2,2) is True
+    assert shape.intersects(5,-2,8,2) is False
+
+
+def test_models_collide_with_the_bolts_of_the_other_side(images):
+    from consts import SHIP_BOTTOM, ALIEN_WIDTH, BOLT_WIDTH
+    from models import Ship, Alien, Bolt
+    alien = Alien(100,400,0)
+    ship = Ship(300.0)
+    assert alien.collides(Bolt(100,400,10,True))
+    assert not alien.collides(Bolt(100,400,-10,False))
+    # A bolt beside the alien, touching its edge
+    assert not alien.collides(Bolt(100+(ALIEN_WIDTH+BOLT_WIDTH)/2,400,10,True))
+    assert ship.collides(Bolt(300,SHIP_BOTTOM,-10,False))
+    assert not ship.collides(Bolt(300,SHIP_BOTTOM,10,True))
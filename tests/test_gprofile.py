@@ -0,0 +1,93 @@
+"""
+Tests of the log-bucketed histogram of game2d.gprofile.
+"""
+import pytest
+
+from game2d.gprofile import GHistogram
+
+
+def edges(precision):
+    """
+    Returns values around every power of two below 2**64.
+    """
+    values = set(range(0,4 << precision))
+    for bits in range(precision,64):
+        for delta in (-1,0,1):
+            values.add((1 << bits)+delta)
+    return sorted(value for value in values if value < 1 << 64)
+
+
+@pytest.mark.parametrize('precision',[1,4,10])
+def test_every_value_is_in_its_bucket(precision):
+    hist = GHistogram(precision)
+    for value in edges(precision):
+        low, high = hist._bounds(hist._bucket(value))
+        assert low <= value < high
+        # The width of a bucket is at most 1/2**precision of its values
+        assert (high-low)*(1 << precision) <= max(low,1 << precision)
+
+
+@pytest.mark.parametrize('precision',[1,4])
+def test_buckets_are_contiguous(precision):
+    hist = GHistogram(precision)
+    count = len(hist._counts)
+    assert hist._bounds(0)[0] == 0
+    for index in range(count-1):
+        assert hist._bounds(index)[1] == hist._bounds(index+1)[0]
+    assert hist._bounds(count-1)[1] == 1 << 64
+
+
+def test_small_values_have_a_bucket_each():
+    hist = GHistogram(4)
+    for value in range(32):
+        assert hist._bounds(hist._bucket(value)) == (value,value+1)
+    assert hist._bounds(hist._bucket(32)) == (32,34)
+    assert hist._bucket(33) == hist._bucket(32)
+    assert hist._bucket(34) == hist._bucket(32)+1
+
+
+def test_empty_histogram():
+    hist = GHistogram()
+    assert len(hist) == 0
+    assert hist.percentile(50) is None
+    assert hist.percentile(100) is None
+    summary = hist.to_dict()
+    assert summary['mean'] is None and summary['p99'] is None
+    assert summary['buckets'] == []
+
+
+def test_percentiles_are_within_one_bucket():
+    hist = GHistogram(4)
+    for value in range(1,1001):
+        hist.record(value)
+    for percent in (1,10,50,90,99,99.9,100):
+        exact = int(1000*percent/100.0 + 0.999)
+        low, high = hist._bounds(hist._bucket(exact))
+        assert exact <= hist.percentile(percent) < high
+    assert hist.percentile(0) == 1
+    assert hist.percentile(100) == 1000
+
+
+def test_single_value():
+    hist = GHistogram()
+    hist.record(12345)
+    assert hist.percentile(0) == hist.percentile(50) == hist.percentile(100) == 12345
+
+
+def test_values_above_the_top_bucket():
+    hist = GHistogram(4)
+    hist.record(10)
+    hist.record((1 << 64)+5)
+    hist.record(1 << 70)
+    assert hist.count == 3
+    assert hist.max == 1 << 70
+    assert hist.percentile(100) == 1 << 70
+    assert hist.percentile(30) == 10
+    assert hist.buckets()[-1][2] == 2
+
+
+def test_clear():
+    hist = GHistogram()
+    hist.record(7)
+    hist.clear()
+    assert len(hist) == 0 and hist.min is None and hist.percentile(50) is None
@@ -0,0 +1,116 @@
+"""
+Tests of the uniform-grid spatial hash in game2d.gspatial.
+
+The objects are plain boxes, so these tests do not need Kivy.
+"""
+import random
+
+import pytest
+
+from game2d.gspatial import GSpatialHash
+
+
+class Box(object):
+    """
+    A rectangle with the edge attributes of a GObject.
+    """
+
+    def __init__(self,left,bottom,width,height):
+        self.place(left,bottom,width,height)
+
+    def place(self,left,bottom,width,height):
+        self.left = left
+        self.bottom = bottom
+        self.right = left+width
+        self.top = bottom+height
+
+
+def overlapping(boxes,left,bottom,right,top):
+    """
+    Returns the set of boxes that overlap the rectangle, by brute force.
+    """
+    return {box for box in boxes if box.left <= right and box.right >= left
+            and box.bottom <= top and box.top >= bottom}
+
+
+def random_box(rng):
+    return Box(rng.uniform(-200,800),rng.uniform(-200,800),
+               rng.uniform(0,150),rng.uniform(0,150))
+
+
+def test_query_finds_every_overlapping_box():
+    rng = random.Random(0)
+    grid = GSpatialHash(64)
+    boxes = [random_box(rng) for _ in range(200)]
+    for box in boxes:
+        grid.insert(box)
+    assert len(grid) == 200
+    for _ in range(100):
+        left, bottom = rng.uniform(-300,900), rng.uniform(-300,900)
+        right, top = left+rng.uniform(0,200), bottom+rng.uniform(0,200)
+        found = grid.query(left,bottom,right,top)
+        assert len(found) == len(set(found))
+        assert overlapping(boxes,left,bottom,right,top) <= set(found)
+
+
+def test_move_refiles_the_box():
+    rng = random.Random(1)
+    grid = GSpatialHash(32)
+    boxes = [random_box(rng) for _ in range(50)]
+    for box in boxes:
+        grid.insert(box)
+    for _ in range(200):
+        box = rng.choice(boxes)
+        box.place(rng.uniform(-200,800),rng.uniform(-200,800),
+                  rng.uniform(0,150),rng.uniform(0,150))
+        grid.move(box)
+        found = grid.query(box.left,box.bottom,box.right,box.top)
+        assert box in found
+    for box in boxes:
+        # The old cells no longer hold the box
+        far = grid.query(box.right+100,box.top+100,box.right+101,box.top+101)
+        assert not box in far
+
+
+def test_remove_and_clear():
+    grid = GSpatialHash(10)
+    a = Box(0,0,5,5)
+    b = Box(3,3,30,5)
+    grid.insert(a)
+    grid.insert(b)
+    grid.remove(a)
+    grid.remove(a)
+    assert not a in grid and b in grid
+    assert grid.query(0,0,5,5) == [b]
+    grid.remove(b)
+    assert len(grid) == 0 and grid.layers == ()
+    grid.insert(a)
+    grid.clear()
+    assert grid.query(-100,-100,100,100) == []
+
+
+def test_layers_limit_the_query():
+    grid = GSpatialHash(16)
+    alien = Box(0,0,10,10)
+    ship = Box(2,2,10,10)
+    bolt = Box(4,4,2,8)
+    grid.insert(alien,'aliens')
+    grid.insert(ship,'ship')
+    grid.insert(bolt,'bolts')
+    assert set(grid.layers) == {'aliens','ship','bolts'}
+    assert grid.query_object(bolt,'aliens') == [alien]
+    assert set(grid.query_object(bolt,('aliens','ship'))) == {alien,ship}
+    assert set(grid.query_object(bolt)) == {alien,ship}
+    assert grid.query_object(bolt,'walls') == []
+    # Inserting again moves the object to the new layer
+    grid.insert(ship,'aliens')
+    assert set(grid.query_object(bolt,'aliens')) == {alien,ship}
+    assert grid.query_object(bolt,'ship') == []
+
+
+def test_cells_of_a_box():
+    grid = GSpatialHash(10)
+    assert grid._cells(1,1,9,9) == ((0,0),)
+    assert grid._cells(-1,5,11,5) == ((-1,0),(0,0),(1,0))
+    with pytest.raises(AssertionError):
+        GSpatialHash(0)
@@ -0,0 +1,100 @@
+"""
+Tests of the retained mode of GView and of its frame diff.
+"""
+import random
+
+import pytest
+
+pytest.importorskip('kivy')
+
+from game2d.gview import diff_frames
+
+
+def apply(shown,edits):
+    """
+    Returns the list shown after applying the edits of diff_frames.
+    """
+    (removed, inserted) = edits
+    result = [cmd for cmd in shown if not any(cmd is old for old in removed)]
+    for (pos, cmd) in inserted:
+        result.insert(pos,cmd)
+    return result
+
+
+def test_same_frame_has_no_edits():
+    cmds = [object() for _ in range(5)]
+    assert diff_frames(cmds,list(cmds)) == ([],[])
+    assert diff_frames([],[]) == ([],[])
+
+
+def test_vanished_commands_are_removed():
+    cmds = [object() for _ in range(6)]
+    drawn = cmds[:2]+cmds[3:]
+    removed, inserted = diff_frames(cmds,drawn)
+    assert removed == [cmds[2]] and inserted == []
+
+
+def test_new_commands_are_inserted_at_their_place():
+    cmds = [object() for _ in range(6)]
+    new = [object(), object()]
+    drawn = [new[0]]+cmds[:4]+[new[1]]+cmds[4:]
+    edits = diff_frames(cmds,drawn)
+    assert edits[0] == []
+    assert edits[1] == [(0,new[0]),(5,new[1])]
+    assert apply(cmds,edits) == drawn
+
+
+def test_reordered_frame_is_rebuilt():
+    cmds = [object() for _ in range(6)]
+    drawn = cmds[1:]+cmds[:1]
+    assert diff_frames(cmds,drawn) is None
+
+
+def test_mostly_new_frame_is_rebuilt():
+    cmds = [object() for _ in range(6)]
+    drawn = cmds[:2]+[object() for _ in range(4)]
+    assert diff_frames(cmds,drawn) is None
+
+
+def test_random_frames():
+    rng = random.Random(0)
+    pool = [object() for _ in range(30)]
+    shown = []
+    for _ in range(500):
+        drawn = [cmd for cmd in shown if rng.random() > 0.1]
+        for cmd in rng.sample(pool,3):
+            if not any(cmd is old for old in drawn):
+                drawn.insert(rng.randint(0,len(drawn)),cmd)
+        if rng.random() < 0.1:
+            rng.shuffle(drawn)
+        edits = diff_frames(shown,drawn)
+        assert edits is None or apply(shown,edits) == drawn
+        shown = drawn
+
+
+def test_retained_view_matches_the_draw_order():
+    from kivy.graphics import Color
+    from game2d import GView
+    view = GView(retained=True)
+    cmds = [Color() for _ in range(8)]
+    frames = [cmds[:5], cmds[:2]+cmds[3:6], [cmds[7]]+cmds[:2]+cmds[3:6],
+              cmds[::-1], []]
+    for frame in frames:
+        view.clear()
+        for cmd in frame+frame[:1]:
+            view.draw(cmd)
+        view.flush()
+        assert view._frame.children == frame
+
+
+def test_immediate_view_ignores_flush():
+    from kivy.graphics import Color
+    from game2d import GView
+    view = GView()
+    cmds = [Color() for _ in range(3)]
+    for cmd in cmds:
+        view.draw(cmd)
+    view.flush()
+    assert view._frame.children == cmds
+    view.clear()
+    assert view._frame.children == []
@@ -0,0 +1,169 @@
+"""
+Tests of the headless wave simulation in simulation.py.
+
+These need only NumPy.  The bolts are spawned and stepped by hand, and
+delEntity is called directly, so that the aliens never march or fire.
+"""
+from consts import *
+from simulation import *
+
+
+def fire(sim,x,y,velocity,player=True):
+    """
+    Spawns a bolt that ends the next step at (x,y), and runs that step.
+    """
+    bolts = sim.getBolts()
+    bolts.spawn(x,y-velocity,velocity,player)
+    bolts.step()
+    sim.delEntity()
+
+
+def test_fast_bolt_hits_the_first_alien_on_its_path():
+    sim = WaveSim(rows=5,cols=4,seed=0)
+    formation = sim.getFormation()
+    x, y = formation.getPosition(0,2)
+    top = formation.getPosition(4,2)[1]
+    # From below the bottom alien to above the top one in a single step
+    start = y - ALIEN_HEIGHT
+    fire(sim,x,top + ALIEN_HEIGHT,top + ALIEN_HEIGHT - start)
+    assert not formation.isAlive(0,2)
+    assert formation.getCount() == 5*4 - 1
+    assert sim.getBolts().getCount() == 0
+
+
+def test_bolt_faster_than_an_alien_height_does_not_tunnel():
+    sim = WaveSim(rows=1,cols=3,seed=0)
+    formation = sim.getFormation()
+    x, y = formation.getPosition(0,1)
+    # Both ends of the step are clear of the alien
+    speed = 3*ALIEN_HEIGHT
+    fire(sim,x,y + 1.5*ALIEN_HEIGHT,speed)
+    assert not formation.isAlive(0,1)
+    assert formation.getCount() == 2
+
+
+def test_each_bolt_kills_one_alien():
+    sim = WaveSim(rows=3,cols=4,seed=0)
+    formation = sim.getFormation()
+    bolts = sim.getBolts()
+    for col in (0,3):
+        x, y = formation.getPosition(0,col)
+        bolts.spawn(x,y - ALIEN_HEIGHT,8*ALIEN_HEIGHT,True)
+    bolts.step()
+    sim.delEntity()
+    assert sorted(formation.getKills()) == [(0,0),(0,3)]
+    assert bolts.getCount() == 0
+
+
+def test_bolt_missing_between_columns():
+    sim = WaveSim(rows=2,cols=2,seed=0)
+    formation = sim.getFormation()
+    left = formation.getPosition(0,0)
+    right = formation.getPosition(0,1)
+    x = (left[0] + right[0])/2
+    fire(sim,x,left[1] + 4*ALIEN_HEIGHT,8*ALIEN_HEIGHT)
+    assert formation.getCount() == 4
+    assert sim.getBolts().getCount() == 1
+
+
+def test_bolt_grazing_an_alien_edge_misses():
+    sim = WaveSim(rows=1,cols=3,seed=0)
+    formation = sim.getFormation()
+    x, y = formation.getPosition(0,1)
+    edge = x - ALIEN_WIDTH/2 - BOLT_WIDTH/2
+    # The bolt slides along the left edge of the alien, touching it
+    fire(sim,edge,y + 2*ALIEN_HEIGHT,4*ALIEN_HEIGHT)
+    assert formation.getCount() == 3
+    assert sim.getBolts().getCount() == 1
+    # A little further in, it hits
+    fire(sim,edge + 0.5,y + 2*ALIEN_HEIGHT,4*ALIEN_HEIGHT)
+    assert not formation.isAlive(0,1)
+
+
+def test_fast_alien_bolt_hits_the_ship():
+    sim = WaveSim(seed=0)
+    x = sim.getShipX()
+    # From above the ship to below it in one step
+    fire(sim,x,SHIP_BOTTOM - SHIP_HEIGHT,-3*SHIP_HEIGHT,False)
+    assert sim.getShipX() == None
+    assert sim.getLives() == SHIP_LIVES - 1
+    assert sim.getSavedX() == x
+    assert sim.getBolts().getCount() == 0
+
+
+def test_player_bolt_does_not_hit_the_ship():
+    sim = WaveSim(seed=0)
+    x = sim.getShipX()
+    fire(sim,x,SHIP_BOTTOM + SHIP_HEIGHT,3*SHIP_HEIGHT)
+    assert sim.getShipX() == x
+    assert sim.getLives() == SHIP_LIVES
+
+
+def test_bolt_buffer_intercept():
+    bolts = BoltBuffer(8)
+    up = bolts.spawn(100.0,100.0,50.0,True)
+    down = bolts.spawn(101.0,60.0,-50.0,False)
+    apart = bolts.spawn(300.0,60.0,-50.0,False)
+    assert sorted(bolts.intercept().tolist()) == [up,down]
+    assert bolts.getCount() == 3
+
+
+def test_endless_wave_counts_lost_ships_without_ending():
+    for endless in (False,True):
+        sim = WaveSim(rows=1,cols=1,lives=1,endless=endless,seed=0)
+        x = sim.getShipX()
+        fire(sim,x,SHIP_BOTTOM,-BOLT_SPEED,False)
+        assert sim.getShipX() == None
+        assert sim.getLost() == 1
+        assert sim.isEndless() == endless
+        assert sim.getLives() == (1 if endless else 0)
+        assert sim.isComplete() == (not endless)
+
+
+def snapshot(sim):
+    """
+    Returns the state of sim that the inputs and the seed determine.
+    """
+    formation = sim.getFormation()
+    bolts = sim.getBolts()
+    active = bolts.getActive()
+    return (sim.getShipX(),sim.getLives(),sim.getPassed(),sim.getDestroyed(),
+            formation.getAlive().tolist(),formation.getXs().tolist(),
+            formation.getYs().tolist(),formation.getMoves(),list(formation.getKills()),
+            active.tolist(),bolts.getXs()[active].tolist(),
+            bolts.getYs()[active].tolist(),bolts.getPlayers()[active].tolist(),
+            bolts.getSerials()[active].tolist())
+
+
+def play(seed,frames):
+    """
+    Plays a wave with the bot for frames frames and returns a snapshot per frame.
+    """
+    from batch import BotPolicy, FRAME_TIME
+    sim = WaveSim(rows=4,cols=8,seed=seed)
+    player = BotPolicy()
+    result = []
+    for _ in range(frames):
+        if sim.getShipX() == None:
+            sim.restoreShip()
+        player.observe(sim)
+        sim.update(player,FRAME_TIME)
+        if player.is_key_down('spacebar'):
+            sim.makeBolt()
+        result.append(snapshot(sim))
+        if sim.isComplete():
+            break
+    return result
+
+
+def test_same_seed_and_inputs_give_the_same_wave():
+    first = play(7,1500)
+    second = play(7,1500)
+    assert len(first) == len(second)
+    for (frame, (a, b)) in enumerate(zip(first,second)):
+        assert a == b, 'the waves differ at frame %d' % frame
+    # The wave did something worth comparing
+    last = first[-1]
+    assert len(last[8]) > 0
+    assert any(len(state[9]) > 0 for state in first)
+    assert play(8,1500) != first
@@ -0,0 +1,12 @@
+"""
+Tests of the headless stress test in stress.py.
+"""
+from stress import headless, STRESS_FRAMES
+
+
+def test_headless_runs_the_requested_frames():
+    # Losing ships used to end this wave after about 800 frames
+    result = headless(100,100,frames=STRESS_FRAMES,seed=0)
+    assert result['requested'] == STRESS_FRAMES
+    assert result['frames'] == STRESS_FRAMES
+    assert result['endless'] and result['ships_lost'] > 0
@@ -0,0 +1,65 @@
+"""
+Tests of the production switch of the game2d property checks.
+
+VALIDATE is read once, when game2d.gobject is first imported, and the other
+modules copy it on import.  So each mode is tried in a new interpreter.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('kivy')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sets bad values on a rectangle, and prints VALIDATE and what happened
+SCRIPT = """
+from game2d import GRectangle, gobject, grectangle
+assert gobject.VALIDATE == grectangle.VALIDATE
+shape = GRectangle(width=10,height=10)
+results = []
+for (attr, value) in (('width',-5),('linewidth',-1),('x',True)):
+    try:
+        setattr(shape,attr,value)
+        results.append('set')
+    except AssertionError:
+        results.append('raised')
+print(gobject.VALIDATE,' '.join(results))
+"""
+
+
+def run(production=None,optimize=False):
+    """
+    Returns the output of SCRIPT in a new interpreter.
+
+    Parameter production: the value of GAME2D_PRODUCTION (None to unset it)
+    Precondition: production is None or a string
+
+    Parameter optimize: whether to run Python with -O
+    Precondition: optimize is a bool
+    """
+    env = dict(os.environ)
+    env.pop('GAME2D_PRODUCTION',None)
+    if production is not None:
+        env['GAME2D_PRODUCTION'] = production
+    command = [sys.executable] + (['-O'] if optimize else []) + ['-c',SCRIPT]
+    result = subprocess.run(command,cwd=os.path.join(ROOT,'invaders'),env=env,
+                            capture_output=True,text=True,timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+@pytest.mark.parametrize('production',[None,'0',''])
+def test_bad_values_raise_by_default(production):
+    assert run(production) == 'True raised raised raised'
+
+
+@pytest.mark.parametrize('production',['1','yes'])
+def test_bad_values_are_not_checked_in_production(production):
+    assert run(production) == 'False set set set'
+
+
+def test_optimized_python_is_production():
+    assert run(optimize=True) == 'False set set set'